@@ -1,304 +1,1381 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, render_template, jsonify, request
 from flask_cors import CORS
-import tensorflow as tf
 import numpy as np
-import pandas as pd
+import atexit
+import hashlib
 import json
 import os
+import re
+from collections import namedtuple
 from datetime import datetime, timedelta
-import random
+import queue
 import threading
 import time
-from sklearn.datasets import make_classification, make_regression
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, mean_squared_error, r2_score
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
-import base64
 
-app = Flask(__name__)
-CORS(app)
+# TensorFlow and scikit-learn are imported inside the functions that train or
+# run models, so importing this module (health checks, workers, tests) stays fast
+from datasets import load_training_data
+from drift_monitor import DriftMonitor, DriftReference
+from history_store import MetricHistory
+from inference_backends import BACKENDS, create_backend
+from instrumentation import MetricsRegistry, instrument_app
+from live_stream import MetricsBroadcaster
+from metrics_engine import classification_metrics, regression_metrics, scalar_metrics
+from metrics_scheduler import MetricsScheduler
+from micro_batcher import MicroBatcher
+from model_introspection import describe_model, weight_bytes
+from model_registry import ModelRegistry
+from prediction_sampler import TestSetPredictions
+from request_profiler import RequestProfiler, SORT_KEYS, profile_requests
+from response_encoding import compress_responses, encoded_response, get_layout, json_provider_class
+from sweeps import SweepManager
+from training_jobs import TrainingJobQueue
+from training_spec import TrainingSpec, build_model, fit_model
 
-# Global variables for model and data
-model = None
-X_test = None
-y_test = None
-scaler = None
-model_type = None
-performance_history = []
-prediction_history = []
+bp = Blueprint('dashboard', __name__)
+
+# Process-wide metrics exposed at /metrics in Prometheus text format
+metrics_registry = MetricsRegistry()
+REQUEST_SECONDS = metrics_registry.histogram(
+    'ml_dashboard_http_request_duration_seconds',
+    'Time spent in request handlers, by route template, method and status',
+    ('route', 'method', 'status'))
+JSON_SECONDS = metrics_registry.histogram(
+    'ml_dashboard_json_serialization_seconds', 'Time spent encoding JSON response bodies')
+PREDICT_SECONDS = metrics_registry.histogram(
+    'ml_dashboard_model_predict_seconds', 'Inference backend call time', ('backend', 'model_type'))
+METRICS_COMPUTE_SECONDS = metrics_registry.histogram(
+    'ml_dashboard_metrics_compute_seconds', 'Time to compute performance metrics over the test set',
+    ('model_type',))
+TICK_SECONDS = metrics_registry.histogram(
+    'ml_dashboard_background_tick_seconds', 'Duration of one real-time metrics tick')
+
+# Everything a reader needs about one served model, published as one immutable unit
+ModelSnapshot = namedtuple('ModelSnapshot', [
+    'model', 'backend', 'scaler', 'X_test', 'y_test', 'model_type', 'version', 'test_fingerprint',
+    'registry_version', 'name', 'memory_bytes', 'info'
+])
+
+MODEL_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$')
+
+def validate_model_name(name):
+    if not MODEL_NAME_PATTERN.match(name or ''):
+        raise ValueError('Model names are 1-64 letters, digits, ".", "_" or "-"')
+    return name
+
+def estimate_memory_bytes(model, X_test, y_test):
+    """Approximate resident size of a served model: weights held by Keras and
+    again by the inference backend, plus the test split"""
+    return weight_bytes(model) * 2 + X_test.nbytes + y_test.nbytes
 
 class MLModelManager:
-    def __init__(self):
-        self.model = None
-        self.model_type = None
-        self.scaler = StandardScaler()
-        self.X_test = None
-        self.y_test = None
-        self.performance_history = []
+    """Serves several named models side by side.
+
+    Each name (``classification``, ``regression`` or any user-chosen variant)
+    maps to one snapshot. When the resident snapshots exceed
+    ``memory_budget`` bytes, the least recently used ones that are stored in
+    the registry are dropped from memory and reloaded on their next use.
+    Requests that name no model get the default one: the model most recently
+    trained or activated.
+    """
+
+    def __init__(self, memory_budget=None):
+        # Replaced wholesale by _publish_model(); readers take one reference and use only that
+        self._snapshots = {}
+        self.default_name = None
+        self._publish_lock = threading.Lock()
+        self._version_counter = 0
+        
+        # Registry version of every named model, resident or evicted
+        self._catalog = {}
+        self._last_used = {}
+        self._reload_lock = threading.Lock()
+        self.memory_budget = memory_budget
+        self.evictions = 0
+        self.reloads = 0
+        
+        self._history_capacity = int(os.environ.get('ML_DASHBOARD_HISTORY_CAPACITY', 34560))
+        self._histories = {}
+        self._history_lock = threading.Lock()
         self.prediction_history = []
         
-    def create_classification_model(self):
-        """Create and train a classification model"""
-        # Generate sample data
-        X, y = make_classification(n_samples=1000, n_features=20, n_informative=15, 
-                                 n_redundant=5, n_classes=3, random_state=42)
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Create and train model
-        self.model = tf.keras.Sequential([
-            tf.keras.layers.Dense(64, activation='relu', input_shape=(20,)),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(32, activation='relu'),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(3, activation='softmax')
-        ])
-        
-        self.model.compile(optimizer='adam',
-                          loss='sparse_categorical_crossentropy',
-                          metrics=['accuracy'])
-        
-        # Train model
-        history = self.model.fit(X_train_scaled, y_train, 
-                               epochs=50, batch_size=32, 
-                               validation_split=0.2, verbose=0)
-        
-        # Store test data
-        self.X_test = X_test_scaled
-        self.y_test = y_test
-        self.model_type = 'classification'
-        
-        return history.history
-    
-    def create_regression_model(self):
-        """Create and train a regression model"""
-        # Generate sample data
-        X, y = make_regression(n_samples=1000, n_features=20, noise=0.1, random_state=42)
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Create and train model
-        self.model = tf.keras.Sequential([
-            tf.keras.layers.Dense(64, activation='relu', input_shape=(20,)),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(32, activation='relu'),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(1)
-        ])
-        
-        self.model.compile(optimizer='adam', loss='mse', metrics=['mae'])
-        
-        # Train model
-        history = self.model.fit(X_train_scaled, y_train, 
-                               epochs=50, batch_size=32, 
-                               validation_split=0.2, verbose=0)
-        
-        # Store test data
-        self.X_test = X_test_scaled
-        self.y_test = y_test
-        self.model_type = 'regression'
-        
-        return history.history
-    
-    def get_performance_metrics(self):
-        """Calculate current performance metrics"""
-        if self.model is None or self.X_test is None:
+        # Metrics cache, keyed on model version and test-set fingerprint
+        self._metrics_cache = {}
+        self._metrics_compute_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.metrics_cache_hits = 0
+        self.metrics_cache_misses = 0
+        
+        # Test-set predictions shared by metrics and samples, same key as the metrics cache
+        self._predictions_cache = {}
+        self._predictions_lock = threading.Lock()
+        
+        # Drift statistics of inference traffic per model name, for the version being served
+        self._drift_monitors = {}
+        self._drift_lock = threading.Lock()
+        self.drift_half_life_rows = int(os.environ.get('ML_DASHBOARD_DRIFT_HALF_LIFE_ROWS', 5000))
+        self.drift_min_rows = int(os.environ.get('ML_DASHBOARD_DRIFT_MIN_ROWS', 100))
+        
+        # Inference backend used by every prediction path (see inference_backends.py)
+        self.inference_backend_name = os.environ.get('ML_DASHBOARD_INFERENCE_BACKEND', 'numpy')
+        
+        # Optional on-disk registry (see model_registry.py)
+        self.registry = None
+        self.registry_check_interval = 1.0
+        self._registry_checked_at = 0.0
+        self._registry_sync_lock = threading.Lock()
+        
+    @property
+    def snapshot(self):
+        """Snapshot of the default model (None before any model exists)"""
+        try:
+            return self.get_snapshot()
+        except KeyError:
             return None
-            
-        predictions = self.model.predict(self.X_test, verbose=0)
-        
-        if self.model_type == 'classification':
-            y_pred = np.argmax(predictions, axis=1)
-            metrics = {
-                'accuracy': float(accuracy_score(self.y_test, y_pred)),
-                'precision': float(precision_score(self.y_test, y_pred, average='weighted')),
-                'recall': float(recall_score(self.y_test, y_pred, average='weighted')),
-                'f1_score': float(f1_score(self.y_test, y_pred, average='weighted'))
-            }
-        else:  # regression
-            y_pred = predictions.flatten()
-            metrics = {
-                'mse': float(mean_squared_error(self.y_test, y_pred)),
-                'rmse': float(np.sqrt(mean_squared_error(self.y_test, y_pred))),
-                'r2_score': float(r2_score(self.y_test, y_pred)),
-                'mae': float(np.mean(np.abs(self.y_test - y_pred)))
-            }
+
+    def get_snapshot(self, name=None):
+        """Snapshot of a named model, the default one if ``name`` is None.
+
+        An evicted model is reloaded from the registry; an unknown name
+        raises KeyError.
+        """
+        name = name or self.default_name
+        if name is None:
+            return None
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            snapshot = self._reload(name)
+        self._last_used[name] = time.monotonic()
+        return snapshot
+
+    def has_model(self, name):
+        """Whether ``name`` is served here or stored in the registry"""
+        return name in self._snapshots or name in self._catalog or self._stored_version(name) is not None
+
+    def is_resident(self, name=None):
+        """Whether a named model (the default one) is in memory, so using it cannot trigger a load"""
+        name = name or self.default_name
+        return name is not None and name in self._snapshots
+
+    def resident_snapshots(self):
+        """Snapshots currently held in memory"""
+        return list(self._snapshots.values())
+
+    def _served_versions(self):
+        """Registry version every stored model name should serve (see ModelRegistry.served_versions)"""
+        return self.registry.served_versions() if self.registry is not None else {}
+
+    def _stored_version(self, name):
+        """Registry version served under ``name``: the newest, or an activated rollback"""
+        return self._served_versions().get(name)
+
+    def _reload(self, name):
+        with self._reload_lock:
+            snapshot = self._snapshots.get(name)
+            if snapshot is not None:
+                return snapshot  # Reloaded by another thread while we waited
+            version = self._catalog.get(name)
+            if version is None or not self.registry.exists(version):
+                # Never stored, or pruned from the registry since: serve the stored one
+                version = self._stored_version(name)
+            if version is None:
+                raise KeyError(f'Unknown model: {name}')
+            snapshot = self.load_version(version, make_default=False)
+            self.reloads += 1
+            return snapshot
+
+    def _evict(self, keep):
+        """Drop least recently used models until the resident set fits the budget"""
+        if not self.memory_budget:
+            return
+        with self._publish_lock:
+            snapshots = dict(self._snapshots)
+            while sum(s.memory_bytes for s in snapshots.values()) > self.memory_budget:
+                # Only models that can be reloaded from the registry are evictable
+                candidates = [s for s in snapshots.values()
+                              if s.name != keep and s.registry_version is not None]
+                if not candidates:
+                    break
+                victim = min(candidates, key=lambda s: self._last_used.get(s.name, 0.0))
+                del snapshots[victim.name]
+                self._drop_cached(victim)
+                self.evictions += 1
+            self._snapshots = snapshots
+
+    def _drop_cached(self, snapshot):
+        key = (snapshot.version, snapshot.test_fingerprint)
+        self._metrics_cache = {k: v for k, v in self._metrics_cache.items() if k != key}
+        self._predictions_cache = {k: v for k, v in self._predictions_cache.items() if k != key}
+
+    def get_serving_stats(self):
+        """Named models, whether each is resident, and the memory budget"""
+        snapshots = self._snapshots
+        now = time.monotonic()
+        models = []
+        for name in sorted(set(self._catalog) | set(snapshots)):
+            snapshot = snapshots.get(name)
+            last_used = self._last_used.get(name)
+            models.append({
+                'name': name,
+                'default': name == self.default_name,
+                'resident': snapshot is not None,
+                'registry_version': snapshot.registry_version if snapshot else self._catalog.get(name),
+                'model_type': snapshot.model_type if snapshot else None,
+                'memory_bytes': snapshot.memory_bytes if snapshot else None,
+                'idle_seconds': now - last_used if last_used is not None else None
+            })
+        return {
+            'models': models,
+            'resident_bytes': sum(s.memory_bytes for s in snapshots.values()),
+            'memory_budget_bytes': self.memory_budget,
+            'evictions': self.evictions,
+            'reloads': self.reloads
+        }
+
+    # Read-only views of the default snapshot
+    @property
+    def model(self):
+        snapshot = self.snapshot
+        return snapshot.model if snapshot else None
+
+    @property
+    def model_type(self):
+        snapshot = self.snapshot
+        return snapshot.model_type if snapshot else None
+
+    @property
+    def scaler(self):
+        snapshot = self.snapshot
+        return snapshot.scaler if snapshot else None
+
+    @property
+    def X_test(self):
+        snapshot = self.snapshot
+        return snapshot.X_test if snapshot else None
+
+    @property
+    def y_test(self):
+        snapshot = self.snapshot
+        return snapshot.y_test if snapshot else None
+
+    @property
+    def backend(self):
+        snapshot = self.snapshot
+        return snapshot.backend if snapshot else None
+
+    @property
+    def model_version(self):
+        snapshot = self.snapshot
+        return snapshot.version if snapshot else 0
+
+    def _progress_callbacks(self, progress_callback, epochs):
+        """Wrap a plain progress function in a Keras callback"""
+        if progress_callback is None:
+            return []
         
-        return metrics
+        import tensorflow as tf
+        return [tf.keras.callbacks.LambdaCallback(
+            on_epoch_end=lambda epoch, logs: progress_callback(epoch, logs, epochs)
+        )]
+
+    def train_model(self, model_type, spec=None, progress_callback=None, telemetry=None, name=None):
+        """Train a model of the given type from a TrainingSpec and publish it
+        under ``name`` (the model type by default).
+
+        Returns ``(history, summary)`` where the summary holds the wall time
+        and training throughput of the run. A TrainingTelemetry recorder, if
+        given, receives per-batch and per-epoch samples while fit() runs.
+        """
+        spec = spec or TrainingSpec()
+        
+        # Stream training data (a generated 1000x20 dataset unless configured otherwise)
+        data = load_training_data(spec.data, model_type)
+        
+        model = build_model(spec, model_type, data.n_features, data.n_classes)
+        callbacks = self._progress_callbacks(progress_callback, spec.epochs)
+        if telemetry is not None:
+            callbacks.append(telemetry.keras_callback(spec.batch_size))
+        history, summary = fit_model(model, spec, data, callbacks=callbacks)
+        
+        # Store model and test data
+        self._publish_model(model, data.scaler, data.X_test, data.y_test, model_type, history, name=name)
+        
+        return history, summary
     
-    def get_predictions_sample(self, n=10):
-        """Get a sample of predictions for visualization"""
-        if self.model is None or self.X_test is None:
+    def _publish_model(self, model, scaler, X_test, y_test, model_type, history=None,
+                       registry_version=None, name=None, make_default=True):
+        """Build a snapshot of a model and swap it in atomically under its name"""
+        name = name or model_type
+        # Persist freshly trained models so restarts and other workers can load them
+        if self.registry is not None and registry_version is None:
+            history = {key: [float(v) for v in values] for key, values in (history or {}).items()}
+            registry_version = self.registry.save(model, scaler, X_test, y_test, model_type, history,
+                                                  name=name)
+            # Serve the memory-mapped copies, shared through the page cache with every worker
+            X_test, y_test = self.registry.load_test_set(registry_version)
+        
+        # Expensive preparation happens before the swap, outside any lock readers touch
+        backend = create_backend(self.inference_backend_name, model)
+        fingerprint = self._fingerprint(X_test, y_test)
+        X_test.setflags(write=False)
+        y_test.setflags(write=False)
+        memory_bytes = estimate_memory_bytes(model, X_test, y_test)
+        info = self._describe(model, backend, X_test, y_test, model_type, registry_version, name,
+                              memory_bytes)
+        
+        with self._publish_lock:
+            self._version_counter += 1
+            snapshot = ModelSnapshot(model, backend, scaler, X_test, y_test, model_type,
+                                     self._version_counter, fingerprint, registry_version, name,
+                                     memory_bytes, info)
+            previous = self._snapshots.get(name)
+            if previous is not None:
+                # Cached metrics and predictions of the replaced version can never be hit again
+                self._drop_cached(previous)
+            self._snapshots = dict(self._snapshots, **{name: snapshot})
+            self._catalog[name] = registry_version
+            self._last_used[name] = time.monotonic()
+            if make_default:
+                self.default_name = name
+        self._evict(keep=name)
+        return snapshot
+
+    @staticmethod
+    def _describe(model, backend, X_test, y_test, model_type, registry_version, name, memory_bytes):
+        """Model info served by /api/model/info, built once per published model and backend"""
+        return describe_model(model, backend, X_test.shape[1], extra={
+            'model': name,
+            'model_type': model_type,
+            'registry_version': registry_version,
+            'memory_bytes': memory_bytes,
+            'test_set_bytes': X_test.nbytes + y_test.nbytes
+        })
+
+    def attach_registry(self, registry):
+        self.registry = registry
+
+    def load_version(self, version=None, make_default=True):
+        """Publish a stored model version (the active one by default) without retraining"""
+        version = version or self.registry.active_version()
+        if version is None:
             return None
-            
-        # Get random sample
-        indices = np.random.choice(len(self.X_test), min(n, len(self.X_test)), replace=False)
-        sample_X = self.X_test[indices]
-        sample_y = self.y_test[indices]
         
-        predictions = self.model.predict(sample_X, verbose=0)
+        stored = self.registry.load(version)
+        return self._publish_model(stored['model'], stored['scaler'], stored['X_test'],
+                                   stored['y_test'], stored['model_type'],
+                                   registry_version=version,
+                                   name=stored['meta'].get('name', stored['model_type']),
+                                   make_default=make_default)
+
+    def activate_version(self, version):
+        """Make a stored version active for this and every other worker process"""
+        snapshot = self.load_version(version)
+        self.registry.activate(version)
+        return snapshot
+
+    def registry_sync_due(self):
+        """Whether the next sync_with_registry() would read the registry"""
+        return (self.registry is not None and
+                (self.snapshot is None or
+                 time.monotonic() - self._registry_checked_at >= self.registry_check_interval))
+
+    def sync_with_registry(self):
+        """Follow activations made by other processes (checked at most once per interval)"""
+        if self.registry is None:
+            return
+        now = time.monotonic()
+        waiting_for_model = self.snapshot is None
+        if not waiting_for_model and now - self._registry_checked_at < self.registry_check_interval:
+            return
+        # With nothing loaded yet, wait for a load already in flight rather than
+        # answering "no model"; otherwise let the thread that is checking do it
+        if not self._registry_sync_lock.acquire(blocking=waiting_for_model):
+            return
+        try:
+            snapshot = self.snapshot
+            if waiting_for_model and snapshot is not None:
+                return  # Loaded by another thread while we waited
+            self._registry_checked_at = time.monotonic()
+            active = self.registry.active_version()
+            current = snapshot.registry_version if snapshot else None
+            if active is not None and active != current:
+                self.load_version(active)
+            self._follow_named_models()
+        finally:
+            self._registry_sync_lock.release()
+
+    def _follow_named_models(self):
+        """Move the other named models to the version the registry serves for them.
+
+        Another process may have retrained or rolled one back; resident models
+        are reloaded, evicted ones will reload that version on their next use.
+        """
+        served = self._served_versions()
+        for name, version in list(self._catalog.items()):
+            target = served.get(name)
+            if name == self.default_name or target is None or target == version:
+                continue
+            if name not in self._snapshots:
+                self._catalog[name] = target
+                continue
+            try:
+                self.load_version(target, make_default=False)
+            except Exception as e:
+                print(f'Could not load {target} of model {name}: {e}')
+
+    def set_inference_backend(self, name):
+        """Select the inference backend and rebuild it for the current model"""
+        if name not in BACKENDS:
+            raise ValueError(f'Unknown inference backend: {name}')
         
-        if self.model_type == 'classification':
-            y_pred = np.argmax(predictions, axis=1)
-            confidence = np.max(predictions, axis=1)
+        with self._publish_lock:
+            self.inference_backend_name = name
+            # Same models and versions, so cached metrics stay valid; the measured latency does not
+            snapshots = {}
+            for key, snapshot in self._snapshots.items():
+                backend = create_backend(name, snapshot.model)
+                info = self._describe(snapshot.model, backend, snapshot.X_test, snapshot.y_test,
+                                      snapshot.model_type, snapshot.registry_version, snapshot.name,
+                                      snapshot.memory_bytes)
+                snapshots[key] = snapshot._replace(backend=backend, info=info)
+            self._snapshots = snapshots
+            snapshot = self._snapshots.get(self.default_name)
+            return snapshot.backend.name if snapshot is not None else name
+
+    def predict(self, X, snapshot=None):
+        """Run a model snapshot (the current one by default) through its inference backend"""
+        snapshot = snapshot or self.snapshot
+        start = time.perf_counter()
+        outputs = snapshot.backend.predict(X)
+        PREDICT_SECONDS.observe(time.perf_counter() - start, snapshot.backend.name, snapshot.model_type)
+        return outputs
+
+    @staticmethod
+    def _fingerprint(X, y):
+        """Cheap content hash of the test set"""
+        digest = hashlib.blake2b(digest_size=16)
+        for array in (X, y):
+            array = np.ascontiguousarray(array)
+            digest.update(str((array.shape, array.dtype.str)).encode())
+            digest.update(array.data)
+        return digest.hexdigest()
+
+    def _count_cache_lookup(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.metrics_cache_hits += 1
+            else:
+                self.metrics_cache_misses += 1
+
+    def get_performance_metrics(self, snapshot=None):
+        """Get performance metrics of a snapshot, computing them once per model version"""
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return None
+        
+        key = (snapshot.version, snapshot.test_fingerprint)
+        metrics = self._metrics_cache.get(key)
+        if metrics is None:
+            # Only misses serialize, so concurrent misses share one inference pass
+            with self._metrics_compute_lock:
+                cache = self._metrics_cache
+                metrics = cache.get(key)
+                if metrics is None:
+                    self._count_cache_lookup(hit=False)
+                    metrics = self._compute_performance_metrics(snapshot)
+                    cache[key] = metrics
+                else:
+                    self._count_cache_lookup(hit=True)
         else:
-            y_pred = predictions.flatten()
-            confidence = np.ones_like(y_pred)  # Placeholder for regression
+            self._count_cache_lookup(hit=True)
         
+        # Callers annotate the result (timestamps, noise), so hand out a copy
+        return dict(metrics)
+
+    def get_metrics_cache_stats(self):
+        """Hit/miss counters for the metrics cache"""
+        snapshot = self.snapshot
+        with self._stats_lock:
+            hits, misses = self.metrics_cache_hits, self.metrics_cache_misses
+        lookups = hits + misses
         return {
-            'actual': sample_y.tolist(),
-            'predicted': y_pred.tolist(),
-            'confidence': confidence.tolist(),
-            'indices': indices.tolist()
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'model_version': snapshot.version if snapshot else 0,
+            'test_fingerprint': snapshot.test_fingerprint if snapshot else None
         }
 
-# Initialize model manager
-ml_manager = MLModelManager()
+    def get_test_predictions(self, snapshot=None):
+        """Predictions over the whole test set of a snapshot, computed once per model version"""
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return None
+        
+        key = (snapshot.version, snapshot.test_fingerprint)
+        predictions = self._predictions_cache.get(key)
+        if predictions is None:
+            with self._predictions_lock:
+                cache = self._predictions_cache
+                predictions = cache.get(key)
+                if predictions is None:
+                    outputs = self._shared_test_outputs(snapshot)
+                    predictions = TestSetPredictions(snapshot.y_test, outputs, snapshot.model_type)
+                    cache[key] = predictions
+        return predictions
+
+    def _shared_test_outputs(self, snapshot):
+        """Test-set outputs of a snapshot; stored versions keep them in the registry
+        so worker processes map one copy instead of each predicting their own"""
+        version = snapshot.registry_version
+        if self.registry is None or version is None:
+            return self.predict(snapshot.X_test, snapshot)
+        try:
+            outputs = self.registry.load_predictions(version)
+            if outputs is not None and len(outputs) == len(snapshot.X_test):
+                return outputs
+            return self.registry.save_predictions(version, self.predict(snapshot.X_test, snapshot))
+        except (OSError, ValueError) as e:
+            # A pruned version or a full disk only costs the sharing
+            print(f'Could not share test-set predictions of {version}: {e}')
+            return self.predict(snapshot.X_test, snapshot)
+    
+    def _compute_performance_metrics(self, snapshot):
+        """Calculate performance metrics over the full test set of a snapshot"""
+        start = time.perf_counter()
+        predictions = self.get_test_predictions(snapshot)
+        
+        if snapshot.model_type == 'classification':
+            metrics = classification_metrics(snapshot.y_test, predictions.y_pred,
+                                             n_classes=predictions.outputs.shape[1])
+        else:  # regression
+            metrics = regression_metrics(snapshot.y_test, predictions.y_pred)
+        
+        METRICS_COMPUTE_SECONDS.observe(time.perf_counter() - start, snapshot.model_type)
+        return metrics
+    
+    def history_for(self, name=None):
+        """Ring-buffer history of a named model (the default one), created on first use"""
+        name = name or self.default_name
+        history = self._histories.get(name)
+        if history is None:
+            with self._history_lock:
+                history = self._histories.get(name)
+                if history is None:
+                    history = self._histories[name] = MetricHistory(capacity=self._history_capacity)
+        return history
+
+    @property
+    def history_points(self):
+        return sum(len(history) for history in list(self._histories.values()))
+
+    def record_performance(self, metrics, name=None):
+        """Append a metrics record to a model's ring-buffer history"""
+        self.history_for(name).append(metrics)
+
+    def get_performance_history(self, since=None, until=None, points=None, layout='rows', name=None):
+        """History in [since, until], downsampled to at most points entries, as
+        a list of records or (``layout='columnar'``) a dict of arrays"""
+        history = self.history_for(name)
+        if layout == 'columnar':
+            return history.to_columns(since, until, points)
+        return history.to_records(since, until, points)
+    
+    def drift_monitor_for(self, snapshot):
+        """Drift monitor of a snapshot's name, restarted when a different version is served.
+
+        The reference is the scaled test split, so evicting and reloading the
+        same registry version keeps the statistics gathered so far.
+        """
+        key = snapshot.registry_version or snapshot.version
+        entry = self._drift_monitors.get(snapshot.name)
+        if entry is None or entry[0] != key:
+            with self._drift_lock:
+                entry = self._drift_monitors.get(snapshot.name)
+                if entry is None or entry[0] != key:
+                    monitor = DriftMonitor(DriftReference(snapshot.X_test),
+                                           half_life_rows=self.drift_half_life_rows,
+                                           min_rows=self.drift_min_rows)
+                    entry = self._drift_monitors[snapshot.name] = (key, monitor)
+        return entry[1]
+    
+    def drift_monitors(self):
+        """Drift monitor of every model name that has one"""
+        return {name: monitor for name, (_, monitor) in list(self._drift_monitors.items())}
+    
+    def get_drift_scores(self, snapshot=None):
+        """Drift scores of the inference traffic a snapshot has served"""
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return None
+        return self.drift_monitor_for(snapshot).scores()
+    
+    def predict_rows(self, rows, name=None):
+        """Scale raw feature rows with the fitted scaler, record them for drift
+        monitoring and run the model on them"""
+        snapshot = self.get_snapshot(name)
+        if snapshot is None:
+            raise RuntimeError('No model trained yet')
+        
+        scaled = snapshot.scaler.transform(rows)
+        # Called once per micro-batch, so the statistics update is vectorised over it
+        self.drift_monitor_for(snapshot).observe(scaled)
+        outputs = self.predict(scaled, snapshot)
+        return outputs, snapshot.model_type
+    
+    def get_predictions_sample(self, n=10, snapshot=None, strategy='stratified', seed=0, cursor=0):
+        """Get a sample of predictions for visualization.
+
+        The same (strategy, seed) always yields the same rows; ``cursor``
+        pages through the rest of that order. No inference happens here
+        once the test set has been predicted for this model version.
+        """
+        predictions = self.get_test_predictions(snapshot)
+        if predictions is None:
+            return None
+        
+        # Already columnar; arrays are left to the response encoder
+        return predictions.sample(n, strategy, seed, cursor)
+
+# Initialize model manager and background training queue
+ml_manager = MLModelManager(
+    memory_budget=int(float(os.environ.get('ML_DASHBOARD_MODEL_MEMORY_MB', 1024)) * 1024 * 1024)
+)
+broadcaster = MetricsBroadcaster()
+training_queue = TrainingJobQueue(
+    max_workers=int(os.environ.get('ML_DASHBOARD_TRAINING_WORKERS', 1)),
+    publish=broadcaster.publish,
+    # Set by serve.py so every worker process can report on every job
+    state_dir=os.environ.get('ML_DASHBOARD_JOB_STATE_DIR') or None
+)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get('ML_DASHBOARD_DATA_DIR', os.path.join(BASE_DIR, 'data'))
+registry = ModelRegistry(
+    os.environ.get('ML_DASHBOARD_MODEL_DIR', os.path.join(BASE_DIR, 'models')),
+    keep=int(os.environ.get('ML_DASHBOARD_MODEL_KEEP', 20))
+)
+ml_manager.attach_registry(registry)
+# One micro-batcher per served model name, created on first /api/predict for it
+predict_batchers = {}
+_predict_batchers_lock = threading.Lock()
+
+def predict_batcher_for(name):
+    batcher = predict_batchers.get(name)
+    if batcher is None:
+        with _predict_batchers_lock:
+            batcher = predict_batchers.get(name)
+            if batcher is None:
+                batcher = predict_batchers[name] = MicroBatcher(
+                    lambda rows: ml_manager.predict_rows(rows, name),
+                    max_batch_size=int(os.environ.get('ML_DASHBOARD_PREDICT_MAX_BATCH', 256)),
+                    max_wait_ms=float(os.environ.get('ML_DASHBOARD_PREDICT_MAX_WAIT_MS', 5))
+                )
+    return batcher
+sweep_manager = SweepManager(
+    max_workers=int(os.environ.get('ML_DASHBOARD_SWEEP_WORKERS', 0)) or None,
+    publish=broadcaster.publish,
+    state_dir=os.environ.get('ML_DASHBOARD_JOB_STATE_DIR') or None
+)
+
+request_profiler = RequestProfiler(
+    enabled=os.environ.get('ML_DASHBOARD_PROFILING', '0') == '1',
+    sample_rate=float(os.environ.get('ML_DASHBOARD_PROFILE_SAMPLE_RATE', 0)),
+    max_per_minute=int(os.environ.get('ML_DASHBOARD_PROFILE_MAX_PER_MINUTE', 10)),
+    max_profiles=int(os.environ.get('ML_DASHBOARD_PROFILE_KEEP', 50)),
+    token=os.environ.get('ML_DASHBOARD_PROFILE_TOKEN')
+)
+
+# Bodies at least this large are gzip/brotli-compressed when the client accepts it; -1 disables
+_COMPRESS_MIN_BYTES = int(os.environ.get('ML_DASHBOARD_COMPRESS_MIN_BYTES', 1024))
 
-@app.route('/')
+# State that is already tracked elsewhere is read only when /metrics is scraped
+metrics_registry.callback(
+    'ml_dashboard_metrics_cache_lookups_total', 'Performance metrics cache lookups by result',
+    lambda: {('hit',): ml_manager.get_metrics_cache_stats()['hits'],
+             ('miss',): ml_manager.get_metrics_cache_stats()['misses']},
+    ('result',), type_name='counter')
+metrics_registry.callback(
+    'ml_dashboard_metrics_cache_hit_ratio', 'Fraction of metrics cache lookups served from the cache',
+    lambda: ml_manager.get_metrics_cache_stats()['hit_rate'])
+metrics_registry.callback(
+    'ml_dashboard_predict_queue_depth', 'Requests waiting in the /api/predict micro-batcher',
+    lambda: sum(batcher.queue_depth for batcher in list(predict_batchers.values())))
+metrics_registry.callback(
+    'ml_dashboard_training_jobs_active', 'Training jobs queued or running',
+    training_queue.pending_count)
+metrics_registry.callback(
+    'ml_dashboard_stream_subscribers', 'Connected Server-Sent Events clients',
+    lambda: broadcaster.subscriber_count)
+metrics_registry.callback(
+    'ml_dashboard_history_points', 'Points held in the raw performance history ring',
+    lambda: ml_manager.history_points)
+def _drift_psi_max():
+    scores = {name: monitor.scores() for name, monitor in ml_manager.drift_monitors().items()}
+    # Models without enough traffic yet have no score to report
+    return {(name,): s['psi_max'] for name, s in scores.items() if s['features'] is not None}
+
+metrics_registry.callback(
+    'ml_dashboard_drift_psi_max', 'Largest per-feature PSI of recent inference traffic, by model',
+    _drift_psi_max, ('model',))
+metrics_registry.callback(
+    'ml_dashboard_drift_observed_rows', 'Inference rows folded into the drift statistics, by model',
+    lambda: {(name,): monitor.count for name, monitor in ml_manager.drift_monitors().items()},
+    ('model',))
+metrics_registry.callback(
+    'ml_dashboard_model_version', 'In-process version counter of the served model',
+    lambda: ml_manager.model_version)
+
+# Routes that serve from the current model; only these trigger loading a stored one
+MODEL_ENDPOINTS = {
+    'dashboard.get_performance',
+    'dashboard.get_predictions',
+    'dashboard.predict',
+    'dashboard.get_model_info',
+    'dashboard.get_drift',
+    'dashboard.reset_drift'
+}
+
+@bp.before_app_request
+def before_request():
+    """Start background work on first use and follow models activated elsewhere"""
+    start_background_tasks()
+    if request.endpoint in MODEL_ENDPOINTS:
+        ml_manager.sync_with_registry()
+
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/api/train/classification', methods=['POST'])
+def _submit_training(job_type, train_fn, model_name=None):
+    """Queue a training job and describe it in the response"""
+    job, created = training_queue.submit(job_type, train_fn, model_name)
+    label = job_type.capitalize() if job.model_name == job_type else f'{job_type.capitalize()} ({job.model_name})'
+    if created:
+        message = f'{label} model training started'
+    else:
+        message = f'{label} model training already in progress'
+    return jsonify({
+        'status': 'accepted',
+        'message': message,
+        'job_id': job.id,
+        'job': job.to_dict(include_history=False)
+    }), 202
+
+def _training_spec():
+    """Training spec from the optional JSON body (data options under "data")"""
+    spec = TrainingSpec.from_dict(request.get_json(silent=True) or {}, data_root=DATA_DIR)
+    if spec.data.path:
+        spec.data.resolve_files()  # Reject bad paths now rather than in the job
+    return spec
+
+def _selected_snapshot():
+    """Model chosen by the ``model`` query argument (the default one if absent).
+
+    Returns ``(snapshot, None)`` or ``(None, error_response)``.
+    """
+    name = request.args.get('model') or None
+    try:
+        snapshot = ml_manager.get_snapshot(name)
+    except KeyError:
+        return None, (jsonify({'status': 'error', 'message': f'Model not found: {name}'}), 404)
+    if snapshot is None:
+        return None, (jsonify({'status': 'error', 'message': 'No model trained yet'}), 400)
+    return snapshot, None
+
+def _train(model_type):
+    try:
+        try:
+            spec = _training_spec()
+            name = validate_model_name(request.args.get('model') or model_type)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
+        return _submit_training(model_type, lambda progress, telemetry: ml_manager.train_model(
+            model_type, spec, progress, telemetry, name=name), name)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/train/classification', methods=['POST'])
 def train_classification():
-    """Train a classification model"""
+    """Queue training of a classification model"""
+    return _train('classification')
+
+@bp.route('/api/train/regression', methods=['POST'])
+def train_regression():
+    """Queue training of a regression model"""
+    return _train('regression')
+
+@bp.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List recent training jobs"""
     try:
-        history = ml_manager.create_classification_model()
         return jsonify({
             'status': 'success',
-            'message': 'Classification model trained successfully',
-            'history': history
+            'jobs': [job.to_dict(include_history=False) for job in training_queue.list_jobs()]
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/api/train/regression', methods=['POST'])
-def train_regression():
-    """Train a regression model"""
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get status, per-epoch progress and final history of a training job"""
     try:
-        history = ml_manager.create_regression_model()
+        job = training_queue.get(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        
         return jsonify({
             'status': 'success',
-            'message': 'Regression model trained successfully',
-            'history': history
+            'job': job.to_dict()
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/api/performance', methods=['GET'])
+@bp.route('/api/jobs/<job_id>/telemetry', methods=['GET'])
+def get_job_telemetry(job_id):
+    """Get the per-epoch and sampled per-batch telemetry of a training job"""
+    try:
+        job = training_queue.get(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        
+        since_epoch = request.args.get('since_epoch', 0, type=int)
+        return jsonify({
+            'status': 'success',
+            'telemetry': job.telemetry.to_dict(since_epoch)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/performance', methods=['GET'])
 def get_performance():
     """Get current model performance metrics"""
     try:
-        metrics = ml_manager.get_performance_metrics()
-        if metrics is None:
-            return jsonify({'status': 'error', 'message': 'No model trained yet'}), 400
+        snapshot, error = _selected_snapshot()
+        if error:
+            return error
+        metrics = ml_manager.get_performance_metrics(snapshot)
         
         # Add timestamp
         metrics['timestamp'] = datetime.now().isoformat()
         
-        # Store in history
-        ml_manager.performance_history.append(metrics)
-        if len(ml_manager.performance_history) > 100:  # Keep last 100 records
-            ml_manager.performance_history.pop(0)
+        # Store scalar metrics in history
+        ml_manager.record_performance(scalar_metrics(metrics), snapshot.name)
         
         return jsonify({
             'status': 'success',
             'metrics': metrics,
-            'model_type': ml_manager.model_type
+            'model': snapshot.name,
+            'model_type': snapshot.model_type
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/api/predictions', methods=['GET'])
+@bp.route('/api/performance/cache', methods=['GET'])
+def get_performance_cache_stats():
+    """Get hit/miss counters of the performance metrics cache"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'cache': ml_manager.get_metrics_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/predictions', methods=['GET'])
 def get_predictions():
     """Get sample predictions for visualization"""
     try:
         n = request.args.get('n', 10, type=int)
-        predictions = ml_manager.get_predictions_sample(n)
-        if predictions is None:
-            return jsonify({'status': 'error', 'message': 'No model trained yet'}), 400
+        strategy = request.args.get('strategy', 'stratified')
+        seed = request.args.get('seed', 0, type=int)
+        cursor = request.args.get('cursor', 0, type=int)
+        snapshot, error = _selected_snapshot()
+        if error:
+            return error
+        try:
+            predictions = ml_manager.get_predictions_sample(n, snapshot, strategy, seed, cursor)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
         
-        return jsonify({
+        total = len(snapshot.y_test)
+        return encoded_response({
             'status': 'success',
             'predictions': predictions,
-            'model_type': ml_manager.model_type
+            'model': snapshot.name,
+            'model_type': snapshot.model_type,
+            'strategy': strategy,
+            'seed': seed,
+            'cursor': cursor,
+            'next_cursor': cursor + n if cursor + n < total else None,
+            'total': total
+        }, table='predictions')
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request latency, hot-path timings and queue depths in Prometheus text format"""
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _profile_or_404(profile_id):
+    if not request_profiler.authorized():
+        return None, (jsonify({'status': 'error', 'message': 'Profiling is not enabled'}), 404)
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        return None, (jsonify({'status': 'error', 'message': 'Profile not found'}), 404)
+    return profile, None
+
+@bp.route('/api/debug/profiles', methods=['GET'])
+def list_profiles():
+    """List captured request profiles"""
+    try:
+        if not request_profiler.authorized():
+            return jsonify({'status': 'error', 'message': 'Profiling is not enabled'}), 404
+        
+        return jsonify({
+            'status': 'success',
+            'profiler': request_profiler.get_stats(),
+            'profiles': [profile.to_dict() for profile in request_profiler.list_profiles()]
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/api/history/performance', methods=['GET'])
-def get_performance_history():
-    """Get performance history for trend visualization"""
+@bp.route('/api/debug/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Text report of one profile (?sort=cumulative|tottime|calls&limit=40)"""
     try:
+        profile, error = _profile_or_404(profile_id)
+        if error:
+            return error
+        
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({'status': 'error', 'message': f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+        limit = min(max(1, request.args.get('limit', 40, type=int)), 500)
+        
         return jsonify({
             'status': 'success',
-            'history': ml_manager.performance_history
+            'profile': profile.to_dict(),
+            'report': profile.report(sort, limit)
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/api/model/info', methods=['GET'])
-def get_model_info():
-    """Get model information and architecture"""
+@bp.route('/api/debug/profiles/<profile_id>/download', methods=['GET'])
+def download_profile(profile_id):
+    """Raw pstats file, readable with pstats, snakeviz or gprof2dot"""
     try:
-        if ml_manager.model is None:
-            return jsonify({'status': 'error', 'message': 'No model trained yet'}), 400
-        
-        # Get model summary
-        summary = []
-        for layer in ml_manager.model.layers:
-            summary.append({
-                'name': layer.name,
-                'type': layer.__class__.__name__,
-                'output_shape': str(layer.output_shape),
-                'param_count': layer.count_params()
-            })
+        profile, error = _profile_or_404(profile_id)
+        if error:
+            return error
         
+        return Response(profile.raw, mimetype='application/octet-stream', headers={
+            'Content-Disposition': f'attachment; filename=profile-{profile.id}.prof'
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/debug/profiles/<profile_id>/trace', methods=['GET'])
+def download_profile_trace(profile_id):
+    """TensorFlow op trace of a profile (TensorBoard profile plugin format, zipped)"""
+    try:
+        profile, error = _profile_or_404(profile_id)
+        if error:
+            return error
+        if profile.tf_trace is None:
+            return jsonify({'status': 'error', 'message': 'Profile has no TensorFlow trace'}), 404
+        
+        return Response(request_profiler.tf_trace_archive(profile), mimetype='application/zip', headers={
+            'Content-Disposition': f'attachment; filename=tf-trace-{profile.id}.zip'
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/stream/scheduler', methods=['GET'])
+def get_scheduler_stats():
+    """Interval, tick timings and skipped ticks of the real-time metrics scheduler"""
+    try:
         return jsonify({
             'status': 'success',
-            'model_type': ml_manager.model_type,
-            'total_params': ml_manager.model.count_params(),
-            'layers': summary
+            'subscribers': broadcaster.subscriber_count,
+            'scheduler': metrics_scheduler.get_stats()
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-def simulate_real_time_data():
-    """Simulate real-time data updates"""
-    while True:
-        if ml_manager.model is not None:
-            # Add some noise to simulate real-time performance changes
-            metrics = ml_manager.get_performance_metrics()
-            if metrics:
-                # Add small random variations
-                for key in metrics:
-                    if key != 'timestamp':
-                        noise = random.uniform(-0.01, 0.01)
-                        metrics[key] = max(0, min(1, metrics[key] + noise))
-                
-                metrics['timestamp'] = datetime.now().isoformat()
-                ml_manager.performance_history.append(metrics.copy())
-                
-                # Keep only last 100 records
-                if len(ml_manager.performance_history) > 100:
-                    ml_manager.performance_history.pop(0)
-        
-        time.sleep(5)  # Update every 5 seconds
-
-# Start real-time data simulation in background
-real_time_thread = threading.Thread(target=simulate_real_time_data, daemon=True)
-real_time_thread.start()
+@bp.route('/api/stream', methods=['GET'])
+def stream_updates():
+    """Server-Sent Events stream of live metrics and predictions"""
+    return Response(broadcaster.stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
-if __name__ == '__main__':
+def _parse_prediction_rows(snapshot):
+    """Read a batch of feature rows from a JSON or binary request body"""
+    n_features = getattr(snapshot.scaler, 'n_features_in_', None)
+    content_type = request.mimetype
+    
+    if content_type == 'application/x-npy':
+        rows = np.load(io.BytesIO(request.get_data()), allow_pickle=False)
+        try:
+            rows = rows.astype(np.float32)
+        except (TypeError, ValueError):
+            raise ValueError(f'Rows must be numeric, got dtype {rows.dtype}')
+    elif content_type == 'application/octet-stream':
+        # Raw little-endian float32 values, row-major
+        rows = np.frombuffer(request.get_data(), dtype='<f4')
+        if n_features and rows.size % n_features:
+            raise ValueError(f'Binary payload is not a whole number of {n_features}-feature rows')
+        rows = rows.reshape(-1, n_features) if n_features else rows.reshape(1, -1)
+    else:
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            raise ValueError('Expected a JSON object with a "rows" field')
+        rows = np.asarray(body.get('rows', []), dtype=np.float32)
+    
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    if rows.ndim != 2 or len(rows) == 0:
+        raise ValueError('Expected a non-empty 2-D batch of rows')
+    if n_features and rows.shape[1] != n_features:
+        raise ValueError(f'Expected {n_features} features per row, got {rows.shape[1]}')
+    return rows
+
+@bp.route('/api/predict', methods=['POST'])
+def predict():
+    """Predict on caller-supplied rows through the micro-batcher"""
+    try:
+        snapshot, error = _selected_snapshot()
+        if error:
+            return error
+        
+        try:
+            rows = _parse_prediction_rows(snapshot)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
+        started = time.perf_counter()
+        try:
+            outputs, model_type = predict_batcher_for(snapshot.name).predict(rows)
+        except queue.Full:
+            return jsonify({'status': 'error', 'message': 'Prediction queue is full'}), 503
+        
+        if model_type == 'classification':
+            result = {
+                'predicted': np.argmax(outputs, axis=1).tolist(),
+                'confidence': np.max(outputs, axis=1).tolist()
+            }
+        else:
+            result = {'predicted': outputs.ravel().tolist()}
+        
+        return jsonify({
+            'status': 'success',
+            'model': snapshot.name,
+            'model_type': model_type,
+            'predictions': result,
+            'latency_ms': (time.perf_counter() - started) * 1000.0
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/predict/stats', methods=['GET'])
+def get_predict_stats():
+    """Get micro-batcher latency and batch-fill histograms of one model"""
+    try:
+        name = request.args.get('model') or ml_manager.default_name
+        batcher = predict_batchers.get(name)
+        return jsonify({
+            'status': 'success',
+            'model': name,
+            'stats': batcher.get_stats() if batcher is not None else None
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/drift', methods=['GET'])
+def get_drift():
+    """Get drift scores of a model's inference traffic against its training reference"""
+    try:
+        snapshot, error = _selected_snapshot()
+        if error:
+            return error
+        
+        monitor = ml_manager.drift_monitor_for(snapshot)
+        return jsonify({
+            'status': 'success',
+            'model': snapshot.name,
+            'model_type': snapshot.model_type,
+            'drift': monitor.scores(),
+            'quantiles': monitor.quantiles() if request.args.get('quantiles') == '1' else None
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/drift/reset', methods=['POST'])
+def reset_drift():
+    """Discard the traffic statistics gathered so far for a model"""
+    try:
+        snapshot, error = _selected_snapshot()
+        if error:
+            return error
+        
+        ml_manager.drift_monitor_for(snapshot).reset()
+        return jsonify({'status': 'success', 'model': snapshot.name})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/sweeps', methods=['POST'])
+def create_sweep():
+    """Queue a hyperparameter sweep"""
+    try:
+        try:
+            sweep = sweep_manager.create(request.get_json(silent=True) or {}, data_root=DATA_DIR)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
+        return jsonify({
+            'status': 'accepted',
+            'message': f'Sweep of {len(sweep.candidates)} configurations queued',
+            'sweep_id': sweep.id,
+            'sweep': sweep.to_dict(include_trials=False)
+        }), 202
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/sweeps', methods=['GET'])
+def list_sweeps():
+    """List recent sweeps with their leaderboards"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'sweeps': [sweep.to_dict(include_trials=False) for sweep in sweep_manager.list_sweeps()]
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/sweeps/<sweep_id>', methods=['GET'])
+def get_sweep(sweep_id):
+    """Get a sweep's trials and full leaderboard"""
+    try:
+        sweep = sweep_manager.get(sweep_id)
+        if sweep is None:
+            return jsonify({'status': 'error', 'message': 'Sweep not found'}), 404
+        
+        return jsonify({
+            'status': 'success',
+            'sweep': sweep.to_dict(limit=None)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/sweeps/<sweep_id>/cancel', methods=['POST'])
+def cancel_sweep(sweep_id):
+    """Stop scheduling further trials of a sweep"""
+    try:
+        sweep = sweep_manager.cancel(sweep_id)
+        if sweep is None:
+            return jsonify({'status': 'error', 'message': 'Sweep not found'}), 404
+        
+        return jsonify({
+            'status': 'success',
+            'sweep': sweep.to_dict(include_trials=False)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/models', methods=['GET'])
+def list_models():
+    """List stored model versions"""
+    try:
+        snapshot = ml_manager.snapshot
+        return jsonify({
+            'status': 'success',
+            'active': registry.active_version(),
+            'loaded': snapshot.registry_version if snapshot else None,
+            'serving': ml_manager.get_serving_stats(),
+            'models': registry.list_versions()
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/models/<version>/activate', methods=['POST'])
+def activate_model(version):
+    """Serve a stored model version in every worker"""
+    try:
+        if not registry.exists(version):
+            return jsonify({'status': 'error', 'message': 'Model version not found'}), 404
+        
+        snapshot = ml_manager.activate_version(version)
+        return jsonify({
+            'status': 'success',
+            'message': f'Model {version} activated',
+            'model': snapshot.name,
+            'model_type': snapshot.model_type
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/inference/backend', methods=['GET', 'POST'])
+def inference_backend():
+    """Get or select the inference backend used for predictions"""
+    try:
+        if request.method == 'POST':
+            body = request.get_json(silent=True) or {}
+            try:
+                ml_manager.set_inference_backend(body.get('backend', ''))
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+        
+        backend = ml_manager.backend
+        return jsonify({
+            'status': 'success',
+            'requested': ml_manager.inference_backend_name,
+            'active': backend.name if backend is not None else None,
+            'available': sorted(BACKENDS)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/history/performance', methods=['GET'])
+def get_performance_history():
+    """Get performance history for trend visualization"""
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        points = request.args.get('points', 500, type=int)
+        name = request.args.get('model') or None
+        if name is not None and not ml_manager.has_model(name):
+            return jsonify({'status': 'error', 'message': f'Model not found: {name}'}), 404
+        try:
+            layout = get_layout()
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        try:
+            history = ml_manager.get_performance_history(since, until, points, layout, name)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': f'Invalid time range: {e}'}), 400
+        
+        return encoded_response({
+            'status': 'success',
+            'layout': layout,
+            'history': history
+        }, table='history' if layout == 'columnar' else None)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@bp.route('/api/model/info', methods=['GET'])
+def get_model_info():
+    """Get model architecture, size, FLOPs and measured latency (described once per published model)"""
+    try:
+        snapshot, error = _selected_snapshot()
+        if error:
+            return error
+        
+        info = snapshot.info
+        response = current_app.response_class(info.body, mimetype='application/json')
+        response.set_etag(info.etag, weak=True)
+        # Revalidate on every use: an unchanged model answers 304 without a body
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Snapshot version whose prediction sample was last published, by model name
+_published_predictions = {}
+
+def publish_metrics_tick():
+    """One real-time update: metrics, drift scores (and new prediction samples) of every resident model"""
+    # Follow models activated by another worker
+    try:
+        ml_manager.sync_with_registry()
+    except Exception as e:
+        print(f'Could not load a stored model: {e}')
+    
+    # Evicted models are not reloaded just to tick them
+    for snapshot in ml_manager.resident_snapshots():
+        metrics = ml_manager.get_performance_metrics(snapshot)
+        if not metrics:
+            continue
+        
+        # Test-set metrics are fixed per version; what changes over time is the traffic
+        current = scalar_metrics(metrics)
+        drift = ml_manager.get_drift_scores(snapshot)
+        if drift['features'] is not None:
+            current['drift_psi_max'] = drift['psi_max']
+            current['drift_ks_max'] = drift['ks_max']
+        current['timestamp'] = datetime.now().isoformat()
+        ml_manager.record_performance(current.copy(), snapshot.name)
+        
+        # Computed once per tick and shared by every subscriber
+        metrics.update(current)
+        broadcaster.publish('metrics', {
+            'metrics': metrics,
+            'model': snapshot.name,
+            'model_type': snapshot.model_type
+        }, key=snapshot.name)
+        broadcaster.publish('drift', {
+            'drift': drift,
+            'model': snapshot.name,
+            'model_type': snapshot.model_type
+        }, key=snapshot.name)
+        
+        # The default sample is fixed per model version; new subscribers
+        # get the last one replayed, so only publish when the model changes
+        if snapshot.version != _published_predictions.get(snapshot.name):
+            predictions = ml_manager.get_predictions_sample(20, snapshot)
+            broadcaster.publish('predictions', {
+                'predictions': predictions,
+                'model': snapshot.name,
+                'model_type': snapshot.model_type
+            }, key=snapshot.name)
+            _published_predictions[snapshot.name] = snapshot.version
+
+# Ticks only while at least one dashboard is connected to /api/stream
+metrics_scheduler = MetricsScheduler(
+    publish_metrics_tick,
+    active=lambda: broadcaster.subscriber_count > 0,
+    interval=float(os.environ.get('ML_DASHBOARD_TICK_SECONDS', 5)),
+    max_interval=float(os.environ.get('ML_DASHBOARD_TICK_MAX_SECONDS', 60)),
+    histogram=TICK_SECONDS
+)
+broadcaster.on_subscribe(metrics_scheduler.wake)
+metrics_registry.callback(
+    'ml_dashboard_scheduler_interval_seconds', 'Current real-time tick interval',
+    lambda: metrics_scheduler.interval)
+metrics_registry.callback(
+    'ml_dashboard_scheduler_ticks_skipped_total', 'Ticks skipped because the previous one overran',
+    lambda: metrics_scheduler.skipped, type_name='counter')
+
+def start_background_tasks():
+    """Start the real-time metrics scheduler once per process (stopped at exit)"""
+    if not metrics_scheduler.running and metrics_scheduler.start():
+        atexit.register(stop_background_tasks)
+
+def stop_background_tasks():
+    """Stop the real-time metrics scheduler and wait for its current tick"""
+    metrics_scheduler.stop()
+
+def create_app():
+    """Application factory: cheap to call, starts no threads and imports no TensorFlow"""
+    flask_app = Flask(__name__)
+    flask_app.json = json_provider_class()(flask_app)
+    CORS(flask_app)
+    flask_app.register_blueprint(bp)
+    instrument_app(flask_app, REQUEST_SECONDS, JSON_SECONDS)
+    profile_requests(flask_app, request_profiler)
+    # Registered last so it runs first and the latency histogram includes it
+    compress_responses(flask_app, _COMPRESS_MIN_BYTES)
+    return flask_app
+
+app = create_app()
+
+def main():
+    """Console entry point (ml-dashboard)"""
+    start_background_tasks()
     app.run(debug=True, host='0.0.0.0', port=5000)
+
+if __name__ == '__main__':
+    main()
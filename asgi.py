@@ -0,0 +1,238 @@
+"""
+ASGI entry point
+Serves the Flask app from an event loop: cheap in-memory reads are answered
+on the loop itself, inference and metric work runs on a dedicated compute
+executor and other blocking work on an I/O executor, so a slow request never
+queues a cheap one behind it. /api/stream is served natively, without a
+thread per connection.
+
+    uvicorn asgi:application --workers 4
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.exceptions import HTTPException
+
+from app import (MODEL_ENDPOINTS, app as flask_app, broadcaster, ml_manager, start_background_tasks,
+                 stop_background_tasks)
+
+# Answered on the event loop: small reads of state already in memory. Job reads
+# (state files of other workers), history (unknown names list the registry),
+# /metrics and sweep leaderboards are larger or may touch the disk, so they go
+# to the I/O executor. Drift builds its reference quantiles over the test set
+# on first use, so it is computed like the metrics
+INLINE_ENDPOINTS = {
+    'dashboard.get_performance_cache_stats',
+    'dashboard.get_scheduler_stats',
+    'dashboard.get_predict_stats',
+    'dashboard.get_model_info'
+}
+
+# Inference, metric computation and model loading
+COMPUTE_ENDPOINTS = {
+    'dashboard.get_performance',
+    'dashboard.get_predictions',
+    'dashboard.get_drift',
+    'dashboard.activate_model',
+    'dashboard.inference_backend'
+}
+
+STREAM_PATH = '/api/stream'
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+    (b'access-control-allow-origin', b'*')
+]
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its full request body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """Run a WSGI app to completion; returns (status code, header list, body bytes)"""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                               for name, value in headers]
+        return chunks.append
+
+    iterable = wsgi_app(environ, start_response)
+    try:
+        chunks.extend(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body.extend(message.get('body', b''))
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class ASGIAdapter:
+    """ASGI 3 application wrapping a WSGI app with per-route executors.
+
+    Requests for ``inline`` endpoints run on the event loop; ``compute``
+    endpoints run on ``compute_threads`` threads and everything else on
+    ``io_threads`` threads. Model-serving endpoints are only answered inline
+    while their model is resident and no registry check is due, as loading
+    a model would stall the loop.
+    """
+
+    def __init__(self, wsgi_app, inline=INLINE_ENDPOINTS, compute=COMPUTE_ENDPOINTS,
+                 compute_threads=None, io_threads=32):
+        self.wsgi_app = wsgi_app
+        self.inline = set(inline)
+        self.compute = set(compute)
+        self.compute_executor = ThreadPoolExecutor(max_workers=compute_threads or os.cpu_count() or 1,
+                                                   thread_name_prefix='asgi-compute')
+        self.io_executor = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix='asgi-io')
+        # Requests dispatched per mode; only touched on the event loop
+        self.counts = {'inline': 0, 'compute': 0, 'io': 0, 'stream': 0}
+
+    def route(self, environ):
+        """'inline', 'compute' or 'io' for a request"""
+        adapter = self.wsgi_app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return 'inline'  # 404/405 never reach a view
+        if endpoint in self.compute:
+            return 'compute'
+        if endpoint not in self.inline:
+            return 'io'
+        if endpoint in MODEL_ENDPOINTS:
+            model = parse_qs(environ['QUERY_STRING']).get('model', [None])[0]
+            if not ml_manager.is_resident(model) or ml_manager.registry_sync_due():
+                return 'compute'
+        return 'inline'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        body = await read_body(receive)
+        if body is None:
+            return  # Client left before sending the whole request
+        if scope['method'] == 'GET' and scope['path'] == STREAM_PATH:
+            return await self._stream(receive, send)
+
+        environ = build_environ(scope, body)
+        mode = self.route(environ)
+        self.counts[mode] += 1
+        if mode == 'inline':
+            # Compressing is CPU work the loop should not do; these bodies are small
+            environ.pop('HTTP_ACCEPT_ENCODING', None)
+            status, headers, content = call_wsgi(self.wsgi_app, environ)
+        else:
+            executor = self.compute_executor if mode == 'compute' else self.io_executor
+            status, headers, content = await asyncio.get_running_loop().run_in_executor(
+                executor, call_wsgi, self.wsgi_app, environ)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _stream(self, receive, send):
+        """Server-Sent Events straight from the broadcaster until the client disconnects"""
+        self.counts['stream'] += 1
+        start_background_tasks()
+        stream = broadcaster.astream()
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        try:
+            while True:
+                message = asyncio.ensure_future(stream.__anext__())
+                await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    message.cancel()
+                    try:
+                        await message
+                    except (asyncio.CancelledError, StopAsyncIteration):
+                        pass
+                    break
+                await send({'type': 'http.response.body', 'body': message.result().encode(),
+                            'more_body': True})
+        except OSError:
+            pass  # Connection dropped mid-send
+        finally:
+            disconnected.cancel()
+            await stream.aclose()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the active model before the first request, off the loop
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(self.compute_executor, ml_manager.sync_with_registry)
+                except Exception as e:
+                    print(f'Could not load the active model: {e}')
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                stop_background_tasks()
+                self.compute_executor.shutdown(wait=False)
+                self.io_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = ASGIAdapter(
+    flask_app,
+    compute_threads=int(os.environ.get('ML_DASHBOARD_ASGI_COMPUTE_THREADS', 0)) or None,
+    io_threads=int(os.environ.get('ML_DASHBOARD_ASGI_IO_THREADS', 32))
+)
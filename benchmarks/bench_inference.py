@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Inference backend benchmark
+Compares model.predict() with the fast inference backends at batch sizes
+from 1 to 100k rows on the dashboard's default MLP architecture
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import training_spec  # noqa: E402
+from inference_backends import BACKENDS  # noqa: E402
+from training_spec import TrainingSpec  # noqa: E402
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def build_model(n_features=20, n_outputs=3):
+    """Default TrainingSpec classification stack (weights left untrained)"""
+    return training_spec.build_model(TrainingSpec(), 'classification', n_features, n_outputs)
+
+
+def time_backend(backend, X, repeats):
+    """Median wall time of backend.predict(X) over several runs"""
+    backend.predict(X)  # Warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def run(batch_sizes, repeats, n_features=20):
+    model = build_model(n_features)
+    backends = {name: cls(model) for name, cls in BACKENDS.items()}
+    rng = np.random.default_rng(0)
+
+    results = []
+    for batch_size in batch_sizes:
+        X = rng.standard_normal((batch_size, n_features)).astype(np.float32)
+        reference = backends['keras'].predict(X)
+        row = {'batch_size': batch_size}
+        for name, backend in backends.items():
+            # Fewer repeats for the largest batches keeps the run short
+            n = repeats if batch_size <= 10000 else max(1, repeats // 5)
+            seconds = time_backend(backend, X, n)
+            row[name] = {
+                'seconds': seconds,
+                'rows_per_second': batch_size / seconds if seconds else None,
+                'max_abs_diff': float(np.max(np.abs(backend.predict(X) - reference)))
+            }
+        results.append(row)
+    return results
+
+
+def print_table(results):
+    names = [name for name in results[0] if name != 'batch_size']
+    print(f"{'batch':>8} " + ' '.join(f'{name:>14}' for name in names) + '  speedup vs keras')
+    for row in results:
+        cells = ' '.join(f"{row[name]['seconds'] * 1000:>11.3f} ms" for name in names)
+        baseline = row['keras']['seconds']
+        speedups = ', '.join(f"{name} x{baseline / row[name]['seconds']:.1f}"
+                             for name in names if name != 'keras')
+        print(f"{row['batch_size']:>8} {cells}  {speedups}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    print_table(run(args.batch_sizes, args.repeats))
+
+
+if __name__ == '__main__':
+    main()
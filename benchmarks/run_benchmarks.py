@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite
+Training wall time, metric and prediction latency at several test-set sizes
+and Flask test-client throughput of the /api/* routes under concurrency.
+Writes JSON and compares it against a stored baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+# Longest wait for the job and sweep that the API section reads back
+RESOURCE_TIMEOUT_SECONDS = 600
+
+PROFILES = {
+    'quick': {
+        'train_samples': 2000, 'train_epochs': 5, 'train_repeats': 1,
+        'test_sizes': [1000, 10000], 'latency_repeats': 20,
+        'concurrency': [1, 4], 'requests_per_route': 100
+    },
+    'full': {
+        'train_samples': 10000, 'train_epochs': 20, 'train_repeats': 3,
+        'test_sizes': [1000, 10000, 100000], 'latency_repeats': 50,
+        'concurrency': [1, 4, 16], 'requests_per_route': 400
+    }
+}
+
+# Routes left out of the throughput run: infinite streams and calls that start
+# training or sweeps or change what is served (training is timed separately)
+SKIPPED_ROUTES = {
+    ('GET', '/api/stream'): 'infinite event stream',
+    ('POST', '/api/train/classification'): 'timed in the training section',
+    ('POST', '/api/train/regression'): 'timed in the training section',
+    ('POST', '/api/sweeps'): 'starts a sweep',
+    ('POST', '/api/sweeps/<sweep_id>/cancel'): 'changes sweep state',
+    ('POST', '/api/models/<version>/activate'): 'changes the served model',
+    ('POST', '/api/inference/backend'): 'changes the served backend',
+}
+
+# Extra query variants benchmarked next to the plain route
+VARIANTS = {
+    '/api/history/performance': ['/api/history/performance?layout=columnar'],
+}
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000) if samples else None
+
+
+def timed(fn, repeats):
+    """Wall time of each call to fn, after one warm-up call"""
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def quick_spec(profile):
+    from datasets import DatasetConfig
+    from training_spec import TrainingSpec
+
+    return TrainingSpec(epochs=profile['train_epochs'], early_stopping=False,
+                        data=DatasetConfig(n_samples=profile['train_samples']))
+
+
+def bench_training(app_module, profile, results):
+    for model_type in ('classification', 'regression'):
+        walls, throughput = [], []
+        for _ in range(profile['train_repeats']):
+            spec = quick_spec(profile)
+            start = time.perf_counter()
+            _, summary = app_module.ml_manager.train_model(model_type, spec)
+            walls.append(time.perf_counter() - start)
+            throughput.append(summary['samples_per_second'])
+        results[f'training.{model_type}.wall_time_seconds'] = float(np.median(walls))
+        results[f'training.{model_type}.fit_samples_per_second'] = float(np.median(throughput))
+
+
+def publish_test_set(app_module, model, scaler, model_type, n_rows, n_features, n_classes=3):
+    """Serve ``model`` with a synthetic test set of ``n_rows`` rows"""
+    rng = np.random.default_rng(n_rows)
+    X = rng.standard_normal((n_rows, n_features)).astype(np.float32)
+    if model_type == 'classification':
+        y = rng.integers(0, n_classes, n_rows)
+    else:
+        y = rng.standard_normal(n_rows)
+    app_module.ml_manager._publish_model(model, scaler, X, y, model_type)
+
+
+def bench_serving(app_module, profile, results):
+    manager = app_module.ml_manager
+    for model_type in ('classification', 'regression'):
+        # Only the test set changes size; the model is trained once per type
+        if manager.model_type != model_type:
+            manager.train_model(model_type, quick_spec(profile))
+        snapshot = manager.snapshot
+        model, scaler = snapshot.model, snapshot.scaler
+        n_features = snapshot.X_test.shape[1]
+
+        for n_rows in profile['test_sizes']:
+            publish_test_set(app_module, model, scaler, model_type, n_rows, n_features)
+            snapshot = manager.snapshot
+            repeats = profile['latency_repeats'] if n_rows <= 10000 else max(5, profile['latency_repeats'] // 5)
+            prefix = f'serving.{model_type}.{n_rows}'
+
+            def compute_cold():
+                # Includes the test-set inference pass that is otherwise cached per version
+                # (and shared through the registry, which an unsaved snapshot bypasses)
+                manager._predictions_cache.clear()
+                manager._compute_performance_metrics(snapshot._replace(registry_version=None))
+
+            compute = timed(compute_cold, repeats)
+            cached = timed(lambda: manager.get_performance_metrics(snapshot), repeats)
+            sample = timed(lambda: manager.get_predictions_sample(20, snapshot), repeats)
+            results[f'{prefix}.metrics_compute_ms'] = percentile_ms(compute, 50)
+            results[f'{prefix}.metrics_cached_ms'] = percentile_ms(cached, 50)
+            results[f'{prefix}.predictions_sample_ms'] = percentile_ms(sample, 50)
+
+
+def create_resources(app_module, profile):
+    """A finished training job, sweep and captured profile for the routes that read them.
+
+    Returns the ids to fill into route placeholders and the routes that
+    still cannot be measured, with the reason.
+    """
+    from request_profiler import PROFILE_QUERY_ARG
+
+    spec = quick_spec(profile)
+    job, _ = app_module.training_queue.submit(
+        'classification', lambda progress, telemetry: app_module.ml_manager.train_model(
+            'classification', spec, progress, telemetry))
+    sweep = app_module.sweep_manager.create({
+        'strategy': 'grid',
+        'space': {'learning_rate': [0.01]},
+        'base': {'epochs': 1, 'data': {'n_samples': 200}}
+    }, data_root=app_module.DATA_DIR)
+
+    # Profile a real request; the profile routes read it back
+    app_module.request_profiler.enabled = True
+    response = app_module.app.test_client().get(f'/api/performance?{PROFILE_QUERY_ARG}=1&tf=1')
+    profile_id = response.headers.get('X-Profile-Id')
+
+    deadline = time.monotonic() + RESOURCE_TIMEOUT_SECONDS
+    while not (job.is_finished and sweep.is_finished) and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    ids = {'<job_id>': job.id, '<sweep_id>': sweep.id, '<profile_id>': profile_id}
+    unavailable = {}
+    if not job.is_finished or job.status != 'completed':
+        unavailable['<job_id>'] = f'training job {job.status}'
+    if not sweep.is_finished:
+        unavailable['<sweep_id>'] = f'sweep {sweep.status}'
+    profile_entry = app_module.request_profiler.get(profile_id) if profile_id else None
+    if profile_entry is None:
+        unavailable['<profile_id>'] = 'no profile captured'
+    elif profile_entry.tf_trace is None:
+        unavailable[('GET', '/api/debug/profiles/<profile_id>/trace')] = 'no TensorFlow trace captured'
+    return ids, unavailable
+
+
+def route_requests(app_module, ids, unavailable):
+    """(method, rule, url, kwargs) for every /api/* route that can be benchmarked"""
+    snapshot = app_module.ml_manager.snapshot
+    n_features = snapshot.X_test.shape[1]
+    fill = dict(ids, **{'<version>': snapshot.registry_version or 'unknown'})
+    bodies = {
+        '/api/predict': {'json': {'rows': np.zeros((8, n_features)).tolist()}},
+    }
+
+    requests_ = []
+    skipped = {}
+    for rule in app_module.app.url_map.iter_rules():
+        if not (rule.rule.startswith('/api/') or rule.rule == '/metrics'):
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            key = (method, rule.rule)
+            reason = SKIPPED_ROUTES.get(key) or unavailable.get(key) or next(
+                (unavailable[placeholder] for placeholder in unavailable
+                 if isinstance(placeholder, str) and placeholder in rule.rule), None)
+            if reason:
+                skipped[f'{method} {rule.rule}'] = reason
+                continue
+            url = rule.rule
+            for placeholder, value in fill.items():
+                url = url.replace(placeholder, value)
+            requests_.append((method, rule.rule, url, bodies.get(rule.rule, {})))
+            if method == 'GET':
+                requests_.extend((method, variant, variant, {}) for variant in VARIANTS.get(rule.rule, ()))
+    return requests_, skipped
+
+
+def bench_api(app_module, profile, results):
+    ids, unavailable = create_resources(app_module, profile)
+    routes, skipped = route_requests(app_module, ids, unavailable)
+    n_requests = profile['requests_per_route']
+    local = threading.local()
+
+    def call(method, url, kwargs):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app_module.app.test_client()
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        return time.perf_counter() - start, response.status_code
+
+    for method, rule, url, kwargs in routes:
+        for concurrency in profile['concurrency']:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(lambda _: call(method, url, kwargs), range(concurrency)))  # Warm up
+                start = time.perf_counter()
+                samples = list(pool.map(lambda _: call(method, url, kwargs), range(n_requests)))
+                elapsed = time.perf_counter() - start
+            latencies = [latency for latency, _ in samples]
+            prefix = f'api.{method} {rule}.c{concurrency}'
+            results[f'{prefix}.requests_per_second'] = n_requests / elapsed
+            results[f'{prefix}.p50_ms'] = percentile_ms(latencies, 50)
+            results[f'{prefix}.p95_ms'] = percentile_ms(latencies, 95)
+            results[f'{prefix}.status'] = sorted({status for _, status in samples})
+    return skipped
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import tensorflow as tf
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'tensorflow': tf.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run(profile_name, sections):
+    profile = PROFILES[profile_name]
+    # Keep benchmark models and data out of the real registry
+    workdir = tempfile.mkdtemp(prefix='ml-dashboard-bench-')
+    os.environ['ML_DASHBOARD_MODEL_DIR'] = os.path.join(workdir, 'models')
+    os.environ['ML_DASHBOARD_DATA_DIR'] = os.path.join(workdir, 'data')
+    os.environ.setdefault('ML_DASHBOARD_SWEEP_WORKERS', '1')
+
+    import app as app_module
+
+    results = {}
+    report = {'profile': profile_name, 'environment': environment(), 'results': results}
+
+    if 'training' in sections:
+        bench_training(app_module, profile, results)
+    if 'serving' in sections or 'api' in sections:
+        bench_serving(app_module, profile, results)
+    if 'api' in sections:
+        report['skipped_routes'] = bench_api(app_module, profile, results)
+    return report
+
+
+def lower_is_better(name):
+    return name.endswith(('_seconds', '_ms'))
+
+
+def compare(current, baseline, threshold):
+    """Rows of (metric, baseline, current, relative change, verdict).
+
+    A route whose response statuses differ from the baseline's is a
+    regression whatever its timings: it is no longer doing the same work.
+    """
+    rows = []
+    for name, value in current['results'].items():
+        old = baseline['results'].get(name)
+        if name.endswith('.status'):
+            if old is not None and sorted(old) != sorted(value):
+                rows.append((name, old, value, None, 'REGRESSION'))
+            continue
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+            continue
+        change = (value - old) / old
+        worse = change > threshold if lower_is_better(name) else change < -threshold
+        better = change < -threshold if lower_is_better(name) else change > threshold
+        rows.append((name, old, value, change, 'REGRESSION' if worse else ('improved' if better else 'ok')))
+    return rows
+
+
+def print_comparison(rows, file=sys.stderr):
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f"{'metric':<{width}} {'baseline':>12} {'current':>12} {'change':>8}", file=file)
+    for name, old, value, change, verdict in rows:
+        if change is None:  # Status lists
+            print(f'{name:<{width}} {str(old):>12} {str(value):>12} {"":>8}  {verdict}', file=file)
+        else:
+            print(f'{name:<{width}} {old:>12.4g} {value:>12.4g} {change:>+7.1%}  {verdict}', file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--sections', default='training,serving,api',
+                        help='comma-separated subset of training,serving,api')
+    parser.add_argument('--output', help='write results JSON to this file (default: stdout)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative change counted as a regression (default 0.25)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='exit with status 1 if any metric regressed')
+    args = parser.parse_args()
+
+    report = run(args.profile, set(args.sections.split(',')))
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+        print(f'Baseline saved to {args.baseline}', file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline to create one', file=sys.stderr)
+        return 0
+    with open(args.baseline, encoding='utf-8') as fh:
+        baseline = json.load(fh)
+    if baseline.get('profile') != report['profile']:
+        print(f"Baseline profile is {baseline.get('profile')!r}, not {report['profile']!r}; "
+              'timings are not comparable', file=sys.stderr)
+        return 0
+
+    rows = compare(report, baseline, args.threshold)
+    print_comparison(rows)
+    regressions = [row for row in rows if row[4] == 'REGRESSION']
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
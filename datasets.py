@@ -0,0 +1,296 @@
+"""
+Training data pipeline
+Streams training rows from chunked local files (CSV, Parquet, NPY) or from a
+generated dataset through tf.data, fitting the scaler incrementally, so the
+full training set never has to be held (or copied) in memory
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+SUPPORTED_EXTENSIONS = ('.csv', '.parquet', '.npy')
+
+
+class DatasetConfig:
+    """Where training data comes from and how it is split and streamed"""
+
+    def __init__(self, path=None, target_column=None, n_samples=1000, n_features=20, n_classes=3,
+                 chunk_rows=65536, test_size=0.2, validation_size=0.16, max_holdout_rows=100000,
+                 shuffle_buffer=10000, cache_path=None, data_root='data', seed=42):
+        self.path = path
+        self.target_column = target_column
+        self.n_samples = int(n_samples)
+        self.n_features = int(n_features)
+        self.n_classes = int(n_classes)
+        self.chunk_rows = int(chunk_rows)
+        self.test_size = float(test_size)
+        self.validation_size = float(validation_size)
+        self.max_holdout_rows = int(max_holdout_rows)
+        self.shuffle_buffer = int(shuffle_buffer)
+        self.cache_path = cache_path
+        self.data_root = data_root
+        self.seed = int(seed)
+        self.validate()
+        if cache_path is not None:
+            self.resolve_cache_path()
+
+    @classmethod
+    def from_dict(cls, options, data_root='data'):
+        allowed = ('path', 'target_column', 'n_samples', 'n_features', 'n_classes', 'chunk_rows',
+                   'test_size', 'validation_size', 'max_holdout_rows', 'shuffle_buffer', 'cache_path',
+                   'seed')
+        if options is not None and not isinstance(options, dict):
+            raise ValueError('data must be a JSON object')
+        unknown = set(options or {}) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown data option(s): {', '.join(sorted(unknown))}")
+        try:
+            return cls(data_root=data_root, **(options or {}))
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    def validate(self):
+        for name in ('path', 'cache_path'):
+            if getattr(self, name) is not None and not isinstance(getattr(self, name), str):
+                raise ValueError(f'{name} must be a string')
+        if self.n_samples < 10:
+            raise ValueError('n_samples must be at least 10')
+        if self.n_features < 3:
+            raise ValueError('n_features must be at least 3')
+        if self.n_classes < 2:
+            raise ValueError('n_classes must be at least 2')
+        if self.chunk_rows < 1:
+            raise ValueError('chunk_rows must be positive')
+        if not (0 < self.test_size < 1 and 0 <= self.validation_size < 1
+                and self.test_size + self.validation_size < 1):
+            raise ValueError('test_size and validation_size must be fractions that sum to less than 1')
+
+    def _under_root(self, relative, what):
+        root = os.path.realpath(self.data_root)
+        path = os.path.realpath(os.path.join(root, relative))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f'{what} must be inside the data directory')
+        return path
+
+    def resolve_cache_path(self):
+        """tf.data cache file prefix under the data root, or None when caching is off"""
+        if not self.cache_path:
+            return None
+        path = self._under_root(self.cache_path, 'Cache path')
+        if path == os.path.realpath(self.data_root):
+            raise ValueError('Cache path must name a file inside the data directory')
+        return path
+
+    def resolve_files(self):
+        """Data files under the data root, refusing paths that escape it"""
+        path = self._under_root(self.path, 'Data path')
+
+        if os.path.isdir(path):
+            files = sorted(f for ext in SUPPORTED_EXTENSIONS for f in glob.glob(os.path.join(path, f'*{ext}')))
+        elif os.path.isfile(path):
+            files = [path]
+        else:
+            raise ValueError(f'Data path not found: {self.path}')
+
+        if not files:
+            raise ValueError(f'No {", ".join(SUPPORTED_EXTENSIONS)} files in {self.path}')
+        extensions = {os.path.splitext(f)[1].lower() for f in files}
+        if len(extensions) != 1 or not extensions <= set(SUPPORTED_EXTENSIONS):
+            raise ValueError('Data files must all be CSV, Parquet or NPY')
+        return files
+
+
+def _split_target(frame_or_array, target_column):
+    """Separate features and target from a DataFrame/Table chunk or 2-D array"""
+    if isinstance(frame_or_array, np.ndarray):
+        column = -1 if target_column is None else int(target_column)
+        y = frame_or_array[:, column]
+        X = np.delete(frame_or_array, column % frame_or_array.shape[1], axis=1)
+        return X, y
+
+    column = 'target' if target_column is None else target_column
+    if isinstance(column, int):
+        column = frame_or_array.columns[column]
+    y = frame_or_array[column].to_numpy()
+    X = frame_or_array.drop(columns=[column]).to_numpy(dtype=np.float32)
+    return X, y
+
+
+def _iter_file_chunks(path, chunk_rows, target_column):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        import pandas as pd
+
+        for frame in pd.read_csv(path, chunksize=chunk_rows):
+            yield _split_target(frame, target_column)
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError('Reading Parquet files requires pyarrow (pip install pyarrow)')
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield _split_target(batch.to_pandas(), target_column)
+    else:
+        # Memory-mapped, so only the slice being processed is paged in
+        array = np.load(path, mmap_mode='r')
+        for start in range(0, len(array), chunk_rows):
+            yield _split_target(np.asarray(array[start:start + chunk_rows]), target_column)
+
+
+def file_source(config):
+    """Re-iterable chunk source over one or more local files"""
+    files = config.resolve_files()
+
+    def chunks():
+        for path in files:
+            yield from _iter_file_chunks(path, config.chunk_rows, config.target_column)
+    return chunks
+
+
+def synthetic_source(config, model_type):
+    """Chunk source over a generated dataset (slices are views, not copies)"""
+    from sklearn.datasets import make_classification, make_regression
+
+    if model_type == 'classification':
+        n_informative = max(3, round(config.n_features * 0.75))
+        X, y = make_classification(n_samples=config.n_samples, n_features=config.n_features,
+                                   n_informative=n_informative,
+                                   n_redundant=config.n_features - n_informative,
+                                   n_classes=config.n_classes, random_state=config.seed)
+    else:
+        X, y = make_regression(n_samples=config.n_samples, n_features=config.n_features,
+                               noise=0.1, random_state=config.seed)
+    X = X.astype(np.float32)
+
+    def chunks():
+        for start in range(0, len(X), config.chunk_rows):
+            yield X[start:start + config.chunk_rows], y[start:start + config.chunk_rows]
+    return chunks
+
+
+def split_masks(start, n, test_size, validation_size):
+    """Deterministic train/validation/test assignment from the global row index.
+
+    Uses a multiplicative hash of the row number, so every pass over the data
+    (scaler fit, each training epoch) puts a row in the same split without
+    storing any per-row state.
+    """
+    index = np.arange(start, start + n, dtype=np.uint64)
+    u = ((index * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+    test = u < test_size
+    validation = (u >= test_size) & (u < test_size + validation_size)
+    return ~(test | validation), validation, test
+
+
+class StreamingDataset:
+    """Scaler, holdout sets and a tf.data training pipeline over a chunk source"""
+
+    def __init__(self, chunks, config, model_type):
+        from sklearn.preprocessing import StandardScaler
+
+        self.chunks = chunks
+        self.config = config
+        self.model_type = model_type
+        self.scaler = StandardScaler()
+        self.n_train_rows = 0
+        self.n_features = None
+        self.n_classes = None
+
+        # Single pass: incremental scaler fit on training rows, holdouts kept (bounded)
+        holdout = {'validation': ([], []), 'test': ([], [])}
+        max_label = -1
+        offset = 0
+        for X, y in chunks():
+            train, validation, test = split_masks(offset, len(X), config.test_size, config.validation_size)
+            offset += len(X)
+            if train.any():
+                self.scaler.partial_fit(X[train])
+                self.n_train_rows += int(train.sum())
+            for name, mask in (('validation', validation), ('test', test)):
+                rows, targets = holdout[name]
+                kept = sum(len(r) for r in rows)
+                if mask.any() and kept < config.max_holdout_rows:
+                    rows.append(X[mask][:config.max_holdout_rows - kept])
+                    targets.append(y[mask][:config.max_holdout_rows - kept])
+            if model_type == 'classification' and len(y):
+                max_label = max(max_label, int(np.max(y)))
+
+        if not self.n_train_rows:
+            raise ValueError('No training rows found')
+        self.n_features = int(self.scaler.n_features_in_)
+        if model_type == 'classification':
+            self.n_classes = max_label + 1
+
+        self.X_val, self.y_val = self._finish_holdout(*holdout['validation'])
+        self.X_test, self.y_test = self._finish_holdout(*holdout['test'])
+
+    def _finish_holdout(self, rows, targets):
+        if not rows:
+            return None, None
+        X = self.scaler.transform(np.concatenate(rows))
+        y = np.concatenate(targets)
+        return X, y.astype(np.int64 if self.model_type == 'classification' else np.float64)
+
+    @property
+    def validation_data(self):
+        return (self.X_val, self.y_val) if self.X_val is not None and len(self.X_val) else None
+
+    def cache_file(self):
+        """Cache prefix for this data and scaler, so a cache of other data is never reused"""
+        prefix = self.config.resolve_cache_path()
+        if not prefix:
+            return None
+        config = self.config
+        key = hashlib.sha1(repr((
+            self.model_type, config.path, config.target_column, config.n_samples, config.n_features,
+            config.n_classes, config.test_size, config.validation_size, config.seed, self.n_train_rows
+        )).encode())
+        key.update(np.asarray(self.scaler.mean_, dtype=np.float64).tobytes())
+        key.update(np.asarray(self.scaler.scale_, dtype=np.float64).tobytes())
+        return f'{prefix}-{key.hexdigest()[:16]}'
+
+    def train_dataset(self, batch_size):
+        """Scaled, shuffled, batched and prefetched training rows"""
+        import tensorflow as tf
+
+        config = self.config
+        classification = self.model_type == 'classification'
+        y_dtype = tf.int32 if classification else tf.float32
+        mean = tf.constant(self.scaler.mean_, dtype=tf.float32)
+        scale = tf.constant(self.scaler.scale_, dtype=tf.float32)
+
+        def train_chunks():
+            offset = 0
+            for X, y in self.chunks():
+                train, _, _ = split_masks(offset, len(X), config.test_size, config.validation_size)
+                offset += len(X)
+                if train.any():
+                    yield (X[train].astype(np.float32, copy=False),
+                           y[train].astype(np.int32 if classification else np.float32, copy=False))
+
+        dataset = tf.data.Dataset.from_generator(train_chunks, output_signature=(
+            tf.TensorSpec(shape=(None, self.n_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=y_dtype)
+        ))
+        # Whole chunks are scaled at once, several in parallel
+        dataset = dataset.map(lambda X, y: ((X - mean) / scale, y),
+                              num_parallel_calls=tf.data.AUTOTUNE)
+        cache_file = self.cache_file()
+        # A lock file means another job or sweep trial is still writing this cache
+        if cache_file and not os.path.exists(f'{cache_file}_0.lockfile'):
+            # On-disk cache: later epochs skip parsing and scaling
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            dataset = dataset.cache(cache_file)
+        dataset = dataset.unbatch()
+        if config.shuffle_buffer > 1:
+            dataset = dataset.shuffle(config.shuffle_buffer, seed=config.seed)
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def load_training_data(config, model_type):
+    """Build a StreamingDataset from files (config.path) or a generated dataset"""
+    chunks = file_source(config) if config.path else synthetic_source(config, model_type)
+    return StreamingDataset(chunks, config, model_type)
@@ -0,0 +1,151 @@
+"""
+Drift monitor
+Streaming per-feature statistics of inference traffic compared with the
+training reference: Welford mean/variance, a fixed-bin quantile sketch and
+PSI/KS drift scores, all in constant memory
+"""
+
+import threading
+import time
+
+import numpy as np
+
+# Rule-of-thumb PSI bands: below 0.1 stable, 0.1-0.2 moderate shift, above 0.2 drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.2
+_EPSILON = 1e-4
+
+
+class DriftReference:
+    """Reference distribution of each feature in scaled space.
+
+    The scaler fitted on the training data defines the space (mean 0,
+    variance 1 per feature); the scaled test split supplies ``n_bins``
+    quantile bins per feature and the share of reference rows in each.
+    """
+
+    def __init__(self, X_reference, n_bins=10):
+        X = np.asarray(X_reference, dtype=np.float64)
+        self.n_features = X.shape[1]
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        # (n_features, n_bins - 1) interior edges; bin k is (edge[k-1], edge[k]]
+        self.edges = np.ascontiguousarray(np.quantile(X, quantiles, axis=0).T)
+        self.n_bins = n_bins
+        self.proportions = self._bin_counts(X) / max(len(X), 1)
+
+    def _bin_counts(self, X):
+        counts = np.empty((self.n_features, self.n_bins))
+        for j in range(self.n_features):
+            counts[j] = np.bincount(np.searchsorted(self.edges[j], X[:, j], side='left'),
+                                    minlength=self.n_bins)
+        return counts
+
+
+class DriftMonitor:
+    """Running statistics of scaled inference rows for one model version.
+
+    ``observe()`` folds a batch in with vectorised updates: Chan/Welford
+    mean and variance over all rows seen, and bin counts on the reference
+    deciles. Bin counts decay with a half-life of ``half_life_rows`` so PSI
+    and KS follow recent traffic rather than everything since start-up.
+    Scores are only reported once ``min_rows`` rows have been seen.
+    """
+
+    def __init__(self, reference, half_life_rows=5000, min_rows=100):
+        self.reference = reference
+        self.half_life_rows = half_life_rows
+        self.min_rows = min_rows
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        n_features = self.reference.n_features
+        with self._lock:
+            self.count = 0
+            self.mean = np.zeros(n_features)
+            self.m2 = np.zeros(n_features)
+            self.bin_counts = np.zeros((n_features, self.reference.n_bins))
+            self.started_at = time.time()
+            self.updated_at = None
+
+    def observe(self, X):
+        """Fold a batch of scaled rows into the running statistics"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.reference.n_features or not len(X):
+            return
+        n_batch = len(X)
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        batch_counts = self.reference._bin_counts(X)
+        decay = 0.5 ** (n_batch / self.half_life_rows) if self.half_life_rows else 1.0
+
+        with self._lock:
+            # Chan et al. parallel combination of two Welford summaries
+            total = self.count + n_batch
+            delta = batch_mean - self.mean
+            self.mean = self.mean + delta * (n_batch / total)
+            self.m2 = self.m2 + batch_m2 + delta ** 2 * (self.count * n_batch / total)
+            self.count = total
+            self.bin_counts = self.bin_counts * decay + batch_counts
+            self.updated_at = time.time()
+
+    def quantiles(self, q=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """Approximate live quantiles per feature, interpolated within sketch bins"""
+        with self._lock:
+            counts = self.bin_counts.copy()
+        totals = counts.sum(axis=1, keepdims=True)
+        if not totals.any():
+            return None
+        cdf = np.cumsum(counts, axis=1) / np.where(totals > 0, totals, 1)
+        edges = self.reference.edges
+        # Open-ended outer bins are given the width of their neighbour
+        low = edges[:, :1] - (edges[:, 1:2] - edges[:, :1])
+        high = edges[:, -1:] + (edges[:, -1:] - edges[:, -2:-1])
+        bounds = np.hstack([low, edges, high])
+        result = np.empty((len(q), counts.shape[0]))
+        for j in range(counts.shape[0]):
+            result[:, j] = np.interp(q, np.concatenate([[0.0], cdf[j]]), bounds[j])
+        return {str(level): result[i] for i, level in enumerate(q)}
+
+    def scores(self):
+        """Per-feature and summary drift scores of the traffic seen so far"""
+        with self._lock:
+            count = self.count
+            mean = self.mean.copy()
+            m2 = self.m2.copy()
+            counts = self.bin_counts.copy()
+            updated_at = self.updated_at
+
+        result = {
+            'observed_rows': count,
+            'min_rows': self.min_rows,
+            'started_at': self.started_at,
+            'updated_at': updated_at,
+            'status': 'insufficient_data',
+            'features': None
+        }
+        if count < self.min_rows:
+            return result
+
+        expected = np.clip(self.reference.proportions, _EPSILON, None)
+        actual = np.clip(counts / counts.sum(axis=1, keepdims=True), _EPSILON, None)
+        psi = ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+        ks = np.abs(np.cumsum(actual, axis=1) - np.cumsum(expected, axis=1)).max(axis=1)
+        std = np.sqrt(m2 / (count - 1)) if count > 1 else np.zeros_like(mean)
+
+        max_psi = float(psi.max())
+        result.update({
+            'status': 'drift' if max_psi > PSI_DRIFT else ('moderate' if max_psi > PSI_MODERATE else 'stable'),
+            'psi_max': max_psi,
+            'psi_mean': float(psi.mean()),
+            'ks_max': float(ks.max()),
+            'drifted_features': int((psi > PSI_DRIFT).sum()),
+            'features': {
+                'psi': psi,
+                'ks': ks,
+                # Scaled space: the training reference has mean 0 and std 1
+                'mean_shift': mean,
+                'std_ratio': std
+            }
+        })
+        return result
@@ -0,0 +1,229 @@
+"""
+Metric history store
+Columnar ring buffer of performance metrics with range queries, server-side
+downsampling and a coarser retention tier for data that has aged out
+"""
+
+import threading
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_METRICS = ('accuracy', 'precision', 'recall', 'f1_score', 'mse', 'rmse', 'r2_score', 'mae')
+
+
+def to_epoch(value):
+    """Accept epoch seconds, ISO-8601 strings or datetimes and return epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class _Ring:
+    """Fixed-capacity columnar ring of timestamps plus one array per column"""
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.columns = {name: np.full(capacity, np.nan) for name in columns}
+        self.head = 0  # Next write position
+        self.size = 0
+
+    def add_column(self, name):
+        self.columns[name] = np.full(self.capacity, np.nan)
+
+    def oldest_timestamp(self):
+        if not self.size:
+            return None
+        return self.timestamps[(self.head - self.size) % self.capacity]
+
+    def append(self, timestamp, values):
+        """Write one row; returns the row that was overwritten, if any"""
+        evicted = None
+        if self.size == self.capacity:
+            evicted = (self.timestamps[self.head],
+                       {name: column[self.head] for name, column in self.columns.items()})
+
+        self.timestamps[self.head] = timestamp
+        for name, column in self.columns.items():
+            column[self.head] = values.get(name, np.nan)
+
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return evicted
+
+    def ordered_indices(self, since=None, until=None):
+        """Physical indices of rows in time order, restricted to [since, until]"""
+        start = (self.head - self.size) % self.capacity
+        indices = (start + np.arange(self.size)) % self.capacity
+        timestamps = self.timestamps[indices]
+        lo = 0 if since is None else np.searchsorted(timestamps, since, side='left')
+        hi = self.size if until is None else np.searchsorted(timestamps, until, side='right')
+        return indices[lo:hi]
+
+
+class MetricHistory:
+    """Performance history with constant memory.
+
+    Recent points live in a raw ring of ``capacity`` rows. Every
+    ``rollup_factor`` points that fall out of the raw ring are folded into
+    one mean/min/max row of the retention ring, which covers
+    ``rollup_capacity * rollup_factor`` older points.
+    """
+
+    def __init__(self, capacity=34560, rollup_factor=12, rollup_capacity=20160,
+                 metrics=DEFAULT_METRICS):
+        self.rollup_factor = rollup_factor
+        self._metrics = list(metrics)
+        self._raw = _Ring(capacity, self._metrics)
+        self._rollup = _Ring(rollup_capacity, self._rollup_columns(self._metrics))
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _rollup_columns(metrics):
+        return [f'{name}{suffix}' for name in metrics for suffix in ('', '_min', '_max')]
+
+    def __len__(self):
+        return self._raw.size
+
+    @property
+    def metrics(self):
+        return list(self._metrics)
+
+    def append(self, metrics, timestamp=None):
+        """Record one set of scalar metrics (timestamp defaults to metrics['timestamp'] or now)"""
+        if timestamp is None:
+            timestamp = metrics.get('timestamp') or datetime.now()
+        timestamp = to_epoch(timestamp)
+        values = {name: float(value) for name, value in metrics.items()
+                  if name != 'timestamp' and isinstance(value, (int, float))}
+
+        with self._lock:
+            for name in values:
+                if name not in self._raw.columns:
+                    self._metrics.append(name)
+                    self._raw.add_column(name)
+                    for column in self._rollup_columns([name]):
+                        self._rollup.add_column(column)
+
+            evicted = self._raw.append(timestamp, values)
+            if evicted is not None:
+                self._pending.append(evicted)
+                if len(self._pending) >= self.rollup_factor:
+                    self._flush_rollup()
+
+    def _flush_rollup(self):
+        """Fold pending evicted raw rows into one retention-tier row"""
+        timestamps = np.array([timestamp for timestamp, _ in self._pending])
+        row = {}
+        for name in self._metrics:
+            values = np.array([values.get(name, np.nan) for _, values in self._pending])
+            values = values[~np.isnan(values)]
+            if values.size:
+                row[name] = values.mean()
+                row[f'{name}_min'] = values.min()
+                row[f'{name}_max'] = values.max()
+        self._rollup.append(timestamps.mean(), row)
+        self._pending = []
+
+    def _gather(self, since, until, metrics):
+        """Time-ordered timestamps and mean/min/max columns across both tiers"""
+        raw_oldest = self._raw.oldest_timestamp()
+        rollup_until = until
+        if raw_oldest is not None:
+            rollup_until = raw_oldest if until is None else min(until, raw_oldest)
+
+        rollup_idx = self._rollup.ordered_indices(since, rollup_until)
+        if raw_oldest is not None and rollup_idx.size:
+            # The retention tier only covers time before the oldest raw point
+            rollup_idx = rollup_idx[self._rollup.timestamps[rollup_idx] < raw_oldest]
+        raw_idx = self._raw.ordered_indices(since, until)
+
+        timestamps = np.concatenate([self._rollup.timestamps[rollup_idx], self._raw.timestamps[raw_idx]])
+        columns = {}
+        for name in metrics:
+            raw_values = self._raw.columns[name][raw_idx]
+            columns[name] = np.concatenate([self._rollup.columns[name][rollup_idx], raw_values])
+            columns[f'{name}_min'] = np.concatenate([self._rollup.columns[f'{name}_min'][rollup_idx], raw_values])
+            columns[f'{name}_max'] = np.concatenate([self._rollup.columns[f'{name}_max'][rollup_idx], raw_values])
+        return timestamps, columns
+
+    @staticmethod
+    def _downsample(timestamps, columns, metrics, points):
+        """Reduce to at most ``points`` equal-count buckets keeping mean, min and max"""
+        starts = np.linspace(0, timestamps.size, points, endpoint=False).astype(np.intp)
+        starts = np.unique(starts)
+        counts = np.diff(np.append(starts, timestamps.size))
+
+        bucketed = {}
+        for name in metrics:
+            values = columns[name]
+            present = ~np.isnan(values)
+            totals = np.add.reduceat(np.where(present, values, 0.0), starts)
+            n_present = np.add.reduceat(present.astype(np.int64), starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                bucketed[name] = np.where(n_present > 0, totals / n_present, np.nan)
+            bucketed[f'{name}_min'] = np.fmin.reduceat(columns[f'{name}_min'], starts)
+            bucketed[f'{name}_max'] = np.fmax.reduceat(columns[f'{name}_max'], starts)
+        return np.add.reduceat(timestamps, starts) / counts, bucketed
+
+    def query(self, since=None, until=None, points=None, metrics=None):
+        """Columnar slice of the history.
+
+        Returns ``(timestamps, columns)`` where ``columns`` maps each metric,
+        ``<metric>_min`` and ``<metric>_max`` to arrays aligned with
+        ``timestamps``. With ``points`` set, the result is downsampled to at
+        most that many buckets.
+        """
+        since, until = to_epoch(since), to_epoch(until)
+        with self._lock:
+            metrics = [name for name in (metrics or self._metrics) if name in self._raw.columns]
+            timestamps, columns = self._gather(since, until, metrics)
+
+        if points and timestamps.size > points:
+            timestamps, columns = self._downsample(timestamps, columns, metrics, points)
+        return timestamps, columns
+
+    def to_records(self, since=None, until=None, points=None, metrics=None):
+        """History as a list of dicts with ISO timestamps.
+
+        Missing metrics are omitted, and ``<metric>_min``/``<metric>_max`` only
+        appear on points that aggregate more than one sample.
+        """
+        timestamps, columns = self.query(since, until, points, metrics)
+        names = list(columns)
+        matrix = np.column_stack([columns[name] for name in names]) if names else np.empty((timestamps.size, 0))
+        position = {name: i for i, name in enumerate(names)}
+        records = []
+        for timestamp, row in zip(timestamps, matrix):
+            record = {'timestamp': datetime.fromtimestamp(timestamp).isoformat()}
+            for name, value in zip(names, row):
+                if np.isnan(value):
+                    continue
+                if name.endswith(('_min', '_max')):
+                    base = name[:-4]
+                    if row[position[f'{base}_min']] == row[position[f'{base}_max']]:
+                        continue
+                record[name] = float(value)
+            records.append(record)
+        return records
+
+    def to_columns(self, since=None, until=None, points=None, metrics=None):
+        """History as a dict of arrays: ``timestamp`` (epoch seconds) plus one
+        array per column of :meth:`query`, NaN where a metric is missing
+        """
+        timestamps, columns = self.query(since, until, points, metrics)
+        return {'timestamp': timestamps, **columns}
+
+    def memory_bytes(self):
+        """Preallocated size of both tiers"""
+        rings = (self._raw, self._rollup)
+        return sum(ring.timestamps.nbytes + sum(c.nbytes for c in ring.columns.values()) for ring in rings)
@@ -0,0 +1,126 @@
+"""
+Inference backends
+Interchangeable ways of running a trained Keras model. model.predict() builds a
+data adapter and runs the full predict loop on every call, which dominates the
+cost of the small batches the dashboard sends; the backends here skip that.
+"""
+
+import numpy as np
+
+
+class KerasPredictBackend:
+    """Reference backend: plain model.predict()"""
+
+    name = 'keras'
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X):
+        return self.model.predict(X, verbose=0)
+
+
+class TFFunctionBackend:
+    """Calls the model through a cached tf.function with a fixed input signature"""
+
+    name = 'tf_function'
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self._tf = tf
+        n_features = model.input_shape[-1]
+        self._fn = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=(None, n_features), dtype=tf.float32)]
+        )
+        # Trace once now so the first request does not pay for it
+        self._fn(tf.zeros((1, n_features), dtype=tf.float32))
+
+    def predict(self, X):
+        return self._fn(self._tf.convert_to_tensor(X, dtype=self._tf.float32)).numpy()
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'softmax': _softmax,
+}
+
+
+class NumpyMLPBackend:
+    """Runs a Dense/Dropout stack as plain NumPy matmuls on exported weights"""
+
+    name = 'numpy'
+
+    def __init__(self, model):
+        self.layers = []
+        for layer in model.layers:
+            kind = layer.__class__.__name__
+            if kind == 'Dropout':
+                continue  # Identity at inference time
+            if kind != 'Dense':
+                raise ValueError(f'Layer type {kind} is not supported by the numpy backend')
+
+            activation = layer.get_config().get('activation', 'linear')
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f'Activation {activation} is not supported by the numpy backend')
+
+            weights = layer.get_weights()
+            kernel = np.ascontiguousarray(weights[0], dtype=np.float32)
+            bias = np.asarray(weights[1], dtype=np.float32) if len(weights) > 1 else None
+            self.layers.append((kernel, bias, _ACTIVATIONS[activation]))
+
+        if not self.layers:
+            raise ValueError('Model has no Dense layers')
+
+    def predict(self, X):
+        x = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            if bias is not None:
+                x += bias
+            x = activation(x)
+        return x
+
+
+BACKENDS = {
+    KerasPredictBackend.name: KerasPredictBackend,
+    TFFunctionBackend.name: TFFunctionBackend,
+    NumpyMLPBackend.name: NumpyMLPBackend,
+}
+
+# Tried in order when the requested backend cannot handle a model
+FALLBACK_ORDER = (NumpyMLPBackend.name, TFFunctionBackend.name, KerasPredictBackend.name)
+
+
+def create_backend(name, model):
+    """Build the requested backend, falling back to the next one that supports the model"""
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown inference backend: {name}')
+
+    candidates = [name] + [other for other in FALLBACK_ORDER
+                           if FALLBACK_ORDER.index(other) > FALLBACK_ORDER.index(name)]
+    for candidate in candidates:
+        try:
+            return BACKENDS[candidate](model)
+        except ValueError:
+            continue
+    return KerasPredictBackend(model)
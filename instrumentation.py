@@ -0,0 +1,229 @@
+"""
+Instrumentation
+Counters, histograms and scrape-time gauges rendered in the Prometheus text
+exposition format, plus Flask hooks that time every route and JSON encoding
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from flask.json.provider import DefaultJSONProvider
+
+# Seconds; covers sub-millisecond predict calls up to slow training-adjacent requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally labelled"""
+
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, labels), value) for labels, value in items]
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values.
+
+    observe() is a bisect plus three additions under a lock; cumulative bucket
+    counts are only built when the endpoint is scraped.
+    """
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def to_dict(self, *labels):
+        """Per-bucket (not cumulative) counts, sum, count and mean of one series"""
+        with self._lock:
+            counts, total, count = self._series.get(labels, (None, 0.0, 0))
+            counts = list(counts) if counts else [0] * (len(self.buckets) + 1)
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {
+            'buckets': dict(zip(bounds, counts)),
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else 0.0
+        }
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(counts), total, count)
+                     for labels, (counts, total, count) in self._series.items()]
+        samples = []
+        bounds = [_format_value(float(bound)) for bound in self.buckets] + ['+Inf']
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                samples.append((f'{self.name}_bucket',
+                                _format_labels(self.labelnames, labels, f'le="{bound}"'), cumulative))
+            label_text = _format_labels(self.labelnames, labels)
+            samples.append((f'{self.name}_sum', label_text, total))
+            samples.append((f'{self.name}_count', label_text, count))
+        return samples
+
+
+class CallbackMetric:
+    """Value read from the application when the endpoint is scraped.
+
+    ``fn`` returns a number, or a dict mapping label-value tuples to numbers.
+    Use it for state that is already tracked elsewhere (queue depths, cache
+    counters), so the hot path pays nothing extra.
+    """
+
+    def __init__(self, name, documentation, fn, labelnames=(), type_name='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.type_name = type_name
+
+    def samples(self):
+        value = self.fn()
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [(self.name, _format_labels(self.labelnames, labels), number)
+                for labels, number in value.items() if number is not None]
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric already registered: {metric.name}')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, fn, labelnames=(), type_name='gauge'):
+        return self.register(CallbackMetric(name, documentation, fn, labelnames, type_name))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                continue  # A failing callback must not break the whole scrape
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            for name, labels, value in samples:
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def timed_json_provider(base, histogram):
+    """Subclass a Flask JSON provider so every dumps() is timed"""
+
+    class TimedJSONProvider(base):
+        def dumps(self, obj, **kwargs):
+            start = time.perf_counter()
+            try:
+                return super().dumps(obj, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+    return TimedJSONProvider
+
+
+def instrument_app(flask_app, request_latency, json_latency):
+    """Time every request by route template and every JSON response body.
+
+    ``request_latency`` is a Histogram labelled (route, method, status);
+    ``json_latency`` an unlabelled one.
+    """
+    provider = timed_json_provider(type(flask_app.json) if flask_app.json else DefaultJSONProvider,
+                                   json_latency)
+    flask_app.json = provider(flask_app)
+
+    @flask_app.before_request
+    def _start_timer():
+        g._request_started = time.perf_counter()
+
+    @flask_app.after_request
+    def _observe_latency(response):
+        started = g.pop('_request_started', None)
+        if started is not None:
+            # The rule template keeps label cardinality bounded (no raw paths or ids)
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            request_latency.observe(time.perf_counter() - started, route, request.method,
+                                    str(response.status_code))
+        return response
+
+    return flask_app
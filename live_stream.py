@@ -0,0 +1,149 @@
+"""
+Live metrics stream
+Fans out events produced once per tick to every connected dashboard over
+Server-Sent Events
+"""
+
+import asyncio
+import queue
+import threading
+from collections import deque
+
+from response_encoding import dumps
+
+
+class AsyncSubscription:
+    """Subscriber queue fed from any thread and read from an asyncio event loop.
+
+    Offers the ``put_nowait``/``get_nowait`` interface publish() uses on
+    ``queue.Queue`` subscribers, plus an awaitable ``get()``.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.maxsize = maxsize
+        self._loop = loop
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def put_nowait(self, item):
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                raise queue.Full
+            self._items.append(item)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # Loop already closed; the subscription is going away
+
+    def get_nowait(self):
+        with self._lock:
+            if not self._items:
+                raise queue.Empty
+            return self._items.popleft()
+
+    async def get(self, timeout=None):
+        """Next item; raises ``asyncio.TimeoutError`` after ``timeout`` seconds"""
+        while True:
+            self._ready.clear()
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            await asyncio.wait_for(self._ready.wait(), timeout)
+
+
+class MetricsBroadcaster:
+    """Publish/subscribe hub for Server-Sent Events.
+
+    Each event is serialized once in publish(); subscribers only receive the
+    pre-encoded message, so the cost of a tick does not grow with the number
+    of connected clients.
+    """
+
+    def __init__(self, max_queue_size=16, keepalive_interval=15):
+        self.max_queue_size = max_queue_size
+        self.keepalive_interval = keepalive_interval
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._latest = {}
+        self._event_id = 0
+        self._subscribe_callbacks = []
+
+    def on_subscribe(self, callback):
+        """Call ``callback()`` whenever a client connects"""
+        self._subscribe_callbacks.append(callback)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self, client_queue=None):
+        """Register a new client and prime it with the latest event of each type"""
+        if client_queue is None:
+            client_queue = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            for message in list(self._latest.values())[-self.max_queue_size:]:
+                client_queue.put_nowait(message)
+            self._subscribers.add(client_queue)
+        for callback in self._subscribe_callbacks:
+            callback()
+        return client_queue
+
+    def unsubscribe(self, client_queue):
+        with self._lock:
+            self._subscribers.discard(client_queue)
+
+    def publish(self, event, data, key=None):
+        """Encode an event once and queue it for every subscriber.
+
+        New subscribers are primed with the latest event per ``(event, key)``,
+        so per-model events each keep their own latest copy.
+        """
+        with self._lock:
+            self._event_id += 1
+            message = f'id: {self._event_id}\nevent: {event}\ndata: {dumps(data)}\n\n'
+            self._latest[(event, key)] = message
+            subscribers = list(self._subscribers)
+
+        for client_queue in subscribers:
+            try:
+                client_queue.put_nowait(message)
+            except queue.Full:
+                # Slow client: drop its oldest message rather than block the producer
+                try:
+                    client_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    client_queue.put_nowait(message)
+                except queue.Full:
+                    pass
+
+    def stream(self):
+        """Generator of SSE messages for one client connection"""
+        client_queue = self.subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield client_queue.get(timeout=self.keepalive_interval)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(client_queue)
+
+    async def astream(self):
+        """Async generator of SSE messages for one client, without a thread per connection"""
+        client_queue = self.subscribe(AsyncSubscription(asyncio.get_running_loop(), self.max_queue_size))
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield await client_queue.get(timeout=self.keepalive_interval)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(client_queue)
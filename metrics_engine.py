@@ -0,0 +1,109 @@
+"""
+Vectorized metric engine
+Derives every dashboard metric from one confusion matrix (classification)
+or one residual vector (regression), built in a single NumPy pass
+"""
+
+import numpy as np
+
+
+def _encode_labels(y_true, y_pred, n_classes=None):
+    """Map labels to dense integer codes 0..k-1"""
+    y_true = np.asarray(y_true).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+
+    # Fast path: labels are already small non-negative integers
+    if (np.issubdtype(y_true.dtype, np.integer) and np.issubdtype(y_pred.dtype, np.integer)
+            and y_true.size and y_true.min() >= 0 and y_pred.min() >= 0):
+        if n_classes is None:
+            n_classes = int(max(y_true.max(), y_pred.max())) + 1
+        return y_true.astype(np.intp, copy=False), y_pred.astype(np.intp, copy=False), np.arange(n_classes)
+
+    labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+    return codes[:y_true.size], codes[y_true.size:], labels
+
+
+def confusion_matrix(y_true, y_pred, n_classes=None):
+    """Confusion matrix (rows = actual, columns = predicted) and its labels"""
+    true_codes, pred_codes, labels = _encode_labels(y_true, y_pred, n_classes)
+    k = len(labels)
+    counts = np.bincount(true_codes * k + pred_codes, minlength=k * k)
+    return counts.reshape(k, k), labels
+
+
+def _safe_divide(numerator, denominator):
+    """Element-wise division that yields 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def classification_metrics(y_true, y_pred, n_classes=None):
+    """Accuracy, support-weighted precision/recall/F1, per-class metrics and the confusion matrix"""
+    matrix, labels = confusion_matrix(y_true, y_pred, n_classes)
+
+    true_positives = np.diag(matrix)
+    support = matrix.sum(axis=1)
+    predicted = matrix.sum(axis=0)
+    total = support.sum()
+
+    precision = _safe_divide(true_positives, predicted)
+    recall = _safe_divide(true_positives, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+
+    # Weighted by support, matching sklearn's average='weighted'
+    weights = _safe_divide(support, total)
+
+    return {
+        'accuracy': float(true_positives.sum() / total) if total else 0.0,
+        'precision': float(weights @ precision),
+        'recall': float(weights @ recall),
+        'f1_score': float(weights @ f1),
+        'per_class': [
+            {
+                'label': label.item(),
+                'precision': float(precision[i]),
+                'recall': float(recall[i]),
+                'f1_score': float(f1[i]),
+                'support': int(support[i])
+            }
+            for i, label in enumerate(labels)
+        ],
+        'confusion_matrix': matrix.tolist()
+    }
+
+
+def regression_metrics(y_true, y_pred):
+    """MSE, RMSE, MAE and R² from a single residual vector"""
+    y_true = np.asarray(y_true, dtype=np.float64).ravel()
+    residuals = np.asarray(y_pred, dtype=np.float64).ravel() - y_true
+
+    n = residuals.size
+    if n == 0:
+        return {'mse': 0.0, 'rmse': 0.0, 'r2_score': 0.0, 'mae': 0.0}
+
+    ss_res = float(residuals @ residuals)
+    centered = y_true - y_true.mean()
+    ss_tot = float(centered @ centered)
+    mse = ss_res / n
+
+    if ss_tot:
+        r2 = 1.0 - ss_res / ss_tot
+    else:
+        # Constant target: perfect if the residuals are all zero (sklearn convention)
+        r2 = 1.0 if ss_res == 0 else 0.0
+
+    return {
+        'mse': mse,
+        'rmse': float(np.sqrt(mse)),
+        'r2_score': r2,
+        'mae': float(np.abs(residuals).mean())
+    }
+
+
+def scalar_metrics(metrics):
+    """Only the scalar entries of a metrics dict, for history and trend charts"""
+    return {key: value for key, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)}
@@ -0,0 +1,134 @@
+"""
+Metrics scheduler
+Runs the real-time metrics tick on one background thread, only while someone
+is listening, backing off when ticks get expensive and skipping ticks that
+an overrun has already made late
+"""
+
+import threading
+import time
+
+
+class MetricsScheduler:
+    """Periodic runner for ``tick()``, gated by ``active()``.
+
+    While ``active()`` is false the thread sleeps until ``wake()`` is called
+    (or ``idle_poll`` seconds pass), so an idle server does no work. The
+    interval starts at ``interval`` and doubles, up to ``max_interval``,
+    whenever a tick takes more than ``max_duty`` of it; it halves back once
+    ticks are cheap again. A tick that overruns its slot does not cause a
+    burst of catch-up ticks: the missed slots are counted and skipped.
+    """
+
+    def __init__(self, tick, active=None, interval=5.0, max_interval=60.0, max_duty=0.1,
+                 idle_poll=30.0, histogram=None, name='metrics-scheduler'):
+        self.tick = tick
+        self.active = active or (lambda: True)
+        self.base_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.max_duty = max_duty
+        self.idle_poll = idle_poll
+        self.histogram = histogram
+        self.name = name
+        self.interval = interval
+        self.ticks = 0
+        self.skipped = 0
+        self.errors = 0
+        self.idle = True
+        self.last_duration = None
+        self.max_duration = 0.0
+        self._total_duration = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @property
+    def running(self):
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self):
+        """Start the thread; True if this call started it"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout=5.0):
+        """Ask the thread to exit after the current tick and wait for it"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout)
+
+    def wake(self):
+        """Re-check ``active()`` now instead of at the next idle poll"""
+        self._wake.set()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            if not self.active():
+                self.idle = True
+                self._wake.wait(self.idle_poll)
+                self._wake.clear()
+                continue
+            self.idle = False
+
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+                continue  # Re-check stop and active() before ticking
+
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                self.errors += 1
+                print(f'Metrics tick failed: {e}')
+            duration = time.monotonic() - started
+            self._record(duration)
+
+            next_tick = started + self.interval
+            now = time.monotonic()
+            if now > next_tick:
+                missed = int((now - next_tick) // self.interval) + 1
+                with self._lock:
+                    self.skipped += missed
+                next_tick += missed * self.interval
+
+    def _record(self, duration):
+        if self.histogram is not None:
+            self.histogram.observe(duration)
+        with self._lock:
+            self.ticks += 1
+            self.last_duration = duration
+            self.max_duration = max(self.max_duration, duration)
+            self._total_duration += duration
+            if duration > self.max_duty * self.interval:
+                self.interval = min(self.max_interval, self.interval * 2)
+            elif duration < self.max_duty * self.interval / 4 and self.interval > self.base_interval:
+                self.interval = max(self.base_interval, self.interval / 2)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'running': self.running,
+                'idle': self.idle,
+                'interval_seconds': self.interval,
+                'base_interval_seconds': self.base_interval,
+                'max_interval_seconds': self.max_interval,
+                'ticks': self.ticks,
+                'skipped': self.skipped,
+                'errors': self.errors,
+                'last_tick_ms': self.last_duration * 1000 if self.last_duration is not None else None,
+                'mean_tick_ms': self._total_duration / self.ticks * 1000 if self.ticks else None,
+                'max_tick_ms': self.max_duration * 1000
+            }
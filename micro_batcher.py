@@ -0,0 +1,148 @@
+"""
+Micro-batching for online inference
+Merges rows from concurrent requests into a single predict call
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from instrumentation import Histogram
+
+
+class _PendingRequest:
+    __slots__ = ('rows', 'future', 'enqueued_at')
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """Coalesce concurrent inference requests into batched predict calls.
+
+    ``predict_fn`` takes a 2-D array and returns ``(outputs, context)`` where
+    ``outputs`` has one entry per input row. Each request gets back its own
+    slice of ``outputs`` together with the shared ``context``.
+
+    A batch is flushed when it holds ``max_batch_size`` rows or when the
+    oldest request has waited ``max_wait_ms``, whichever comes first.
+    """
+
+    LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+    FILL_BUCKETS = (0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+    def __init__(self, predict_fn, max_batch_size=256, max_wait_ms=5.0, max_queue_size=10000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+        self.latency_ms = Histogram('predict_request_latency_ms', 'Submit-to-result time per request',
+                                    buckets=self.LATENCY_BUCKETS_MS)
+        self.batch_fill = Histogram('predict_batch_fill', 'Rows per batch over max_batch_size',
+                                    buckets=self.FILL_BUCKETS)
+        self.batches = 0
+        self.rows = 0
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, rows):
+        """Queue rows for prediction and return a Future of (outputs, context)"""
+        self._ensure_worker()
+        request = _PendingRequest(rows)
+        self._queue.put_nowait(request)
+        return request.future
+
+    def predict(self, rows, timeout=30.0):
+        """Blocking helper around submit()"""
+        return self.submit(rows).result(timeout=timeout)
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        batch = [first]
+        n_rows = len(first.rows)
+        deadline = first.enqueued_at + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    # Past the deadline: still take whatever is already waiting
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_rows += len(request.rows)
+        return batch, n_rows
+
+    def _run(self):
+        while True:
+            batch, n_rows = self._collect_batch()
+            try:
+                rows = batch[0].rows if len(batch) == 1 else np.concatenate([r.rows for r in batch])
+                outputs, context = self.predict_fn(rows)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0].future.set_exception(e)
+                else:
+                    # One bad request must not fail the others it was batched with
+                    for request in batch:
+                        self._run_alone(request)
+                continue
+
+            self._record_batch(n_rows)
+            offset = 0
+            finished_at = time.perf_counter()
+            for request in batch:
+                end = offset + len(request.rows)
+                self._finish(request, (outputs[offset:end], context), finished_at)
+                offset = end
+
+    def _run_alone(self, request):
+        try:
+            result = self.predict_fn(request.rows)
+        except Exception as e:
+            request.future.set_exception(e)
+            return
+        self._record_batch(len(request.rows))
+        self._finish(request, result, time.perf_counter())
+
+    def _record_batch(self, n_rows):
+        self.batches += 1
+        self.rows += n_rows
+        self.batch_fill.observe(min(1.0, n_rows / self.max_batch_size))
+
+    def _finish(self, request, result, finished_at):
+        request.future.set_result(result)
+        self.latency_ms.observe((finished_at - request.enqueued_at) * 1000.0)
+
+    def get_stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'queue_depth': self.queue_depth,
+            'latency_ms': self.latency_ms.to_dict(),
+            'batch_fill': self.batch_fill.to_dict()
+        }
@@ -0,0 +1,145 @@
+"""
+Model introspection
+Layer table, parameter counts, memory footprint, FLOPs per sample and
+measured inference latency of a served model, computed once when it is
+published and kept with its encoded JSON body and ETag
+"""
+
+import hashlib
+import time
+from datetime import datetime
+
+import numpy as np
+
+from response_encoding import dumps
+
+LATENCY_BATCH_SIZES = (1, 256)
+LATENCY_REPEATS = 5
+
+
+def _dtype_size(dtype):
+    name = getattr(dtype, 'name', dtype)
+    try:
+        return np.dtype(name).itemsize
+    except TypeError:
+        return 2 if '16' in str(name) else (8 if '64' in str(name) else 4)  # bfloat16 and friends
+
+
+def _count(weights):
+    return sum(int(np.prod(weight.shape)) for weight in weights)
+
+
+def weight_bytes(model):
+    """Bytes held by the model's variables, at their actual dtypes"""
+    return sum(int(np.prod(weight.shape)) * _dtype_size(weight.dtype) for weight in model.weights)
+
+
+def _output_shape(layer, input_shape):
+    """Output shape of a layer; Keras 3 layers have no ``output_shape`` attribute"""
+    try:
+        shape = layer.output.shape
+    except (AttributeError, ValueError):
+        try:
+            shape = layer.compute_output_shape(input_shape)
+        except Exception:
+            return None
+    return [None if dim is None else int(dim) for dim in shape]
+
+
+def _layer_flops(layer, input_shape, output_shape):
+    """Floating-point operations per sample at inference (multiply-adds count as two)"""
+    kind = layer.__class__.__name__
+    if kind == 'Dense' and input_shape and output_shape:
+        units_in, units_out = input_shape[-1], output_shape[-1]
+        return 2 * units_in * units_out + (units_out if layer.use_bias else 0)
+    if kind == 'BatchNormalization' and output_shape:
+        return 2 * int(np.prod([dim for dim in output_shape[1:] if dim]))
+    return 0  # Dropout is the identity at inference; activations are not counted
+
+
+def measure_latency(predict, n_features, batch_sizes=LATENCY_BATCH_SIZES, repeats=LATENCY_REPEATS):
+    """Median wall time of ``predict`` per batch size, after one warm-up call"""
+    rng = np.random.default_rng(0)
+    latency = {}
+    for batch_size in batch_sizes:
+        X = rng.standard_normal((batch_size, n_features)).astype(np.float32)
+        predict(X)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(X)
+            samples.append(time.perf_counter() - start)
+        median = float(np.median(samples))
+        latency[str(batch_size)] = {
+            'ms': median * 1000,
+            'rows_per_second': batch_size / median if median else None
+        }
+    return latency
+
+
+def weights_digest(model):
+    """Content hash of the model's weights"""
+    digest = hashlib.blake2b(digest_size=16)
+    for weight in model.weights:
+        digest.update(np.ascontiguousarray(np.asarray(weight)).tobytes())
+    return digest.hexdigest()
+
+
+class ModelInfo:
+    """Description of one served model version, with its JSON body and ETag.
+
+    The ETag covers only what identifies the model as served (``identity``),
+    not the measured latency or description time, so every worker and every
+    re-description of the same version and backend agrees on it. It is sent
+    as a weak ETag: bodies with the same tag differ in those measurements.
+    """
+
+    def __init__(self, data, identity):
+        self.data = data
+        self.body = dumps(data)
+        self.etag = hashlib.sha1(dumps(identity).encode()).hexdigest()[:20]
+
+
+def describe_model(model, backend, n_features, extra=None, measure=True):
+    """ModelInfo for a model served through ``backend``; ``extra`` fields are added as they are"""
+    layers = []
+    input_shape = (None, n_features)
+    for layer in model.layers:
+        output_shape = _output_shape(layer, input_shape)
+        params = layer.count_params()
+        trainable = _count(layer.trainable_weights)
+        layers.append({
+            'name': layer.name,
+            'type': layer.__class__.__name__,
+            'output_shape': output_shape,
+            'activation': layer.get_config().get('activation'),
+            'param_count': params,
+            'trainable_params': trainable,
+            'weight_bytes': weight_bytes(layer),
+            'flops_per_sample': _layer_flops(layer, input_shape, output_shape)
+        })
+        if output_shape is not None:
+            input_shape = tuple(output_shape)
+
+    total_params = sum(layer['param_count'] for layer in layers)
+    trainable_params = sum(layer['trainable_params'] for layer in layers)
+    identity = {
+        **(extra or {}),
+        'backend': backend.name,
+        'layers': layers,
+        'weights': weights_digest(model)  # Tells apart unregistered models of the same shape
+    }
+    return ModelInfo({
+        'status': 'success',
+        **(extra or {}),
+        'input_features': n_features,
+        'total_params': total_params,
+        'trainable_params': trainable_params,
+        'non_trainable_params': total_params - trainable_params,
+        'weight_bytes': sum(layer['weight_bytes'] for layer in layers),
+        'flops_per_sample': sum(layer['flops_per_sample'] for layer in layers),
+        'backend': backend.name,
+        'latency': measure_latency(backend.predict, n_features) if measure else None,
+        'layers': layers,
+        'described_at': datetime.now().isoformat()
+    }, identity)
@@ -0,0 +1,254 @@
+"""
+Model registry
+Versioned on-disk store of trained models, their fitted scalers, test splits
+and training histories, so a process can warm start without retraining
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+ACTIVE_POINTER = 'ACTIVE'
+# Last activation of each model name, so named models follow rollbacks (hidden from listings)
+ACTIVATIONS_DIR = '.activations'
+# Version names start with their creation time in this format, so they sort by age
+VERSION_TIME_FORMAT = '%Y%m%dT%H%M%S%f'
+SCALER_FIELDS = ('mean_', 'scale_', 'var_', 'n_samples_seen_', 'n_features_in_')
+
+
+def save_scaler(scaler, path):
+    """Store the fitted StandardScaler parameters as plain arrays (no pickle)"""
+    np.savez(path, **{field: np.asarray(getattr(scaler, field)) for field in SCALER_FIELDS
+                      if getattr(scaler, field, None) is not None})
+
+
+def load_scaler(path):
+    """Rebuild a fitted StandardScaler from save_scaler() output"""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    with np.load(path, allow_pickle=False) as data:
+        for field in SCALER_FIELDS:
+            if field in data:
+                value = data[field]
+                setattr(scaler, field, value.item() if value.ndim == 0 else value)
+    return scaler
+
+
+class ModelRegistry:
+    """Versioned model directories under ``root``.
+
+    Each version is written to a temporary directory and renamed into place,
+    so a reader never sees a partially written version. The ``ACTIVE`` file
+    names the version every process should serve; it is replaced atomically,
+    which lets separate worker processes follow activations by re-reading it.
+    """
+
+    def __init__(self, root, keep=20):
+        self.root = root
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._meta_cache = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, version, *parts):
+        if not version or os.sep in version or version.startswith('.'):
+            raise ValueError(f'Invalid model version: {version}')
+        return os.path.join(self.root, version, *parts)
+
+    def save(self, model, scaler, X_test, y_test, model_type, history=None, activate=True, name=None):
+        """Write a new version and (by default) make it active; returns the version name.
+
+        ``name`` is the served model name the version belongs to (the model
+        type by default).
+        """
+        version = f"{datetime.now().strftime(VERSION_TIME_FORMAT)}-{model_type}"
+        staging = os.path.join(self.root, f'.staging-{uuid.uuid4().hex}')
+        os.makedirs(staging)
+        try:
+            model.save(os.path.join(staging, 'model.keras'))
+            save_scaler(scaler, os.path.join(staging, 'scaler.npz'))
+            np.save(os.path.join(staging, 'X_test.npy'), np.ascontiguousarray(X_test))
+            np.save(os.path.join(staging, 'y_test.npy'), np.ascontiguousarray(y_test))
+            with open(os.path.join(staging, 'history.json'), 'w', encoding='utf-8') as fh:
+                json.dump(history or {}, fh)
+            with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as fh:
+                json.dump({
+                    'version': version,
+                    'model_type': model_type,
+                    'name': name or model_type,
+                    'created_at': datetime.now().isoformat(),
+                    'n_features': int(X_test.shape[1]),
+                    'test_rows': int(X_test.shape[0]),
+                    'total_params': int(model.count_params())
+                }, fh)
+            os.rename(staging, self._path(version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        self._prune()
+        return version
+
+    def list_versions(self):
+        """Metadata of every stored version, newest first.
+
+        A version's meta.json never changes once it is renamed into place,
+        so each one is read once and later calls only list the directory.
+        """
+        versions = []
+        cache = {}
+        for name in sorted(os.listdir(self.root), reverse=True):
+            if name.startswith('.'):
+                continue
+            meta = self._meta_cache.get(name)
+            if meta is None:
+                meta_path = os.path.join(self.root, name, 'meta.json')
+                if not os.path.isfile(meta_path):
+                    continue
+                with open(meta_path, encoding='utf-8') as fh:
+                    meta = json.load(fh)
+            cache[name] = meta
+            versions.append(dict(meta))
+        self._meta_cache = cache  # Pruned versions drop out
+        return versions
+
+    def exists(self, version):
+        try:
+            return os.path.isfile(self._path(version, 'meta.json'))
+        except ValueError:
+            return False
+
+    def active_version(self):
+        """Version named by the ACTIVE pointer, falling back to the newest one"""
+        try:
+            with open(os.path.join(self.root, ACTIVE_POINTER), encoding='utf-8') as fh:
+                version = fh.read().strip()
+            if self.exists(version):
+                return version
+        except OSError:
+            pass
+        versions = self.list_versions()
+        return versions[0]['version'] if versions else None
+
+    def activate(self, version):
+        if not self.exists(version):
+            raise KeyError(f'Unknown model version: {version}')
+
+        with self._lock:
+            pointer = os.path.join(self.root, ACTIVE_POINTER)
+            tmp = f'{pointer}.{uuid.uuid4().hex}'
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                fh.write(version)
+            os.replace(tmp, pointer)
+
+            with open(self._path(version, 'meta.json'), encoding='utf-8') as fh:
+                meta = json.load(fh)
+            name = meta.get('name', meta['model_type'])
+            record = self._activation_path(name)
+            os.makedirs(os.path.dirname(record), exist_ok=True)
+            tmp = f'{record}.{uuid.uuid4().hex}'
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump({'name': name, 'version': version,
+                           'activated_at': datetime.now().strftime(VERSION_TIME_FORMAT)}, fh)
+            os.replace(tmp, record)
+
+    def _activation_path(self, name):
+        return os.path.join(self.root, ACTIVATIONS_DIR, f'{hashlib.sha1(name.encode()).hexdigest()[:16]}.json')
+
+    def activation(self, name):
+        """Last activation of a model name: {'name', 'version', 'activated_at'}, or None"""
+        try:
+            with open(self._activation_path(name), encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def served_versions(self):
+        """Version each stored model name should serve.
+
+        That is its newest version, unless another version of the name was
+        activated after the newest one was created (a rollback): then the
+        activated one, until a version newer than the activation is saved.
+        """
+        served = {}
+        for meta in self.list_versions():
+            served.setdefault(meta.get('name', meta['model_type']), meta['version'])
+        for name, newest in served.items():
+            record = self.activation(name)
+            if (record and record['version'] != newest and self.exists(record['version'])
+                    and newest.split('-', 1)[0] <= record['activated_at']):
+                served[name] = record['version']
+        return served
+
+    def load(self, version):
+        """Load a version; test arrays are memory-mapped so processes share the page cache"""
+        import tensorflow as tf
+
+        if not self.exists(version):
+            raise KeyError(f'Unknown model version: {version}')
+
+        with open(self._path(version, 'meta.json'), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        with open(self._path(version, 'history.json'), encoding='utf-8') as fh:
+            history = json.load(fh)
+
+        return {
+            'version': version,
+            'model_type': meta['model_type'],
+            'model': tf.keras.models.load_model(self._path(version, 'model.keras'), compile=False),
+            'scaler': load_scaler(self._path(version, 'scaler.npz')),
+            'X_test': np.load(self._path(version, 'X_test.npy'), mmap_mode='r'),
+            'y_test': np.load(self._path(version, 'y_test.npy'), mmap_mode='r'),
+            'history': history,
+            'meta': meta
+        }
+
+    def load_test_set(self, version):
+        """Memory-mapped (X_test, y_test) of a stored version"""
+        return (np.load(self._path(version, 'X_test.npy'), mmap_mode='r'),
+                np.load(self._path(version, 'y_test.npy'), mmap_mode='r'))
+
+    def load_predictions(self, version):
+        """Memory-mapped test-set model outputs stored by save_predictions(), or None"""
+        try:
+            return np.load(self._path(version, 'predictions.npy'), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+
+    def save_predictions(self, version, outputs):
+        """Store the model outputs over a version's test set for every process to map.
+
+        Written under a temporary name and renamed, so a concurrent reader
+        sees either nothing or the whole array. Returns the mapped copy.
+        """
+        path = self._path(version, 'predictions.npy')
+        tmp = f'{path}.{uuid.uuid4().hex}.npy'
+        np.save(tmp, np.ascontiguousarray(outputs))
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode='r')
+
+    def _prune(self):
+        """Delete the oldest versions beyond ``keep``, never the active one, the
+        newest version of a model name or the one it serves after a rollback"""
+        if not self.keep:
+            return
+        versions = self.list_versions()
+        protected = {self.active_version(), *self.served_versions().values()}
+        seen_names = set()
+        for meta in versions:
+            name = meta.get('name', meta['model_type'])
+            if name not in seen_names:
+                seen_names.add(name)
+                protected.add(meta['version'])
+        for meta in versions[self.keep:]:
+            if meta['version'] not in protected:
+                shutil.rmtree(self._path(meta['version']), ignore_errors=True)
@@ -0,0 +1,95 @@
+"""
+Prediction sampler
+Predictions over the whole test set computed once per model version, served
+as deterministic stratified or uniform samples by slicing a seeded order
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+STRATEGIES = ('stratified', 'uniform')
+REGRESSION_STRATA = 10
+
+
+class TestSetPredictions:
+    """Predicted labels/values and confidences for every test row.
+
+    A sample is a slice of a sampling order: a permutation of the test rows
+    fixed by ``(strategy, seed)``. Pages of the same order never overlap, so
+    ``cursor`` walks the whole test set, and the same request always returns
+    the same rows. Orders are built on first use and the most recent
+    ``max_orders`` are kept.
+    """
+
+    def __init__(self, y_true, outputs, model_type, max_orders=8):
+        self.model_type = model_type
+        self.y_true = np.asarray(y_true)
+        if model_type == 'classification':
+            self.y_pred = np.argmax(outputs, axis=1)
+            self.confidence = np.max(outputs, axis=1)
+        else:
+            self.y_pred = outputs.ravel()
+            self.confidence = np.ones_like(self.y_pred)  # Placeholder for regression
+        self.outputs = outputs
+        self.max_orders = max_orders
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.y_true.shape[0]
+
+    def _strata(self):
+        """Stratum of each row: the class, or a quantile bin of the target"""
+        if self.model_type == 'classification':
+            return self.y_true.astype(np.int64)
+        n_bins = min(REGRESSION_STRATA, len(self))
+        edges = np.quantile(self.y_true, np.linspace(0, 1, n_bins + 1)[1:-1])
+        return np.searchsorted(edges, self.y_true, side='right')
+
+    def _build_order(self, strategy, seed):
+        rng = np.random.default_rng(seed)
+        if strategy == 'uniform':
+            return rng.permutation(len(self))
+
+        # Shuffle within each stratum, then interleave strata by relative rank
+        # so every prefix holds each stratum in proportion to its size
+        strata = self._strata()
+        shuffled = rng.permutation(len(self))
+        by_stratum = shuffled[np.argsort(strata[shuffled], kind='stable')]
+        _, starts, counts = np.unique(strata[by_stratum], return_index=True, return_counts=True)
+        rank = np.arange(len(self)) - np.repeat(starts, counts)
+        position = (rank + rng.random(len(self))) / np.repeat(counts, counts)
+        return by_stratum[np.argsort(position, kind='stable')]
+
+    def order(self, strategy='stratified', seed=0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+        key = (strategy, seed)
+        with self._lock:
+            order = self._orders.get(key)
+            if order is not None:
+                self._orders.move_to_end(key)
+                return order
+        order = self._build_order(strategy, seed)
+        order.setflags(write=False)
+        with self._lock:
+            self._orders[key] = order
+            while len(self._orders) > self.max_orders:
+                self._orders.popitem(last=False)
+        return order
+
+    def sample(self, n=10, strategy='stratified', seed=0, cursor=0):
+        """Columns of rows ``cursor`` to ``cursor + n`` of the sampling order"""
+        if n < 1:
+            raise ValueError('n must be at least 1')
+        if cursor < 0:
+            raise ValueError('cursor must not be negative')
+        indices = self.order(strategy, seed)[cursor:cursor + n]
+        return {
+            'actual': self.y_true[indices],
+            'predicted': self.y_pred[indices],
+            'confidence': self.confidence[indices],
+            'indices': indices
+        }
@@ -0,0 +1,252 @@
+"""
+Request profiler
+Opt-in cProfile capture of individual requests, triggered by a header or query
+flag and rate limited, with reports kept in memory for download
+"""
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_ARG = 'profile'
+SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls')
+
+
+class RequestProfile:
+    """One captured request profile"""
+
+    def __init__(self, method, path, profiler, duration, status_code, tf_trace=None):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.duration = duration
+        self.status_code = status_code
+        self.created_at = datetime.now().isoformat()
+        profiler.create_stats()
+        # marshal of the pstats table: the same format cProfile.dump_stats() writes
+        self.raw = marshal.dumps(profiler.stats)
+        self.total_calls = sum(entry[1] for entry in profiler.stats.values())
+        self.tf_trace = tf_trace
+
+    def report(self, sort='cumulative', limit=40):
+        """pstats text report, top ``limit`` functions"""
+        out = io.StringIO()
+        stats = pstats.Stats(_StatsSource(self.raw), stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'status_code': self.status_code,
+            'duration_ms': self.duration * 1000,
+            'total_calls': self.total_calls,
+            'size_bytes': len(self.raw),
+            'has_tf_trace': self.tf_trace is not None,
+            'created_at': self.created_at
+        }
+
+
+class _StatsSource:
+    """Adapter so pstats.Stats can load marshalled stats from memory"""
+
+    def __init__(self, raw):
+        self.stats = marshal.loads(raw)
+
+    def create_stats(self):
+        pass
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores the results.
+
+    A request is profiled when it asks for it (``X-Profile: 1`` header or
+    ``?profile=1``), or at random with probability ``sample_rate``. Either
+    way, at most ``max_per_minute`` profiles are taken, only one runs at a
+    time, and only the newest ``max_profiles`` are kept. When ``token`` is
+    set, the header or flag must carry that value.
+    """
+
+    def __init__(self, enabled=False, sample_rate=0.0, max_per_minute=10, max_profiles=50,
+                 token=None, trace_root=None):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.max_profiles = max_profiles
+        self.token = token or None
+        self.trace_root = trace_root or os.path.join(tempfile.gettempdir(), 'ml-dashboard-profiles')
+        self.skipped = 0
+        self._profiles = OrderedDict()
+        self._recent = deque()
+        self._active = threading.Semaphore(1)
+        self._lock = threading.Lock()
+
+    def _requested(self):
+        value = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_ARG)
+        if not value:
+            return None
+        if self.token is not None:
+            return value if value == self.token else None
+        return value if value.lower() not in ('0', 'false', 'no') else None
+
+    def authorized(self):
+        """Whether the current request may read stored profiles"""
+        if not self.enabled:
+            return False
+        if self.token is None:
+            return True
+        return request.headers.get(PROFILE_HEADER) == self.token or \
+            request.args.get('token') == self.token
+
+    def _take_slot(self):
+        """Rate limit and concurrency check; True if this request may be profiled"""
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute:
+                self.skipped += 1
+                return False
+            if not self._active.acquire(blocking=False):
+                self.skipped += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def start(self):
+        """before_request hook"""
+        if not self.enabled or request.path.startswith('/api/debug/profiles'):
+            return
+        requested = self._requested()
+        if requested is None and not (self.sample_rate and random.random() < self.sample_rate):
+            return
+        if not self._take_slot():
+            return
+
+        tf_trace = None
+        if requested is not None and request.args.get('tf') == '1' and 'tensorflow' in sys.modules:
+            # Only when TensorFlow is already loaded: profiling must not import it
+            tf_trace = self._start_tf_trace()
+
+        profiler = cProfile.Profile()
+        g._profile = (profiler, time.perf_counter(), tf_trace)
+        profiler.enable()
+
+    def _start_tf_trace(self):
+        import tensorflow as tf
+
+        logdir = os.path.join(self.trace_root, uuid.uuid4().hex)
+        try:
+            tf.profiler.experimental.start(logdir)
+            return logdir
+        except Exception:
+            return None
+
+    def finish(self, response):
+        """after_request hook"""
+        state = g.pop('_profile', None)
+        if state is None:
+            return response
+        profiler, started, tf_trace = state
+        try:
+            profiler.disable()
+            duration = time.perf_counter() - started
+            if tf_trace is not None:
+                self._stop_tf_trace()
+            profile = RequestProfile(request.method, self._display_path(), profiler, duration,
+                                     response.status_code, tf_trace)
+            self._store(profile)
+            response.headers['X-Profile-Id'] = profile.id
+        finally:
+            self._active.release()
+        return response
+
+    @staticmethod
+    def _display_path():
+        """Request path and query without the profiling flags (which may carry the token)"""
+        args = [(key, value) for key, value in request.args.items(multi=True)
+                if key not in (PROFILE_QUERY_ARG, 'token', 'tf')]
+        query = '&'.join(f'{key}={value}' for key, value in args)
+        return f'{request.path}?{query}' if query else request.path
+
+    def abort(self, exc=None):
+        """teardown_request hook: release the slot if the request failed mid-profile"""
+        state = g.pop('_profile', None)
+        if state is not None:
+            state[0].disable()
+            if state[2] is not None:
+                self._stop_tf_trace()
+                shutil.rmtree(state[2], ignore_errors=True)
+            self._active.release()
+
+    @staticmethod
+    def _stop_tf_trace():
+        import tensorflow as tf
+
+        try:
+            tf.profiler.experimental.stop()
+        except Exception:
+            pass
+
+    def _store(self, profile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                _, evicted = self._profiles.popitem(last=False)
+                if evicted.tf_trace:
+                    shutil.rmtree(evicted.tf_trace, ignore_errors=True)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list_profiles(self):
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sample_rate': self.sample_rate,
+                'max_per_minute': self.max_per_minute,
+                'taken_last_minute': len(self._recent),
+                'stored': len(self._profiles),
+                'max_profiles': self.max_profiles,
+                'skipped': self.skipped
+            }
+
+    def tf_trace_archive(self, profile):
+        """Zip of a profile's TensorBoard trace directory"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for root, _, files in os.walk(profile.tf_trace):
+                for name in files:
+                    path = os.path.join(root, name)
+                    archive.write(path, os.path.relpath(path, profile.tf_trace))
+        return buffer.getvalue()
+
+
+def profile_requests(flask_app, profiler):
+    """Install the profiler's request hooks on an app"""
+    flask_app.before_request(profiler.start)
+    flask_app.after_request(profiler.finish)
+    flask_app.teardown_request(profiler.abort)
+    return flask_app
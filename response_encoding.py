@@ -0,0 +1,230 @@
+"""
+Response encoding
+Fast JSON (orjson when installed), NumPy-aware serialization, MessagePack and
+Arrow IPC bodies negotiated through Accept, and gzip/brotli compression of
+large responses
+"""
+
+import gzip
+import importlib
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+from flask import current_app, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder is used instead
+    orjson = None
+
+JSON_TYPE = 'application/json'
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+LAYOUTS = ('rows', 'columnar')
+ENCODING_MODULES = {'msgpack': 'msgpack', 'arrow': 'pyarrow'}
+
+COMPRESSIBLE_TYPES = {JSON_TYPE, ARROW_TYPE, *MSGPACK_TYPES}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_MISSING = object()
+_optional_modules = {}
+
+
+def _optional(name):
+    """Import an optional dependency once; None if it is not installed"""
+    module = _optional_modules.get(name, _MISSING)
+    if module is _MISSING:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            module = None
+        _optional_modules[name] = module
+    return module
+
+
+def to_builtin(obj):
+    """Plain Python value for NumPy arrays and scalars and datetimes.
+
+    NaN becomes None, as JSON has no NaN.
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f' and np.isnan(obj).any():
+            return np.where(np.isnan(obj), None, obj).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        return None if isinstance(value, float) and math.isnan(value) else value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+def _json_default(obj):
+    try:
+        return to_builtin(obj)
+    except TypeError:
+        return DefaultJSONProvider.default(obj)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Stdlib JSON provider that also accepts NumPy arrays and scalars"""
+
+    default = staticmethod(_json_default)
+
+
+class OrjsonProvider(NumpyJSONProvider):
+    """orjson-backed provider: NumPy arrays are encoded natively, without tolist().
+
+    Keyword arguments orjson has no equivalent for fall back to the stdlib encoder.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.pop('indent', None):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.pop('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        kwargs.pop('separators', None)  # orjson output is always compact
+        default = kwargs.pop('default', self.default)
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def json_provider_class():
+    """Fastest JSON provider available in this environment"""
+    return OrjsonProvider if orjson is not None else NumpyJSONProvider
+
+
+def dumps(obj):
+    """Compact JSON text of ``obj`` (NumPy-aware) for use outside a request"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, default=_json_default, separators=(',', ':'))
+
+
+def _kind(mimetype):
+    if mimetype in MSGPACK_TYPES:
+        return 'msgpack'
+    return 'arrow' if mimetype == ARROW_TYPE else 'json'
+
+
+def _installed(kind):
+    return kind == 'json' or _optional(ENCODING_MODULES[kind]) is not None
+
+
+def negotiate():
+    """'json', 'msgpack' or 'arrow', from the request's Accept header.
+
+    Encodings whose package is missing are only chosen (and answered with
+    406) when the client accepts none of the installed ones.
+    """
+    offers = [JSON_TYPE, *MSGPACK_TYPES, ARROW_TYPE]
+    best = request.accept_mimetypes.best_match(offers, default=JSON_TYPE)
+    if not _installed(_kind(best)):
+        # Only checked when preferred, so JSON clients never import the optional packages
+        best = request.accept_mimetypes.best_match(
+            [offer for offer in offers if _installed(_kind(offer))]) or best
+    return _kind(best)
+
+
+def get_layout(default='rows'):
+    """The ``layout`` query argument; Arrow responses are always columnar"""
+    layout = request.args.get('layout', default)
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+    return 'columnar' if negotiate() == 'arrow' else layout
+
+
+def _not_acceptable(message):
+    return jsonify({'status': 'error', 'message': message}), 406
+
+
+def _msgpack_response(payload, status):
+    msgpack = _optional('msgpack')
+    if msgpack is None:
+        return _not_acceptable('MessagePack responses need the msgpack package')
+    body = msgpack.packb(payload, default=to_builtin, use_bin_type=True)
+    return current_app.response_class(body, status=status, mimetype=MSGPACK_TYPES[0])
+
+
+def _arrow_response(payload, table, status):
+    pa = _optional('pyarrow')
+    if pa is None:
+        return _not_acceptable('Arrow responses need the pyarrow package')
+    if table is None:
+        return _not_acceptable('This response is not tabular; request JSON or MessagePack')
+
+    columns = payload[table]
+    arrow_table = pa.table({name: np.asarray(values) for name, values in columns.items()})
+    # Everything besides the table travels as JSON in the schema metadata
+    rest = {key: value for key, value in payload.items() if key != table}
+    arrow_table = arrow_table.replace_schema_metadata({'payload': dumps(rest)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return current_app.response_class(sink.getvalue().to_pybytes(), status=status, mimetype=ARROW_TYPE)
+
+
+def encoded_response(payload, table=None, status=200):
+    """Response for ``payload`` in the encoding the client accepts.
+
+    ``table`` names the key of ``payload`` that holds a dict of equal-length
+    columns; only such payloads can be sent as Arrow IPC.
+    """
+    kind = negotiate()
+    if kind == 'msgpack':
+        return _msgpack_response(payload, status)
+    if kind == 'arrow':
+        return _arrow_response(payload, table, status)
+    return jsonify(payload), status
+
+
+def compress_responses(flask_app, min_size=1024):
+    """Compress response bodies of at least ``min_size`` bytes (brotli when
+    installed and accepted, otherwise gzip). A negative size disables it.
+    """
+    if min_size < 0:
+        return flask_app
+
+    @flask_app.after_request
+    def _compress(response):
+        if (response.direct_passthrough or response.is_streamed or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+        mimetype = response.mimetype or ''
+        if not (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES):
+            return response
+
+        accepted = request.accept_encodings
+        brotli = _optional('brotli') if accepted['br'] else None
+        if brotli is None and not accepted['gzip']:
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        if brotli is not None:
+            response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+            response.headers['Content-Encoding'] = 'br'
+        else:
+            response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        # The encoded bytes differ from the identity ones a strong ETag was computed for
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return flask_app
@@ -4,9 +4,12 @@ ML Dashboard Startup Script
 Simple script to run the ML Dashboard with proper configuration
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 import subprocess
+import time
 import webbrowser
 from threading import Timer
 
@@ -14,8 +17,62 @@ def open_browser():
     """Open browser after a short delay"""
     webbrowser.open('http://localhost:5000')
 
+def parse_import_times(stderr):
+    """Parse `python -X importtime` output into (module, self_us, cumulative_us, depth)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def time_import(code):
+    """Run code in a fresh interpreter; return wall time and per-module import times"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return elapsed, parse_import_times(result.stderr)
+
+def profile_startup(top=15):
+    """Report where application start-up time goes"""
+    print("Profiling application start-up (each step runs in a fresh interpreter)...")
+    print()
+    
+    elapsed, entries = time_import('import app; app.create_app()')
+    top_level = sorted((e for e in entries if e[3] <= 1), key=lambda e: e[2], reverse=True)
+    print(f"Serving path (import app + create_app): {elapsed:.2f} s wall")
+    print(f"{'module':<40} {'cumulative':>12} {'self':>10}")
+    for name, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"{name:<40} {cumulative_us / 1000:>9.1f} ms {self_us / 1000:>7.1f} ms")
+    print()
+    
+    # Imports deferred until the first training or inference call
+    loaded = {e[0] for e in entries}
+    for module in ('tensorflow', 'sklearn.model_selection'):
+        if module in loaded:
+            print(f"⚠️  {module} is imported on the serving path")
+            continue
+        _, deferred_entries = time_import(f'import {module}')
+        cumulative = max((e[2] for e in deferred_entries if e[0] == module), default=0)
+        print(f"Deferred until first use: {module:<28} {cumulative / 1e6:.2f} s")
+
 def main():
     """Main startup function"""
+    parser = argparse.ArgumentParser(description='Run the ML Dashboard')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='report import-time breakdown of the application and exit')
+    args = parser.parse_args()
+    
+    if args.profile_startup:
+        profile_startup()
+        return
+    
     print("=" * 60)
     print("🤖 Machine Learning Dashboard")
     print("=" * 60)
@@ -33,18 +90,15 @@ def main():
         print("   Consider using a virtual environment for better dependency management")
         print()
     
-    # Check if required packages are installed
-    try:
-        import flask
-        import tensorflow
-        import numpy
-        import pandas
-        import sklearn
-        print("✅ All required packages are installed")
-    except ImportError as e:
-        print(f"❌ Missing required package: {e}")
+    # Check if required packages are installed (without importing TensorFlow,
+    # which the app only loads when a model is first trained or used)
+    missing = [name for name in ('flask', 'tensorflow', 'numpy', 'sklearn')
+               if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing required package: {', '.join(missing)}")
         print("Please run: pip install -r requirements.txt")
         return
+    print("✅ All required packages are installed")
     
     print()
     print("🚀 Starting Flask application...")
@@ -56,7 +110,8 @@ def main():
     
     # Start the Flask app
     try:
-        from app import app
+        from app import app, start_background_tasks
+        start_background_tasks()
         app.run(debug=True, host='0.0.0.0', port=5000)
     except KeyboardInterrupt:
         print("\n👋 Shutting down ML Dashboard...")
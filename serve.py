@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Production server
+Runs the dashboard in several worker processes: under gunicorn when it is
+installed, otherwise with a built-in pre-fork server, or as the async ASGI app
+(asgi.py) under uvicorn. Each worker gets its
+own TensorFlow thread budget; test sets and their predictions are memory-
+mapped from the model registry, so workers share one copy through the page cache
+"""
+
+import argparse
+import atexit
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# A worker that keeps dying is restarted at most this often
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+def default_workers():
+    return int(os.environ.get('ML_DASHBOARD_WORKERS', 0)) or os.cpu_count() or 1
+
+
+def tensorflow_threads(workers, intra_op=None, inter_op=None):
+    """Per-worker (intra_op, inter_op) thread counts; by default the cores are split between workers"""
+    intra_op = intra_op or int(os.environ.get('ML_DASHBOARD_TF_INTRA_OP_THREADS', 0)) \
+        or max(1, (os.cpu_count() or 1) // workers)
+    inter_op = inter_op or int(os.environ.get('ML_DASHBOARD_TF_INTER_OP_THREADS', 0)) or 1
+    return intra_op, inter_op
+
+
+def configure_environment(intra_op, inter_op):
+    """Settings inherited by every worker; must run before TensorFlow is imported"""
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op)
+    os.environ.setdefault('OMP_NUM_THREADS', str(intra_op))
+    # Job status must be readable from whichever worker a poll lands on
+    if not os.environ.get('ML_DASHBOARD_JOB_STATE_DIR'):
+        state_dir = tempfile.mkdtemp(prefix='ml-dashboard-jobs-')
+        os.environ['ML_DASHBOARD_JOB_STATE_DIR'] = state_dir
+        atexit.register(remove_state_dir, state_dir, os.getpid())
+
+
+def remove_state_dir(path, owner_pid):
+    """atexit handler; forked workers inherit it but must not delete the directory others still use"""
+    if os.getpid() == owner_pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def init_worker(intra_op, inter_op):
+    """Runs in each worker after the fork: thread limits, then warm up the served model"""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+    from app import ml_manager
+
+    try:
+        ml_manager.sync_with_registry()
+    except Exception as e:
+        print(f'[worker {os.getpid()}] Could not load the active model: {e}')
+
+
+def serve_gunicorn(args, intra_op, inter_op):
+    from gunicorn.app.base import BaseApplication
+
+    class DashboardApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{args.host}:{args.port}')
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', args.threads)
+            # Server-Sent Events connections stay open; only a stuck worker should time out
+            self.cfg.set('timeout', args.timeout)
+            self.cfg.set('preload_app', True)
+            self.cfg.set('post_fork', lambda server, worker: init_worker(intra_op, inter_op))
+
+        def load(self):
+            from app import app
+            return app
+
+    DashboardApplication().run()
+
+
+def serve_uvicorn(args):
+    """ASGI workers (see asgi.py); TensorFlow thread limits come from the inherited environment"""
+    import uvicorn
+
+    uvicorn.run('asgi:application', host=args.host, port=args.port, workers=args.workers, lifespan='on')
+
+
+def _worker(listener, args, intra_op, inter_op):
+    from werkzeug.serving import make_server
+
+    from app import app, stop_background_tasks
+
+    init_worker(intra_op, inter_op)
+    server = make_server(args.host, args.port, app, threaded=True, fd=listener.fileno())
+
+    def shutdown(signum, frame):
+        # shutdown() waits for serve_forever(), which this (main) thread is running
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent turns Ctrl+C into SIGTERM
+    try:
+        server.serve_forever()
+    finally:
+        stop_background_tasks()
+
+
+def serve_prefork(args, intra_op, inter_op):
+    """Bind once, fork ``args.workers`` processes that accept on the shared socket, restart any that die"""
+    import app  # Imported before forking so workers share its pages; it starts no threads
+
+    listener = socket.socket(socket.AF_INET6 if ':' in args.host else socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(args.backlog)
+
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _worker(listener, args, intra_op, inter_op)
+            except BaseException as e:
+                print(f'[worker {os.getpid()}] {e!r}')
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        spawn()
+    print(f'Serving on http://{args.host}:{args.port} with {args.workers} workers '
+          f'(TensorFlow threads: {intra_op} intra-op, {inter_op} inter-op each)')
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f'Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting')
+        if time.monotonic() - started < RESPAWN_DELAY_SECONDS:
+            time.sleep(RESPAWN_DELAY_SECONDS)
+        spawn()
+    listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the ML Dashboard with several worker processes')
+    parser.add_argument('--host', default=os.environ.get('ML_DASHBOARD_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('ML_DASHBOARD_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='worker processes (default: ML_DASHBOARD_WORKERS or the CPU count)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='request threads per worker (gunicorn); each open /api/stream '
+                             'connection holds one for as long as the dashboard stays open')
+    parser.add_argument('--intra-op-threads', type=int, help='TensorFlow intra-op threads per worker')
+    parser.add_argument('--inter-op-threads', type=int, help='TensorFlow inter-op threads per worker')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'uvicorn', 'builtin'), default='auto',
+                        help='gunicorn when installed (auto), the async ASGI app under uvicorn, '
+                             'or the built-in pre-fork server')
+    parser.add_argument('--timeout', type=int, default=120, help='gunicorn worker timeout in seconds')
+    parser.add_argument('--backlog', type=int, default=128, help='listen backlog (built-in server)')
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    intra_op, inter_op = tensorflow_threads(args.workers, args.intra_op_threads, args.inter_op_threads)
+    configure_environment(intra_op, inter_op)
+
+    server = args.server
+    if server == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            server = 'gunicorn'
+        except ImportError:
+            server = 'builtin'
+    if server == 'builtin' and not hasattr(os, 'fork'):
+        print('The built-in pre-fork server needs os.fork(); running a single worker')
+        args.workers = 1
+        init_worker(intra_op, inter_op)
+        from app import app, start_background_tasks
+        start_background_tasks()
+        app.run(host=args.host, port=args.port, threaded=True)
+        return 0
+
+    if server == 'gunicorn':
+        serve_gunicorn(args, intra_op, inter_op)
+    elif server == 'uvicorn':
+        serve_uvicorn(args)
+    else:
+        serve_prefork(args, intra_op, inter_op)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
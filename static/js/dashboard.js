@@ -2,10 +2,14 @@
 class MLDashboard {
     constructor() {
         this.modelType = null;
+        this.modelName = null;
         this.isRealTimeEnabled = true;
         this.updateInterval = null;
+        this.eventSource = null;
         this.performanceHistory = [];
         this.predictionsData = null;
+        this.trainingJobId = null;
+        this.trainingTelemetry = { batches: [], epochs: [] };
         
         this.initializeEventListeners();
         this.initializeCharts();
@@ -20,6 +24,13 @@ class MLDashboard {
         document.getElementById('train-regression').addEventListener('click', () => {
             this.trainModel('regression');
         });
+        document.getElementById('run-sweep').addEventListener('click', () => {
+            this.runSweep();
+        });
+
+        document.getElementById('model-select').addEventListener('change', (e) => {
+            this.selectModel(e.target.value);
+        });
 
         // Real-time toggle
         document.getElementById('real-time-toggle').addEventListener('change', (e) => {
@@ -41,17 +52,37 @@ class MLDashboard {
 
             const result = await response.json();
             
-            if (result.status === 'success') {
+            if (result.status !== 'accepted') {
+                throw new Error(result.message);
+            }
+
+            // Live loss curve: telemetry arrives as 'training' events on the stream
+            this.trainingJobId = result.job_id;
+            this.trainingTelemetry = { batches: [], epochs: [] };
+            this.updateTrainingLossChart();
+            if (window.EventSource && !this.eventSource) this.openEventStream();
+
+            const job = await this.waitForJob(result.job_id);
+            if (job.status === 'completed') {
                 this.modelType = type;
-                this.showStatusMessage(`Model trained successfully!`, 'success');
+                this.modelName = job.model || type;
+                this.performanceHistory = [];
+                this.loadModelList();
+                const summary = job.summary
+                    ? ` ${job.summary.epochs_run} epochs in ${job.summary.wall_time_seconds.toFixed(1)}s`
+                      + ` (${Math.round(job.summary.samples_per_second)} samples/sec)`
+                    : '';
+                this.showStatusMessage(`Model trained successfully!${summary}`, 'success');
                 this.hideLoadingModal();
                 this.loadModelInfo();
+                await this.loadPerformanceHistory();
                 this.loadPerformanceMetrics();
                 this.loadPredictions();
+                this.loadDrift();
                 this.showDashboardSections();
                 this.startRealTimeUpdates();
             } else {
-                throw new Error(result.message);
+                throw new Error(job.error || 'Training failed');
             }
         } catch (error) {
             this.hideLoadingModal();
@@ -59,9 +90,252 @@ class MLDashboard {
         }
     }
 
+    async waitForJob(jobId, pollInterval = 1000) {
+        // Poll the training job until it finishes, showing per-epoch progress
+        while (true) {
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const result = await response.json();
+
+            if (result.status !== 'success') {
+                throw new Error(result.message);
+            }
+
+            const job = result.job;
+            this.updateTrainingProgress(job);
+            // Telemetry events only reach a stream opened on the worker running the job,
+            // so polling stays the source of truth and events fill in between polls
+            await this.loadTrainingTelemetry(jobId);
+            if (job.status === 'completed' || job.status === 'failed') {
+                return job;
+            }
+
+            await new Promise(resolve => setTimeout(resolve, pollInterval));
+        }
+    }
+
+    updateTrainingProgress(job) {
+        const progressText = document.getElementById('training-progress');
+        if (!progressText) return;
+
+        if (job.status === 'queued') {
+            progressText.textContent = 'Waiting for a training worker...';
+        } else if (job.total_epochs) {
+            const loss = job.progress && job.progress.loss !== undefined
+                ? ` (loss ${job.progress.loss.toFixed(4)})` : '';
+            progressText.textContent = `Epoch ${job.epoch} of ${job.total_epochs}${loss}`;
+        } else {
+            progressText.textContent = 'Please wait while the model is being trained.';
+        }
+    }
+
+    async loadTrainingTelemetry(jobId) {
+        const response = await fetch(`/api/jobs/${jobId}/telemetry`);
+        const result = await response.json();
+        if (result.status === 'success') {
+            this.trainingTelemetry = {
+                batches: result.telemetry.batches,
+                epochs: result.telemetry.epochs
+            };
+            this.updateTrainingLossChart();
+        }
+    }
+
+    handleTrainingTelemetry(data) {
+        if (data.job_id !== this.trainingJobId) return;
+
+        const records = data.kind === 'epoch' ? this.trainingTelemetry.epochs : this.trainingTelemetry.batches;
+        records.push(data.record);
+        if (records.length > 2000) records.shift();
+        this.updateTrainingLossChart();
+    }
+
+    updateTrainingLossChart() {
+        const container = d3.select('#training-loss-chart');
+        container.selectAll('*').remove();
+
+        const { batches, epochs } = this.trainingTelemetry;
+        const throughput = document.getElementById('training-throughput');
+        const latest = epochs.length ? epochs[epochs.length - 1] : batches[batches.length - 1];
+        throughput.textContent = latest && latest.samples_per_second
+            ? `${Math.round(latest.samples_per_second)} samples/sec, `
+              + `${latest.step_time_ms.toFixed(2)} ms/step, ${this.formatBytes(latest.rss_bytes)} RSS`
+            : '';
+        if (!batches.length && !epochs.length) return;
+
+        const margin = { top: 10, right: 10, bottom: 30, left: 45 };
+        const width = (container.node().offsetWidth || 400) - margin.left - margin.right;
+        const height = 180 - margin.top - margin.bottom;
+
+        const g = container.append('svg')
+            .attr('width', width + margin.left + margin.right)
+            .attr('height', height + margin.top + margin.bottom)
+            .append('g')
+            .attr('transform', `translate(${margin.left},${margin.top})`);
+
+        const points = batches.concat(epochs);
+        const xScale = d3.scaleLinear()
+            .domain([0, d3.max(points, d => d.global_step) || 1])
+            .range([0, width]);
+        const yScale = d3.scaleLinear()
+            .domain([0, d3.max(points, d => Math.max(d.loss || 0, d.val_loss || 0)) || 1])
+            .nice()
+            .range([height, 0]);
+
+        g.append('g')
+            .attr('transform', `translate(0,${height})`)
+            .call(d3.axisBottom(xScale).ticks(5));
+        g.append('g')
+            .call(d3.axisLeft(yScale).ticks(4));
+
+        const series = [
+            { data: batches, key: 'loss', color: '#adb5bd', width: 1 },
+            { data: epochs, key: 'loss', color: '#667eea', width: 2 },
+            { data: epochs, key: 'val_loss', color: '#f5576c', width: 2 }
+        ];
+        series.forEach(({ data, key, color, width: strokeWidth }) => {
+            const defined = data.filter(d => d[key] !== undefined);
+            if (!defined.length) return;
+            g.append('path')
+                .datum(defined)
+                .attr('fill', 'none')
+                .attr('stroke', color)
+                .attr('stroke-width', strokeWidth)
+                .attr('d', d3.line()
+                    .x(d => xScale(d.global_step))
+                    .y(d => yScale(d[key])));
+        });
+    }
+
+    formatBytes(bytes) {
+        if (!bytes) return '-';
+        const units = ['B', 'KB', 'MB', 'GB'];
+        const i = Math.min(units.length - 1, Math.floor(Math.log(bytes) / Math.log(1024)));
+        return `${(bytes / Math.pow(1024, i)).toFixed(1)} ${units[i]}`;
+    }
+
+    async runSweep() {
+        const type = this.modelType || 'classification';
+        try {
+            const response = await fetch('/api/sweeps', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    model_type: type,
+                    strategy: 'halving',
+                    n_trials: 9,
+                    space: {
+                        hidden_layers: [[32], [64, 32], [128, 64]],
+                        learning_rate: {min: 0.0001, max: 0.01, log: true},
+                        dropout: [0.1, 0.3]
+                    }
+                })
+            });
+            const result = await response.json();
+
+            if (result.status !== 'accepted') {
+                throw new Error(result.message);
+            }
+
+            this.showStatusMessage(result.message, 'info');
+            this.displaySweepLeaderboard(result.sweep);
+            // 'sweep' events update the leaderboard sooner, but only when the live stream
+            // is served by the worker running the sweep; polling covers every other case
+            if (window.EventSource && !this.eventSource) this.openEventStream();
+            this.pollSweep(result.sweep_id);
+        } catch (error) {
+            this.showStatusMessage(`Error: ${error.message}`, 'danger');
+        }
+    }
+
+    async pollSweep(sweepId, pollInterval = 2000) {
+        while (true) {
+            const response = await fetch(`/api/sweeps/${sweepId}`);
+            const result = await response.json();
+            if (result.status !== 'success') return;
+
+            this.displaySweepLeaderboard(result.sweep);
+            if (!['queued', 'running'].includes(result.sweep.status)) return;
+            await new Promise(resolve => setTimeout(resolve, pollInterval));
+        }
+    }
+
+    displaySweepLeaderboard(sweep) {
+        document.getElementById('sweep-section').style.display = 'block';
+
+        const counts = Object.entries(sweep.trial_counts || {})
+            .map(([status, count]) => `${count} ${status}`).join(', ');
+        document.getElementById('sweep-status').textContent =
+            `${sweep.strategy} ${sweep.model_type} sweep - ${sweep.status}${counts ? ` (${counts})` : ''}`;
+
+        const tbody = document.querySelector('#sweep-leaderboard tbody');
+        tbody.innerHTML = '';
+        sweep.leaderboard.forEach((trial, rank) => {
+            const params = Object.entries(trial.params)
+                .map(([name, value]) => `${name}=${typeof value === 'number' && !Number.isInteger(value)
+                    ? value.toPrecision(3) : JSON.stringify(value)}`)
+                .join(' ');
+            const metrics = trial.metrics || {};
+            const metric = metrics.accuracy !== undefined
+                ? `accuracy ${metrics.accuracy.toFixed(3)}`
+                : (metrics.r2_score !== undefined ? `R² ${metrics.r2_score.toFixed(3)}` : '-');
+            const statusClass = trial.status === 'completed' ? 'bg-success'
+                : (trial.status === 'pruned' ? 'bg-secondary' : 'bg-danger');
+
+            const row = tbody.insertRow();
+            row.innerHTML = `
+                <td>${rank + 1}</td>
+                <td>${trial.trial}</td>
+                <td>${trial.rung}</td>
+                <td><code>${params}</code></td>
+                <td>${trial.score.toFixed(4)} <small class="text-muted">${trial.monitor}</small></td>
+                <td>${metric}</td>
+                <td>${trial.epochs_run}</td>
+                <td><span class="badge ${statusClass}">${trial.status}</span></td>
+            `;
+        });
+    }
+
+    modelQuery(separator = '?') {
+        // Every model-serving route takes ?model=; without it the server's default model is used
+        return this.modelName ? `${separator}model=${encodeURIComponent(this.modelName)}` : '';
+    }
+
+    async loadModelList() {
+        try {
+            const response = await fetch('/api/models');
+            const result = await response.json();
+            if (result.status !== 'success') return;
+
+            const select = document.getElementById('model-select');
+            const models = result.serving.models;
+            select.innerHTML = models.map(model => `
+                <option value="${model.name}" ${model.name === this.modelName ? 'selected' : ''}>
+                    ${model.name}${model.resident ? '' : ' (on disk)'}
+                </option>
+            `).join('');
+            select.style.display = models.length > 1 ? 'block' : 'none';
+        } catch (error) {
+            console.error('Error loading models:', error);
+        }
+    }
+
+    async selectModel(name) {
+        // Switching is served from memory (or a lazy reload), never a retrain
+        this.modelName = name;
+        this.performanceHistory = [];
+        this.loadModelInfo();
+        await this.loadPerformanceMetrics();
+        await this.loadPerformanceHistory();
+        this.loadPredictions();
+        this.loadDrift();
+        this.loadModelList();
+    }
+
     async loadModelInfo() {
         try {
-            const response = await fetch('/api/model/info');
+            const response = await fetch(`/api/model/info${this.modelQuery()}`);
             const result = await response.json();
             
             if (result.status === 'success') {
@@ -75,52 +349,86 @@ class MLDashboard {
     displayModelInfo(data) {
         const modelDetails = document.getElementById('model-details');
         modelDetails.innerHTML = `
-            <div class="col-md-3">
+            <div class="col-md-2">
                 <div class="metric-card">
                     <div class="metric-value">${data.model_type}</div>
                     <div class="metric-label">Model Type</div>
                 </div>
             </div>
-            <div class="col-md-3">
+            <div class="col-md-2">
                 <div class="metric-card">
                     <div class="metric-value">${data.total_params.toLocaleString()}</div>
                     <div class="metric-label">Total Parameters</div>
                 </div>
             </div>
-            <div class="col-md-3">
+            <div class="col-md-2">
                 <div class="metric-card">
                     <div class="metric-value">${data.layers.length}</div>
                     <div class="metric-label">Layers</div>
                 </div>
             </div>
-            <div class="col-md-3">
+            <div class="col-md-2">
                 <div class="metric-card">
-                    <div class="metric-value">${this.getModelSize(data.total_params)}</div>
+                    <div class="metric-value">${this.getModelSize(data)}</div>
                     <div class="metric-label">Model Size</div>
                 </div>
             </div>
+            <div class="col-md-2">
+                <div class="metric-card">
+                    <div class="metric-value">${data.flops_per_sample.toLocaleString()}</div>
+                    <div class="metric-label">FLOPs / Sample</div>
+                </div>
+            </div>
+            <div class="col-md-2">
+                <div class="metric-card">
+                    <div class="metric-value">${data.latency ? `${data.latency['1'].ms.toFixed(2)} ms` : '-'}</div>
+                    <div class="metric-label">Latency (1 row, ${data.backend})</div>
+                </div>
+            </div>
         `;
     }
 
-    getModelSize(paramCount) {
-        const sizeInMB = (paramCount * 4) / (1024 * 1024); // Assuming float32
-        return sizeInMB < 1 ? `${(sizeInMB * 1024).toFixed(0)} KB` : `${sizeInMB.toFixed(1)} MB`;
+    getModelSize(info) {
+        // Weight bytes as stored, measured by the server rather than assumed float32
+        return this.formatBytes(info.weight_bytes);
     }
 
     async loadPerformanceMetrics() {
         try {
-            const response = await fetch('/api/performance');
+            const response = await fetch(`/api/performance${this.modelQuery()}`);
             const result = await response.json();
             
             if (result.status === 'success') {
+                this.modelType = result.model_type;
                 this.displayPerformanceMetrics(result.metrics);
                 this.updatePerformanceTrend(result.metrics);
+                this.displayConfusionMatrix(result.metrics);
             }
         } catch (error) {
             console.error('Error loading performance metrics:', error);
         }
     }
 
+    async loadPerformanceHistory() {
+        // Columnar layout: one array per metric instead of a dict per point
+        try {
+            const response = await fetch(`/api/history/performance?layout=columnar&points=50${this.modelQuery('&')}`);
+            const result = await response.json();
+
+            if (result.status === 'success') {
+                const { timestamp, ...columns } = result.history;
+                const metricKey = this.modelType === 'classification' ? 'accuracy' : 'r2_score';
+                this.performanceHistory = timestamp.map((t, i) => {
+                    const point = { timestamp: new Date(t * 1000) };
+                    Object.keys(columns).forEach(name => { point[name] = columns[name][i]; });
+                    return point;
+                }).filter(point => point[metricKey] != null);
+            }
+        } catch (error) {
+            console.error('Error loading performance history:', error);
+        }
+    }
+
     displayPerformanceMetrics(metrics) {
         const metricsCards = document.getElementById('metrics-cards');
         let metricsHTML = '';
@@ -184,9 +492,97 @@ class MLDashboard {
         metricsCards.innerHTML = metricsHTML;
     }
 
+    displayConfusionMatrix(metrics) {
+        const section = document.getElementById('additional-charts-section');
+        const matrixSection = document.getElementById('confusion-matrix-section');
+
+        if (!metrics.confusion_matrix) {
+            matrixSection.style.display = 'none';
+            section.style.display = 'none';
+            return;
+        }
+
+        section.style.display = 'flex';
+        matrixSection.style.display = 'block';
+
+        const matrix = metrics.confusion_matrix;
+        const labels = metrics.per_class.map(c => String(c.label));
+        const cells = [];
+        matrix.forEach((row, i) => {
+            row.forEach((count, j) => {
+                cells.push({ actual: labels[i], predicted: labels[j], count, correct: i === j });
+            });
+        });
+
+        const container = d3.select('#confusion-matrix-chart');
+        container.selectAll('*').remove();
+
+        const margin = { top: 20, right: 20, bottom: 50, left: 60 };
+        const size = Math.min(container.node().offsetWidth, 400) - margin.left - margin.right;
+
+        const svg = container
+            .append('svg')
+            .attr('width', size + margin.left + margin.right)
+            .attr('height', size + margin.top + margin.bottom);
+
+        const g = svg
+            .append('g')
+            .attr('transform', `translate(${margin.left},${margin.top})`);
+
+        const xScale = d3.scaleBand().domain(labels).range([0, size]).padding(0.05);
+        const yScale = d3.scaleBand().domain(labels).range([0, size]).padding(0.05);
+        const color = d3.scaleSequential(d3.interpolateBlues)
+            .domain([0, d3.max(cells, d => d.count) || 1]);
+
+        g.append('g')
+            .attr('transform', `translate(0,${size})`)
+            .call(d3.axisBottom(xScale));
+
+        g.append('g')
+            .call(d3.axisLeft(yScale));
+
+        g.selectAll('.matrix-cell')
+            .data(cells)
+            .enter()
+            .append('rect')
+            .attr('class', 'matrix-cell')
+            .attr('x', d => xScale(d.predicted))
+            .attr('y', d => yScale(d.actual))
+            .attr('width', xScale.bandwidth())
+            .attr('height', yScale.bandwidth())
+            .attr('fill', d => color(d.count));
+
+        g.selectAll('.matrix-label')
+            .data(cells)
+            .enter()
+            .append('text')
+            .attr('class', 'matrix-label')
+            .attr('x', d => xScale(d.predicted) + xScale.bandwidth() / 2)
+            .attr('y', d => yScale(d.actual) + yScale.bandwidth() / 2)
+            .attr('dy', '0.35em')
+            .style('text-anchor', 'middle')
+            .style('fill', d => d.count > color.domain()[1] / 2 ? '#fff' : '#333')
+            .text(d => d.count);
+
+        g.append('text')
+            .attr('class', 'axis-label')
+            .attr('transform', `translate(${size / 2}, ${size + margin.bottom - 10})`)
+            .style('text-anchor', 'middle')
+            .text('Predicted');
+
+        g.append('text')
+            .attr('class', 'axis-label')
+            .attr('transform', 'rotate(-90)')
+            .attr('y', 0 - margin.left)
+            .attr('x', 0 - (size / 2))
+            .attr('dy', '1em')
+            .style('text-anchor', 'middle')
+            .text('Actual');
+    }
+
     async loadPredictions() {
         try {
-            const response = await fetch('/api/predictions?n=20');
+            const response = await fetch(`/api/predictions?n=20${this.modelQuery('&')}`);
             const result = await response.json();
             
             if (result.status === 'success') {
@@ -199,6 +595,19 @@ class MLDashboard {
         }
     }
 
+    async loadDrift() {
+        try {
+            const response = await fetch(`/api/drift${this.modelQuery()}`);
+            const result = await response.json();
+
+            if (result.status === 'success') {
+                this.updateDriftChart(result.drift);
+            }
+        } catch (error) {
+            console.error('Error loading drift scores:', error);
+        }
+    }
+
     displayPredictionsTable(predictions) {
         const tbody = document.querySelector('#predictions-table tbody');
         tbody.innerHTML = '';
@@ -235,6 +644,7 @@ class MLDashboard {
     initializeCharts() {
         this.initializePerformanceTrendChart();
         this.initializePredictionsScatterChart();
+        this.initializeDriftChart();
     }
 
     initializePerformanceTrendChart() {
@@ -453,10 +863,115 @@ class MLDashboard {
             .attr('stroke-dasharray', '5,5');
     }
 
+    initializeDriftChart() {
+        const container = d3.select('#drift-chart');
+        container.selectAll('*').remove();
+
+        const margin = { top: 10, right: 20, bottom: 40, left: 50 };
+        const width = container.node().offsetWidth - margin.left - margin.right;
+        const height = 220 - margin.top - margin.bottom;
+
+        const svg = container
+            .append('svg')
+            .attr('width', width + margin.left + margin.right)
+            .attr('height', height + margin.top + margin.bottom);
+
+        const g = svg
+            .append('g')
+            .attr('transform', `translate(${margin.left},${margin.top})`);
+
+        g.append('g')
+            .attr('class', 'x-axis')
+            .attr('transform', `translate(0,${height})`);
+
+        g.append('g')
+            .attr('class', 'y-axis');
+
+        g.append('text')
+            .attr('class', 'axis-label')
+            .attr('transform', `translate(${width / 2}, ${height + margin.bottom - 5})`)
+            .style('text-anchor', 'middle')
+            .text('Feature');
+
+        this.driftChart = { svg, g, width, height, margin };
+        if (this.driftData) {
+            this.updateDriftChart(this.driftData);
+        }
+    }
+
+    updateDriftChart(drift) {
+        this.driftData = drift;
+        const badge = document.getElementById('drift-status');
+        const summary = document.getElementById('drift-summary');
+        const badgeClass = { stable: 'bg-success', moderate: 'bg-warning', drift: 'bg-danger' };
+
+        if (!drift.features) {
+            badge.className = 'badge bg-secondary';
+            badge.textContent = `Waiting for traffic (${drift.observed_rows}/${drift.min_rows} rows)`;
+            summary.textContent = 'Scores appear once enough rows have gone through /api/predict.';
+            if (this.driftChart) this.driftChart.g.selectAll('.drift-bar, .drift-threshold').remove();
+            return;
+        }
+
+        badge.className = `badge ${badgeClass[drift.status]}`;
+        badge.textContent = drift.status;
+        summary.textContent = `${drift.observed_rows.toLocaleString()} rows observed · max PSI `
+            + `${drift.psi_max.toFixed(3)} · max KS ${drift.ks_max.toFixed(3)} · `
+            + `${drift.drifted_features} drifted feature(s)`;
+        if (!this.driftChart) return;
+
+        const { g, width, height } = this.driftChart;
+        const data = drift.features.psi.map((psi, i) => ({ feature: i, psi }));
+
+        const xScale = d3.scaleBand()
+            .domain(data.map(d => d.feature))
+            .range([0, width])
+            .padding(0.2);
+
+        // Keep the 0.1 and 0.2 bands visible even when every feature is stable
+        const yScale = d3.scaleLinear()
+            .domain([0, Math.max(0.25, d3.max(data, d => d.psi))])
+            .range([height, 0]);
+
+        g.select('.x-axis')
+            .call(d3.axisBottom(xScale));
+
+        g.select('.y-axis')
+            .call(d3.axisLeft(yScale).ticks(5).tickFormat(d3.format('.2f')));
+
+        const bars = g.selectAll('.drift-bar')
+            .data(data);
+
+        bars.exit().remove();
+
+        bars.enter()
+            .append('rect')
+            .attr('class', 'drift-bar')
+            .merge(bars)
+            .attr('x', d => xScale(d.feature))
+            .attr('width', xScale.bandwidth())
+            .attr('y', d => yScale(d.psi))
+            .attr('height', d => height - yScale(d.psi))
+            .attr('fill', d => d.psi > 0.2 ? '#dc3545' : (d.psi > 0.1 ? '#ffc107' : '#28a745'));
+
+        g.selectAll('.drift-threshold').remove();
+        [0.1, 0.2].forEach(threshold => {
+            g.append('line')
+                .attr('class', 'drift-threshold')
+                .attr('x1', 0)
+                .attr('x2', width)
+                .attr('y1', yScale(threshold))
+                .attr('y2', yScale(threshold))
+                .attr('stroke', '#666')
+                .attr('stroke-dasharray', '5,5');
+        });
+    }
+
     showDashboardSections() {
         document.getElementById('model-info-section').style.display = 'block';
         document.getElementById('performance-section').style.display = 'block';
         document.getElementById('charts-section').style.display = 'block';
+        document.getElementById('drift-section').style.display = 'block';
         document.getElementById('predictions-table-section').style.display = 'block';
     }
 
@@ -499,20 +1014,86 @@ class MLDashboard {
     startRealTimeUpdates() {
         if (!this.isRealTimeEnabled || !this.modelType) return;
 
-        this.stopRealTimeUpdates(); // Clear any existing interval
-        
+        this.stopRealTimeUpdates(); // Close any existing stream or interval
+
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+
+        this.openEventStream();
+    }
+
+    openEventStream() {
+        // The server computes each tick once and pushes it to every open dashboard
+        this.eventSource = new EventSource('/api/stream');
+
+        this.eventSource.addEventListener('metrics', (event) => {
+            const data = JSON.parse(event.data);
+            if (!this.isSelectedModel(data)) return;
+            this.modelType = data.model_type;
+            this.displayPerformanceMetrics(data.metrics);
+            this.updatePerformanceTrend(data.metrics);
+            this.displayConfusionMatrix(data.metrics);
+        });
+
+        this.eventSource.addEventListener('predictions', (event) => {
+            const data = JSON.parse(event.data);
+            if (!this.isSelectedModel(data)) return;
+            this.predictionsData = data.predictions;
+            this.displayPredictionsTable(data.predictions);
+            this.updatePredictionsScatter(data.predictions);
+        });
+
+        this.eventSource.addEventListener('drift', (event) => {
+            const data = JSON.parse(event.data);
+            if (!this.isSelectedModel(data)) return;
+            this.updateDriftChart(data.drift);
+        });
+
+        this.eventSource.addEventListener('training', (event) => {
+            this.handleTrainingTelemetry(JSON.parse(event.data));
+        });
+
+        this.eventSource.addEventListener('sweep', (event) => {
+            this.displaySweepLeaderboard(JSON.parse(event.data));
+        });
+
+        this.eventSource.onopen = () => this.setConnectionStatus(true);
+        // EventSource reconnects on its own; just reflect the state
+        this.eventSource.onerror = () => this.setConnectionStatus(false);
+    }
+
+    isSelectedModel(data) {
+        // Every resident model ticks on the same stream
+        return !data.model || !this.modelName || data.model === this.modelName;
+    }
+
+    startPolling() {
         this.updateInterval = setInterval(() => {
             this.loadPerformanceMetrics();
             this.loadPredictions();
+            this.loadDrift();
         }, 5000); // Update every 5 seconds
     }
 
     stopRealTimeUpdates() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
         if (this.updateInterval) {
             clearInterval(this.updateInterval);
             this.updateInterval = null;
         }
     }
+
+    setConnectionStatus(connected) {
+        const status = document.getElementById('connection-status');
+        status.innerHTML = connected
+            ? '<i class="fas fa-circle text-success"></i> Connected'
+            : '<i class="fas fa-circle text-warning"></i> Reconnecting...';
+    }
 }
 
 // Initialize dashboard when page loads
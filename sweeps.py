@@ -0,0 +1,659 @@
+"""
+Hyperparameter sweeps
+Grid, random and successive-halving search over TrainingSpec parameters. Trials
+run in a pool of worker processes, each limited to its share of the CPU
+threads, and trials that fall behind the median of finished ones are stopped
+"""
+
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from training_spec import MODEL_TYPES, TrainingSpec
+
+STRATEGIES = ('grid', 'random', 'halving')
+SEARCHABLE = ('hidden_layers', 'dropout', 'activation', 'batch_size', 'epochs', 'learning_rate',
+              'early_stopping', 'mixed_precision', 'steps_per_execution')
+MAX_TRIALS = 256
+# Random draws tried per requested trial before settling for fewer distinct ones
+MAX_DRAWS_PER_TRIAL = 50
+# How often a queued sweep retries the shared runner lock and a running one looks for a cancel request
+STATE_POLL_SECONDS = 1.0
+
+
+def _init_worker(intra_op_threads, inter_op_threads):
+    """Process pool initializer: cap TensorFlow's thread pools before it starts"""
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+    os.environ['OMP_NUM_THREADS'] = str(intra_op_threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def _median_stopping_callback(reference_curve, grace_epochs):
+    """Keras callback that stops a trial once it is worse than the median curve"""
+    import tensorflow as tf
+
+    class MedianStopping(tf.keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.pruned = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            monitor = 'val_loss' if 'val_loss' in (logs or {}) else 'loss'
+            if epoch + 1 < grace_epochs or epoch >= len(reference_curve):
+                return
+            if logs.get(monitor, math.inf) > reference_curve[epoch]:
+                self.pruned = True
+                self.model.stop_training = True
+
+    return MedianStopping()
+
+
+def run_trial(model_type, params, data_options, data_root, reference_curve=None, grace_epochs=3):
+    """Train and score one configuration (runs in a worker process)"""
+    from datasets import load_training_data
+    from inference_backends import NumpyMLPBackend, create_backend
+    from metrics_engine import classification_metrics, regression_metrics, scalar_metrics
+    from training_spec import build_model, fit_model
+
+    import numpy as np
+
+    spec = TrainingSpec.from_dict(dict(params, data=data_options), data_root=data_root)
+    data = load_training_data(spec.data, model_type)
+    model = build_model(spec, model_type, data.n_features, data.n_classes)
+
+    callbacks = []
+    if reference_curve:
+        callbacks.append(_median_stopping_callback(reference_curve, grace_epochs))
+    history, summary = fit_model(model, spec, data, callbacks=callbacks)
+
+    monitor = 'val_loss' if 'val_loss' in history else 'loss'
+    metrics = {}
+    if data.X_test is not None and len(data.X_test):
+        outputs = create_backend(NumpyMLPBackend.name, model).predict(data.X_test)
+        if model_type == 'classification':
+            metrics = classification_metrics(data.y_test, np.argmax(outputs, axis=1), data.n_classes)
+        else:
+            metrics = regression_metrics(data.y_test, outputs.ravel())
+
+    summary.pop('spec', None)
+    return {
+        'score': float(min(history[monitor])),
+        'monitor': monitor,
+        'curve': [float(value) for value in history[monitor]],
+        'metrics': scalar_metrics(metrics),
+        'summary': summary,
+        'pruned': any(getattr(callback, 'pruned', False) for callback in callbacks)
+    }
+
+
+def _sample(value, rng):
+    """Draw one value: lists are choices, {"min", "max", "log"} objects are ranges"""
+    if isinstance(value, list):
+        return rng.choice(value)
+    low, high = value['min'], value['max']
+    if value.get('log'):
+        sampled = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        sampled = rng.uniform(low, high)
+    if isinstance(low, int) and isinstance(high, int):
+        return int(round(sampled))
+    return sampled
+
+
+def _key(value):
+    return repr(value)
+
+
+def _distinct(candidates):
+    """Parameter sets in order with repeats dropped"""
+    seen = set()
+    for params in candidates:
+        key = tuple((name, _key(value)) for name, value in params.items())
+        if key not in seen:
+            seen.add(key)
+            yield params
+
+
+def halving_rungs(n_candidates, eta):
+    """Rungs after the first, floor(log_eta(n_candidates)) in integer arithmetic"""
+    rungs, size = 0, eta
+    while size <= n_candidates:
+        rungs += 1
+        size *= eta
+    return rungs
+
+
+def expand_space(space, strategy, n_trials, seed):
+    """Parameter sets for the first round of a sweep"""
+    if not space or not isinstance(space, dict):
+        raise ValueError('space must be an object naming at least one parameter to search')
+    unknown = set(space) - set(SEARCHABLE)
+    if unknown:
+        raise ValueError(f"Cannot search over: {', '.join(sorted(unknown))}")
+    for name, value in space.items():
+        is_range = isinstance(value, dict) and {'min', 'max'} <= set(value)
+        if not (isinstance(value, list) and value) and not is_range:
+            raise ValueError(f'{name} must be a non-empty list or a {{"min", "max"}} range')
+        if is_range and strategy == 'grid':
+            raise ValueError('Grid search needs a list of values for every parameter')
+        if is_range:
+            low, high = value['min'], value['max']
+            if not all(isinstance(bound, (int, float)) and not isinstance(bound, bool) for bound in (low, high)):
+                raise ValueError(f'{name} range bounds must be numbers')
+            if low > high:
+                raise ValueError(f'{name} range min must not exceed max')
+            if value.get('log') and low <= 0:
+                raise ValueError(f'{name} log range needs min > 0')
+
+    names = list(space)
+    all_lists = all(isinstance(value, list) for value in space.values())
+    grid_size = math.prod(len({_key(v) for v in value}) for value in space.values()) if all_lists else None
+    if strategy == 'grid' or (grid_size is not None and grid_size <= n_trials):
+        # Fewer distinct configurations than trials: run each of them once
+        grid = (dict(zip(names, values)) for values in itertools.product(*space.values()))
+        candidates = list(itertools.islice(_distinct(grid), MAX_TRIALS + 1))
+    else:
+        rng = random.Random(seed)
+        draws = ({name: _sample(value, rng) for name, value in space.items()}
+                 for _ in range(n_trials * MAX_DRAWS_PER_TRIAL))
+        # Sampling is with replacement; repeats would only retrain the same configuration
+        candidates = list(itertools.islice(_distinct(draws), n_trials))
+
+    if len(candidates) > MAX_TRIALS:
+        raise ValueError(f'Sweep would run {len(candidates)} trials; the limit is {MAX_TRIALS}')
+    return candidates
+
+
+class Trial:
+    """One configuration trained at one budget"""
+
+    def __init__(self, number, params, rung=0):
+        self.number = number
+        self.params = params
+        self.rung = rung
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+
+    @property
+    def score(self):
+        return self.result['score'] if self.result else None
+
+    def to_dict(self):
+        result = self.result or {}
+        return {
+            'trial': self.number,
+            'rung': self.rung,
+            'status': self.status,
+            'params': self.params,
+            'score': self.score,
+            'monitor': result.get('monitor'),
+            'metrics': result.get('metrics'),
+            'epochs_run': result.get('summary', {}).get('epochs_run'),
+            'wall_time_seconds': result.get('summary', {}).get('wall_time_seconds'),
+            'error': self.error
+        }
+
+
+class Sweep:
+    """State and leaderboard of a hyperparameter sweep"""
+
+    def __init__(self, model_type, strategy, candidates, base, data_options, data_root,
+                 eta=3, grace_epochs=3, median_stopping=True):
+        self.id = uuid.uuid4().hex
+        self.model_type = model_type
+        self.strategy = strategy
+        self.candidates = candidates
+        self.base = base
+        self.data_options = data_options
+        self.data_root = data_root
+        self.eta = eta
+        self.grace_epochs = grace_epochs
+        self.median_stopping = median_stopping
+        self.trials = []
+        self.status = 'queued'
+        self.error = None
+        self.cancelled = threading.Event()
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    def leaderboard(self, limit=None):
+        """Scored trials, best first; later rungs (larger budgets) rank ahead"""
+        scored = [trial for trial in self.trials if trial.score is not None]
+        scored.sort(key=lambda trial: (-trial.rung, trial.score))
+        return scored[:limit] if limit else scored
+
+    def best_spec(self):
+        leaderboard = self.leaderboard(1)
+        if not leaderboard:
+            return None
+        spec = dict(self.base, **leaderboard[0].params)
+        if self.data_options is not None:
+            spec['data'] = self.data_options
+        return spec
+
+    def to_dict(self, include_trials=True, limit=10):
+        counts = {}
+        for trial in self.trials:
+            counts[trial.status] = counts.get(trial.status, 0) + 1
+        data = {
+            'id': self.id,
+            'model_type': self.model_type,
+            'strategy': self.strategy,
+            'status': self.status,
+            'error': self.error,
+            'n_configs': len(self.candidates),
+            'trial_counts': counts,
+            'leaderboard': [trial.to_dict() for trial in self.leaderboard(limit)],
+            'best_spec': self.best_spec(),
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if include_trials:
+            data['trials'] = [trial.to_dict() for trial in self.trials]
+        return data
+
+
+class StoredSweep:
+    """Read-only view of a sweep run by another process"""
+
+    def __init__(self, data):
+        self.data = data
+        self.id = data['id']
+        self.status = data['status']
+        self.created_at = data['created_at']
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    def to_dict(self, include_trials=True, limit=10):
+        data = dict(self.data, leaderboard=self.data['leaderboard'][:limit] if limit else self.data['leaderboard'])
+        if not include_trials:
+            data.pop('trials', None)
+        return data
+
+
+class SweepManager:
+    """Runs sweeps one at a time on a shared pool of trial processes.
+
+    The process pool is created on first use and kept, so workers pay for the
+    TensorFlow import once. Each worker gets ``cpu_count // max_workers``
+    intra-op threads, which keeps parallel trials from oversubscribing cores.
+
+    With ``state_dir`` set, processes serving the same application share
+    sweeps: each one's state is written there whenever it changes, so any
+    process can report or cancel it, and a lock file there lets only one
+    process run sweeps at a time, so the machine's cores are split between
+    one pool's trials. That pool is shut down after each sweep rather than
+    kept idle in every process.
+    """
+
+    def __init__(self, max_workers=None, publish=None, max_finished_sweeps=20, state_dir=None):
+        cpus = os.cpu_count() or 1
+        self.max_workers = max(1, max_workers or min(4, cpus))
+        self.intra_op_threads = max(1, cpus // self.max_workers)
+        self.publish = publish
+        self.max_finished_sweeps = max_finished_sweeps
+        self.state_dir = state_dir
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        self._coordinator = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sweep-coordinator')
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._sweeps = OrderedDict()
+
+    def create(self, options, data_root='data'):
+        """Validate a sweep request and queue it; raises ValueError on bad input"""
+        if options is not None and not isinstance(options, dict):
+            raise ValueError('Sweep options must be a JSON object')
+        options = dict(options or {})
+        allowed = ('model_type', 'strategy', 'space', 'base', 'n_trials', 'seed', 'eta',
+                   'grace_epochs', 'median_stopping')
+        unknown = set(options) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown sweep option(s): {', '.join(sorted(unknown))}")
+
+        model_type = options.get('model_type', 'classification')
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f'model_type must be one of {", ".join(MODEL_TYPES)}')
+        strategy = options.get('strategy', 'random')
+        if strategy not in STRATEGIES:
+            raise ValueError(f'strategy must be one of {", ".join(STRATEGIES)}')
+        try:
+            n_trials = int(options.get('n_trials', 8))
+            eta = int(options.get('eta', 3))
+            grace_epochs = int(options.get('grace_epochs', 3))
+        except (TypeError, ValueError):
+            raise ValueError('n_trials, eta and grace_epochs must be integers')
+        seed = options.get('seed')
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            raise ValueError('seed must be an integer')
+        if n_trials < 1 or eta < 2:
+            raise ValueError('n_trials must be positive and eta at least 2')
+
+        base = options.get('base') or {}
+        if not isinstance(base, dict):
+            raise ValueError('base must be a JSON object')
+        base = dict(base)
+        data_options = base.pop('data', None)
+        candidates = expand_space(options.get('space'), strategy, n_trials, seed)
+
+        # Build every configuration once here so bad values fail the request, not a worker
+        base_spec = TrainingSpec.from_dict(dict(base, data=data_options), data_root=data_root)
+        if base_spec.data.path:
+            base_spec.data.resolve_files()
+        for params in candidates:
+            TrainingSpec.from_dict(dict(base, **params), data_root=data_root)
+
+        sweep = Sweep(model_type, strategy, candidates, base, data_options, data_root, eta=eta,
+                      grace_epochs=grace_epochs,
+                      median_stopping=bool(options.get('median_stopping', True)))
+        with self._lock:
+            self._sweeps[sweep.id] = sweep
+            self._trim_finished()
+        self._save_state(sweep)
+        self._coordinator.submit(self._run, sweep)
+        return sweep
+
+    def get(self, sweep_id):
+        """A sweep of this process, or the stored state of one run by another process"""
+        with self._lock:
+            sweep = self._sweeps.get(sweep_id)
+        return sweep if sweep is not None else self._load_state(sweep_id)
+
+    def list_sweeps(self):
+        """Sweeps of this process and, with ``state_dir``, those stored by others, newest first"""
+        with self._lock:
+            sweeps = list(self._sweeps.values())
+        if self.state_dir:
+            local = {sweep.id for sweep in sweeps}
+            for filename in os.listdir(self.state_dir):
+                if filename.startswith('sweep-') and filename.endswith('.json'):
+                    sweep_id = filename[len('sweep-'):-len('.json')]
+                    stored = None if sweep_id in local else self._load_state(sweep_id)
+                    if stored is not None:
+                        sweeps.append(stored)
+        return sorted(sweeps, key=lambda sweep: sweep.created_at, reverse=True)
+
+    def cancel(self, sweep_id):
+        """Stop scheduling trials; running trials finish but are not waited for.
+
+        A sweep run by another process is asked to stop through a marker file
+        it checks every STATE_POLL_SECONDS.
+        """
+        sweep = self.get(sweep_id)
+        if sweep is None or sweep.is_finished:
+            return sweep
+        if isinstance(sweep, StoredSweep):
+            try:
+                open(self._cancel_path(sweep_id), 'w').close()
+            except OSError as e:
+                print(f'Could not request cancellation of sweep {sweep_id}: {e}')
+        else:
+            sweep.cancelled.set()
+        return sweep
+
+    def _trim_finished(self):
+        finished = [sweep_id for sweep_id, sweep in self._sweeps.items() if sweep.is_finished]
+        for sweep_id in finished[:max(0, len(finished) - self.max_finished_sweeps)]:
+            del self._sweeps[sweep_id]
+            if self.state_dir:
+                for path in (self._state_path(sweep_id), self._cancel_path(sweep_id)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def _state_path(self, sweep_id):
+        if not sweep_id or not all(c in '0123456789abcdef' for c in sweep_id):
+            return None
+        return os.path.join(self.state_dir, f'sweep-{sweep_id}.json')
+
+    def _cancel_path(self, sweep_id):
+        return os.path.join(self.state_dir, f'sweep-{sweep_id}.cancel')
+
+    def _save_state(self, sweep):
+        if not self.state_dir:
+            return
+        path = self._state_path(sweep.id)
+        tmp = f'{path}.{uuid.uuid4().hex}'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump(sweep.to_dict(limit=None), fh)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f'Could not write state of sweep {sweep.id}: {e}')
+
+    def _load_state(self, sweep_id):
+        path = self._state_path(sweep_id) if self.state_dir else None
+        if path is None:
+            return None
+        try:
+            with open(path, encoding='utf-8') as fh:
+                return StoredSweep(json.load(fh))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _check_cancelled(self, sweep):
+        """Whether the sweep was cancelled here or, through its marker file, by another process"""
+        if not sweep.cancelled.is_set() and self.state_dir and os.path.exists(self._cancel_path(sweep.id)):
+            sweep.cancelled.set()
+        return sweep.cancelled.is_set()
+
+    def _claim_runner(self, sweep):
+        """Wait for the lock that lets one process of ``state_dir`` run sweeps.
+
+        Returns False if the sweep is cancelled while waiting. Like the
+        training-job locks, the lock file is linked into place fully written;
+        one whose process has died or whose sweep has finished is stale.
+        """
+        if not self.state_dir:
+            return True
+        path = os.path.join(self.state_dir, 'sweeps.lock')
+        tmp = f'{path}.{uuid.uuid4().hex}'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({'sweep_id': sweep.id, 'pid': os.getpid()}, fh)
+        try:
+            while not self._check_cancelled(sweep):
+                try:
+                    os.link(tmp, path)
+                    return True
+                except FileExistsError:
+                    pass
+                if self._runner_alive(path):
+                    time.sleep(STATE_POLL_SECONDS)
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            return False
+        finally:
+            os.remove(tmp)
+
+    def _runner_alive(self, path):
+        try:
+            with open(path, encoding='utf-8') as fh:
+                lock = json.load(fh)
+            os.kill(lock['pid'], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass  # Alive, owned by another user
+        except (OSError, ValueError, KeyError, TypeError):
+            return False  # Also when released meanwhile: the link is retried at once
+        holder = self.get(lock['sweep_id'])
+        return holder is not None and not holder.is_finished
+
+    def _release_runner(self, sweep):
+        if not self.state_dir:
+            return
+        path = os.path.join(self.state_dir, 'sweeps.lock')
+        try:
+            with open(path, encoding='utf-8') as fh:
+                if json.load(fh).get('sweep_id') != sweep.id:
+                    return  # Replaced as stale; not ours to remove
+            os.remove(path)
+        except (OSError, ValueError):
+            pass
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned, not forked: the parent process has TensorFlow and server threads running
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.intra_op_threads, 1)
+                )
+            return self._pool
+
+    def _reset_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _notify(self, sweep):
+        self._save_state(sweep)
+        if self.publish is not None:
+            self.publish('sweep', sweep.to_dict(include_trials=False))
+
+    def _run(self, sweep):
+        if not self._claim_runner(sweep):
+            sweep.status = 'cancelled'
+            sweep.finished_at = datetime.now().isoformat()
+            self._notify(sweep)
+            return
+        sweep.status = 'running'
+        sweep.started_at = datetime.now().isoformat()
+        self._notify(sweep)
+        try:
+            if sweep.strategy == 'halving':
+                self._run_halving(sweep)
+            else:
+                epochs = sweep.base.get('epochs')
+                self._run_round(sweep, sweep.candidates, rung=0, epochs=epochs)
+            sweep.status = 'cancelled' if self._check_cancelled(sweep) else 'completed'
+        except BrokenProcessPool as e:
+            sweep.error = f'A trial worker process died: {e}'
+            sweep.status = 'failed'
+            self._reset_pool()
+        except Exception as e:
+            sweep.error = str(e)
+            sweep.status = 'failed'
+        finally:
+            sweep.finished_at = datetime.now().isoformat()
+            self._notify(sweep)
+            if self.state_dir:
+                self._reset_pool()
+            self._release_runner(sweep)
+
+    def _run_halving(self, sweep):
+        """Successive halving: train everything briefly, keep the best 1/eta, repeat"""
+        max_epochs = int(sweep.base.get('epochs', TrainingSpec().epochs))
+        rungs = halving_rungs(len(sweep.candidates), sweep.eta)
+        survivors = sweep.candidates
+        for rung in range(rungs + 1):
+            epochs = max(1, int(round(max_epochs * sweep.eta ** (rung - rungs))))
+            trials = self._run_round(sweep, survivors, rung, epochs)
+            if self._check_cancelled(sweep):
+                return
+            ranked = sorted((trial for trial in trials if trial.score is not None),
+                            key=lambda trial: trial.score)
+            survivors = [trial.params for trial in ranked[:max(1, len(ranked) // sweep.eta)]]
+            if len(survivors) <= 1 and rung < rungs:
+                # Give the winner the full budget before finishing
+                self._run_round(sweep, survivors, rungs, max_epochs)
+                return
+
+    def _run_round(self, sweep, candidates, rung, epochs):
+        """Run one set of trials with at most max_workers in flight"""
+        pending = list(candidates)
+        trials = []
+        running = {}
+        curves = []
+        while (pending or running) and not (self._check_cancelled(sweep) and not running):
+            while pending and len(running) < self.max_workers and not sweep.cancelled.is_set():
+                params = dict(pending.pop(0))
+                if epochs is not None:
+                    params['epochs'] = epochs
+                trial = Trial(len(sweep.trials) + 1, params, rung)
+                sweep.trials.append(trial)
+                trials.append(trial)
+
+                reference = self._median_curve(curves) if sweep.median_stopping else None
+                future = self._get_pool().submit(
+                    run_trial, sweep.model_type, dict(sweep.base, **params), sweep.data_options,
+                    sweep.data_root, reference, sweep.grace_epochs
+                )
+                trial.status = 'running'
+                running[future] = trial
+
+            if not running:
+                break
+            # Wake up now and then to see cancel requests from other processes
+            done, _ = wait(running, timeout=STATE_POLL_SECONDS if self.state_dir else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                continue
+            for future in done:
+                trial = running.pop(future)
+                try:
+                    trial.result = future.result()
+                    trial.status = 'pruned' if trial.result['pruned'] else 'completed'
+                    if not trial.result['pruned']:
+                        curves.append(trial.result['curve'])
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    trial.error = str(e)
+                    trial.status = 'failed'
+            self._notify(sweep)
+        return trials
+
+    @staticmethod
+    def _median_curve(curves):
+        """Per-epoch median of the finished trials' loss curves"""
+        if len(curves) < 2:
+            return None
+        length = max(len(curve) for curve in curves)
+        median = []
+        for epoch in range(length):
+            values = [curve[epoch] for curve in curves if len(curve) > epoch]
+            median.append(statistics.median(values))
+        return median
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            sweeps = list(self._sweeps.values())
+        for sweep in sweeps:
+            sweep.cancelled.set()
+        self._coordinator.shutdown(wait=wait)
+        self._reset_pool()
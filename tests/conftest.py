@@ -0,0 +1,61 @@
+"""
+Shared fixtures for the API tests
+The app reads its directories from the environment at import time, so they
+point at a throwaway location before it is imported
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_TMP = tempfile.mkdtemp(prefix='ml-dashboard-tests-')
+os.environ['ML_DASHBOARD_MODEL_DIR'] = os.path.join(_TMP, 'models')
+os.environ['ML_DASHBOARD_DATA_DIR'] = os.path.join(_TMP, 'data')
+os.environ.pop('ML_DASHBOARD_JOB_STATE_DIR', None)
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+os.makedirs(os.environ['ML_DASHBOARD_DATA_DIR'], exist_ok=True)
+
+FAST_SPEC = {'epochs': 1, 'hidden_layers': [8]}
+
+
+@pytest.fixture(scope='session')
+def dashboard():
+    import app
+
+    yield app
+    app.stop_background_tasks()
+    app.training_queue.shutdown()
+    app.sweep_manager.shutdown()
+
+
+@pytest.fixture
+def client(dashboard):
+    return dashboard.app.test_client()
+
+
+def wait_for_job(client, job_id, timeout=120):
+    """Poll a training job until it finishes; returns its final state"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()['job']
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f'Training job {job_id} did not finish within {timeout}s')
+
+
+@pytest.fixture(scope='session')
+def trained(dashboard):
+    """A classification model trained through the API, served as the default model"""
+    client = dashboard.app.test_client()
+    response = client.post('/api/train/classification', json=FAST_SPEC)
+    assert response.status_code == 202
+    job = wait_for_job(client, response.get_json()['job_id'])
+    assert job['status'] == 'completed', job['error']
+    return dashboard.ml_manager.snapshot
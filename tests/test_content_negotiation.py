@@ -0,0 +1,48 @@
+"""Accept negotiation: optional encodings are only chosen when installed"""
+
+import importlib.util
+
+import pytest
+
+MSGPACK_INSTALLED = importlib.util.find_spec('msgpack') is not None
+ARROW_INSTALLED = importlib.util.find_spec('pyarrow') is not None
+
+
+def test_json_by_default(client, trained):
+    response = client.get('/api/predictions?n=5')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert len(response.get_json()['predictions']['predicted']) == 5
+
+
+def test_msgpack_falls_back_to_accepted_json(client, trained):
+    response = client.get('/api/predictions?n=5',
+                          headers={'Accept': 'application/msgpack, application/json;q=0.9'})
+    assert response.status_code == 200
+    expected = 'application/msgpack' if MSGPACK_INSTALLED else 'application/json'
+    assert response.mimetype == expected
+
+
+@pytest.mark.skipif(MSGPACK_INSTALLED, reason='msgpack is installed')
+def test_msgpack_only_is_406_without_msgpack(client, trained):
+    response = client.get('/api/predictions?n=5', headers={'Accept': 'application/msgpack'})
+    assert response.status_code == 406
+    assert response.get_json()['status'] == 'error'
+
+
+@pytest.mark.skipif(ARROW_INSTALLED, reason='pyarrow is installed')
+def test_arrow_only_is_406_without_pyarrow(client, trained):
+    response = client.get('/api/predictions?n=5',
+                          headers={'Accept': 'application/vnd.apache.arrow.stream'})
+    assert response.status_code == 406
+
+
+def test_unsupported_accept_gets_json(client, trained):
+    response = client.get('/api/predictions?n=5', headers={'Accept': 'text/html'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+
+
+def test_bad_layout_is_400(client, trained):
+    response = client.get('/api/history/performance?layout=diagonal')
+    assert response.status_code == 400
@@ -0,0 +1,48 @@
+"""/api/predict: JSON and binary payloads, and the 400s for malformed ones"""
+
+import io
+
+import numpy as np
+
+
+def _npy(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def test_predict_json_rows(client, trained):
+    n_features = trained.X_test.shape[1]
+    response = client.post('/api/predict', json={'rows': np.zeros((3, n_features)).tolist()})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['model'] == trained.name
+    assert len(payload['predictions']['predicted']) == 3
+    assert len(payload['predictions']['confidence']) == 3
+
+
+def test_predict_npy_rows(client, trained):
+    rows = np.ones((2, trained.X_test.shape[1]), dtype=np.float64)
+    response = client.post('/api/predict', data=_npy(rows), content_type='application/x-npy')
+    assert response.status_code == 200
+    assert len(response.get_json()['predictions']['predicted']) == 2
+
+
+def test_predict_rejects_malformed_rows(client, trained):
+    n_features = trained.X_test.shape[1]
+    bad_requests = [
+        {'json': [[0.0] * n_features]},
+        {'json': {'rows': []}},
+        {'json': {'rows': [[0.0] * (n_features + 1)]}},
+        {'data': _npy(np.array(['a'] * n_features)), 'content_type': 'application/x-npy'},
+        {'data': b'\x00' * 7, 'content_type': 'application/octet-stream'},
+    ]
+    for kwargs in bad_requests:
+        response = client.post('/api/predict', **kwargs)
+        assert response.status_code == 400, kwargs
+        assert response.get_json()['status'] == 'error'
+
+
+def test_predict_unknown_model_is_404(client, trained):
+    response = client.post('/api/predict?model=no-such-model', json={'rows': [[0.0]]})
+    assert response.status_code == 404
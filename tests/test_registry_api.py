@@ -0,0 +1,55 @@
+"""Model registry routes: activation, and rollbacks that other workers respect"""
+
+from conftest import FAST_SPEC, wait_for_job
+
+
+def _train(client, model_type, name=None):
+    url = f'/api/train/{model_type}' + (f'?model={name}' if name else '')
+    response = client.post(url, json=FAST_SPEC)
+    assert response.status_code == 202
+    job = wait_for_job(client, response.get_json()['job_id'])
+    assert job['status'] == 'completed', job['error']
+
+
+def _versions(client, name):
+    models = client.get('/api/models').get_json()['models']
+    return [meta['version'] for meta in models if meta['name'] == name]
+
+
+def test_activate_unknown_version_is_404(client, trained):
+    assert client.post('/api/models/20000101T000000000000-classification/activate').status_code == 404
+    assert client.post('/api/models/.activations/activate').status_code == 404
+
+
+def test_activate_stored_version(client, trained):
+    version = trained.registry_version
+    response = client.post(f'/api/models/{version}/activate')
+    assert response.status_code == 200
+    assert response.get_json()['model'] == trained.name
+    assert client.get('/api/models').get_json()['active'] == version
+
+
+def test_rollback_survives_other_workers_sync(client, dashboard):
+    _train(client, 'regression', 'rollback')
+    _train(client, 'regression', 'rollback')
+    newest, previous = _versions(client, 'rollback')[:2]
+
+    # A second manager on the same registry stands in for another worker process
+    other = dashboard.MLModelManager()
+    other.attach_registry(dashboard.registry)
+    other.registry_check_interval = 0
+    other.sync_with_registry()
+    other.get_snapshot('rollback')
+    assert other.get_snapshot('rollback').registry_version == newest
+
+    assert client.post(f'/api/models/{previous}/activate').status_code == 200
+    _train(client, 'classification')  # Another model becomes the default
+    other.sync_with_registry()
+    assert other.default_name == 'classification'
+    assert other.get_snapshot('rollback').registry_version == previous
+
+    # Training the rolled-back name again moves every worker to the new version
+    _train(client, 'regression', 'rollback')
+    _train(client, 'classification')
+    other.sync_with_registry()
+    assert other.get_snapshot('rollback').registry_version == _versions(client, 'rollback')[0]
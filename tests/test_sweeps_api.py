@@ -0,0 +1,41 @@
+"""Sweep routes: invalid requests get 400 and unknown sweeps 404"""
+
+import pytest
+
+SPACE = {'dropout': [0.0, 0.1]}
+
+
+@pytest.mark.parametrize('body, message', [
+    ([SPACE], 'Sweep options must be a JSON object'),
+    ({'space': SPACE, 'trials': 4}, 'Unknown sweep option(s): trials'),
+    ({'space': SPACE, 'strategy': 'bayes'}, None),
+    ({'space': SPACE, 'n_trials': 'many'}, 'n_trials, eta and grace_epochs must be integers'),
+    ({'space': SPACE, 'seed': 1.5}, 'seed must be an integer'),
+    ({'space': SPACE, 'base': [1]}, 'base must be a JSON object'),
+    ({'space': {'optimizer': ['sgd']}}, 'Cannot search over: optimizer'),
+    ({'space': {'dropout': []}}, None),
+    ({'space': {'learning_rate': {'min': 0, 'max': 0.1, 'log': True}}},
+     'learning_rate log range needs min > 0'),
+    ({'space': {'dropout': {'min': 0.5, 'max': 0.1}}}, 'dropout range min must not exceed max'),
+    ({'strategy': 'grid', 'space': {'dropout': {'min': 0.0, 'max': 0.5}}},
+     'Grid search needs a list of values for every parameter'),
+    ({'space': {'dropout': [2.0]}}, 'dropout must be in [0, 1)'),
+])
+def test_create_sweep_rejects_bad_options(client, body, message):
+    response = client.post('/api/sweeps', json=body)
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload['status'] == 'error'
+    if message:
+        assert payload['message'] == message
+
+
+def test_unknown_sweep_is_404(client):
+    assert client.get('/api/sweeps/0123abcd').status_code == 404
+    assert client.post('/api/sweeps/0123abcd/cancel').status_code == 404
+
+
+def test_list_sweeps(client):
+    response = client.get('/api/sweeps')
+    assert response.status_code == 200
+    assert isinstance(response.get_json()['sweeps'], list)
@@ -0,0 +1,36 @@
+"""Training routes: bad specs are rejected before a job is queued"""
+
+import pytest
+
+
+@pytest.mark.parametrize('body, message', [
+    ([1, 2], 'Training options must be a JSON object'),
+    ({'epochs': 1, 'optimizer': 'sgd'}, 'Unknown training option(s): optimizer'),
+    ({'epochs': 0}, 'epochs must be between 1 and 1000'),
+    ({'data': 'train.csv'}, 'data must be a JSON object'),
+    ({'data': {'path': 5}}, None),
+    ({'data': {'path': '../outside.csv'}}, None),
+])
+def test_train_rejects_bad_spec(client, body, message):
+    response = client.post('/api/train/classification', json=body)
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload['status'] == 'error'
+    if message:
+        assert payload['message'] == message
+
+
+def test_train_rejects_bad_model_name(client):
+    response = client.post('/api/train/regression?model=../escape', json={'epochs': 1})
+    assert response.status_code == 400
+
+
+def test_unknown_job_is_404(client):
+    assert client.get('/api/jobs/0123abcd').status_code == 404
+    assert client.get('/api/jobs/not-a-job-id').status_code == 404
+
+
+def test_training_job_completes(client, trained):
+    jobs = client.get('/api/jobs').get_json()['jobs']
+    assert any(job['status'] == 'completed' and job['model'] == 'classification' for job in jobs)
+    assert trained.model_type == 'classification'
@@ -0,0 +1,291 @@
+"""
+Background training jobs
+Runs model training off the request thread on a small, bounded worker pool
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from training_telemetry import TrainingTelemetry
+
+
+class TrainingJob:
+    """State of a single training run"""
+
+    def __init__(self, job_type, publish=None, model_name=None):
+        self.id = uuid.uuid4().hex
+        self.job_type = job_type
+        self.model_name = model_name or job_type
+        self.telemetry = TrainingTelemetry(
+            context={'job_id': self.id, 'type': job_type, 'model': self.model_name}, publish=publish)
+        self.status = 'queued'
+        self.epoch = 0
+        self.total_epochs = None
+        self.epoch_logs = []
+        self.history = None
+        self.summary = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    def record_epoch(self, epoch, logs, total_epochs=None):
+        """Record the metrics reported at the end of an epoch"""
+        self.epoch = epoch + 1
+        if total_epochs is not None:
+            self.total_epochs = total_epochs
+        self.epoch_logs.append({key: float(value) for key, value in (logs or {}).items()})
+
+    def to_dict(self, include_history=True):
+        data = {
+            'id': self.id,
+            'type': self.job_type,
+            'model': self.model_name,
+            'status': self.status,
+            'epoch': self.epoch,
+            'total_epochs': self.total_epochs,
+            'progress': self.epoch_logs[-1] if self.epoch_logs else None,
+            'summary': self.summary,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if include_history:
+            data['history'] = self.history
+        return data
+
+
+class StoredTelemetry:
+    """Telemetry of a job run by another process, as last written to its state file"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def to_dict(self, since_epoch=0):
+        return dict(self.data,
+                    epochs=[record for record in self.data['epochs'] if record['epoch'] > since_epoch],
+                    batches=[record for record in self.data['batches'] if record['epoch'] >= since_epoch])
+
+
+class StoredJob:
+    """Read-only view of a job run by another process"""
+
+    def __init__(self, data):
+        self.data = data
+        self.id = data['job']['id']
+        self.model_name = data['job']['model']
+        self.status = data['job']['status']
+        self.telemetry = StoredTelemetry(data['telemetry'])
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self, include_history=True):
+        data = dict(self.data['job'])
+        if not include_history:
+            data.pop('history', None)
+        return data
+
+
+class TrainingJobQueue:
+    """Bounded pool of training workers with one active job per model type.
+
+    With ``state_dir`` set, each job's state is also written there when it
+    starts, after every epoch and when it finishes, so processes serving
+    the same application can answer for jobs they did not run, and a lock
+    file per model keeps two processes from training the same model at once.
+    """
+
+    def __init__(self, max_workers=1, max_finished_jobs=50, publish=None, state_dir=None):
+        self.max_finished_jobs = max_finished_jobs
+        self.publish = publish
+        self.state_dir = state_dir
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='training-worker')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._active = {}
+
+    def submit(self, job_type, train_fn, model_name=None):
+        """Queue a training run and return (job, created).
+
+        ``train_fn(progress_callback, telemetry)`` returns ``(history, summary)``;
+        ``telemetry`` is the job's TrainingTelemetry recorder. If a job for
+        the same model name (the job type by default) is already queued or
+        running, that job is returned instead of starting a second run.
+        """
+        model_name = model_name or job_type
+        with self._lock:
+            existing = self._active.get(model_name)
+            if existing is not None:
+                return existing, False
+
+            job = TrainingJob(job_type, publish=self.publish, model_name=model_name)
+            holder = self._claim(job)
+            if holder is not job:
+                return holder, False  # Already training in another process
+            self._jobs[job.id] = job
+            self._active[job.model_name] = job
+            self._trim_finished()
+
+        self._executor.submit(self._run, job, train_fn)
+        return job, True
+
+    def _run(self, job, train_fn):
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat()
+        self._save_state(job)
+
+        def record_epoch(epoch, logs, total_epochs=None):
+            job.record_epoch(epoch, logs, total_epochs)
+            self._save_state(job)
+
+        try:
+            job.history, job.summary = train_fn(record_epoch, job.telemetry)
+            job.status = 'completed'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            self._save_state(job)
+            self._release(job)
+            with self._lock:
+                if self._active.get(job.model_name) is job:
+                    del self._active[job.model_name]
+
+    def _state_path(self, job_id):
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        return os.path.join(self.state_dir, f'{job_id}.json')
+
+    def _lock_path(self, model_name):
+        return os.path.join(self.state_dir, f'model-{hashlib.sha1(model_name.encode()).hexdigest()[:16]}.lock')
+
+    def _claim(self, job):
+        """Take the per-model lock shared by every process using ``state_dir``.
+
+        Returns ``job`` when it may run, or the stored job of the process
+        already training that model. The lock file is linked into place fully
+        written, so readers never see it empty; one whose process has died or
+        whose job has finished is stale and replaced.
+        """
+        if not self.state_dir:
+            return job
+        self._save_state(job)  # Whoever reads our lock must find the job
+        path = self._lock_path(job.model_name)
+        tmp = f'{path}.{uuid.uuid4().hex}'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({'job_id': job.id, 'pid': os.getpid()}, fh)
+        try:
+            for _ in range(3):
+                try:
+                    os.link(tmp, path)
+                    return job
+                except FileExistsError:
+                    pass
+                holder = self._lock_holder(path)
+                if holder is not None:
+                    try:
+                        os.remove(self._state_path(job.id))
+                    except OSError:
+                        pass
+                    return holder
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            return job  # Lost every race to replace a stale lock; run rather than fail
+        finally:
+            os.remove(tmp)
+
+    def _lock_holder(self, path):
+        """Unfinished job named by a lock file whose process is alive, else None"""
+        try:
+            with open(path, encoding='utf-8') as fh:
+                lock = json.load(fh)
+            os.kill(lock['pid'], 0)
+        except ProcessLookupError:
+            return None
+        except PermissionError:
+            pass  # Alive, owned by another user
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        holder = self._load_state(lock['job_id'])
+        return holder if holder is not None and not holder.is_finished else None
+
+    def _release(self, job):
+        if not self.state_dir:
+            return
+        path = self._lock_path(job.model_name)
+        try:
+            with open(path, encoding='utf-8') as fh:
+                if json.load(fh).get('job_id') != job.id:
+                    return  # Replaced as stale; not ours to remove
+            os.remove(path)
+        except (OSError, ValueError):
+            pass
+
+    def _save_state(self, job):
+        if not self.state_dir:
+            return
+        path = self._state_path(job.id)
+        tmp = f'{path}.{uuid.uuid4().hex}'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump({'job': job.to_dict(), 'telemetry': job.telemetry.to_dict()}, fh)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f'Could not write state of training job {job.id}: {e}')
+
+    def _load_state(self, job_id):
+        path = self._state_path(job_id) if self.state_dir else None
+        if path is None:
+            return None
+        try:
+            with open(path, encoding='utf-8') as fh:
+                return StoredJob(json.load(fh))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _trim_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+            if self.state_dir:
+                # The stored state (with its batch telemetry) goes with the job
+                try:
+                    os.remove(self._state_path(job_id))
+                except OSError:
+                    pass
+
+    def get(self, job_id):
+        """A job of this process, or the stored state of one run by another process"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._load_state(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._active)
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
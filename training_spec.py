@@ -0,0 +1,198 @@
+"""
+Training specification
+Model architecture and fit settings accepted by the training endpoints, and
+the single builder/fit routine shared by every model type
+"""
+
+import time
+
+from datasets import DatasetConfig
+
+MODEL_TYPES = ('classification', 'regression')
+ACTIVATIONS = ('relu', 'gelu', 'elu', 'selu', 'tanh', 'sigmoid', 'swish')
+
+
+class EarlyStoppingSpec:
+    """When to stop training once the monitored loss stops improving"""
+
+    def __init__(self, enabled=True, patience=5, min_delta=0.0, restore_best_weights=True):
+        self.enabled = bool(enabled)
+        self.patience = int(patience)
+        self.min_delta = float(min_delta)
+        self.restore_best_weights = bool(restore_best_weights)
+        if self.patience < 0 or self.min_delta < 0:
+            raise ValueError('early_stopping patience and min_delta must not be negative')
+
+    @classmethod
+    def from_value(cls, value):
+        """Accept true/false or a dict of options"""
+        if value is None:
+            return cls()
+        if isinstance(value, bool):
+            return cls(enabled=value)
+        if not isinstance(value, dict):
+            raise ValueError('early_stopping must be a boolean or an object')
+        try:
+            return cls(**value)
+        except TypeError as e:
+            raise ValueError(f'early_stopping: {e}')
+
+    def to_dict(self):
+        return {
+            'enabled': self.enabled,
+            'patience': self.patience,
+            'min_delta': self.min_delta,
+            'restore_best_weights': self.restore_best_weights
+        }
+
+
+class TrainingSpec:
+    """Layer sizes, optimiser and fit settings for one training run"""
+
+    def __init__(self, hidden_layers=(64, 32), dropout=0.3, activation='relu', batch_size=32,
+                 epochs=50, learning_rate=0.001, early_stopping=None, mixed_precision=False,
+                 steps_per_execution=1, data=None):
+        self.hidden_layers = [int(units) for units in hidden_layers]
+        self.dropout = float(dropout)
+        self.activation = activation
+        self.batch_size = int(batch_size)
+        self.epochs = int(epochs)
+        self.learning_rate = float(learning_rate)
+        self.early_stopping = (early_stopping if isinstance(early_stopping, EarlyStoppingSpec)
+                               else EarlyStoppingSpec.from_value(early_stopping))
+        self.mixed_precision = bool(mixed_precision)
+        self.steps_per_execution = int(steps_per_execution)
+        self.data = data or DatasetConfig()
+        self.validate()
+
+    @classmethod
+    def from_dict(cls, options, data_root='data'):
+        """Build a spec from a request body; ``data`` holds the DatasetConfig options"""
+        if options is not None and not isinstance(options, dict):
+            raise ValueError('Training options must be a JSON object')
+        options = dict(options or {})
+        allowed = ('hidden_layers', 'dropout', 'activation', 'batch_size', 'epochs', 'learning_rate',
+                   'early_stopping', 'mixed_precision', 'steps_per_execution', 'data')
+        unknown = set(options) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown training option(s): {', '.join(sorted(unknown))}")
+
+        options['data'] = DatasetConfig.from_dict(options.get('data'), data_root=data_root)
+        try:
+            return cls(**options)
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    def validate(self):
+        if not self.hidden_layers or len(self.hidden_layers) > 10:
+            raise ValueError('hidden_layers must list between 1 and 10 layer sizes')
+        if any(units < 1 or units > 4096 for units in self.hidden_layers):
+            raise ValueError('Layer sizes must be between 1 and 4096')
+        if not 0 <= self.dropout < 1:
+            raise ValueError('dropout must be in [0, 1)')
+        if self.activation not in ACTIVATIONS:
+            raise ValueError(f"activation must be one of {', '.join(ACTIVATIONS)}")
+        if not 1 <= self.batch_size <= 65536:
+            raise ValueError('batch_size must be between 1 and 65536')
+        if not 1 <= self.epochs <= 1000:
+            raise ValueError('epochs must be between 1 and 1000')
+        if not 0 < self.learning_rate <= 1:
+            raise ValueError('learning_rate must be in (0, 1]')
+        if self.steps_per_execution < 1:
+            raise ValueError('steps_per_execution must be positive')
+
+    def to_dict(self):
+        return {
+            'hidden_layers': list(self.hidden_layers),
+            'dropout': self.dropout,
+            'activation': self.activation,
+            'batch_size': self.batch_size,
+            'epochs': self.epochs,
+            'learning_rate': self.learning_rate,
+            'early_stopping': self.early_stopping.to_dict(),
+            'mixed_precision': self.mixed_precision,
+            'steps_per_execution': self.steps_per_execution
+        }
+
+
+def mixed_precision_supported():
+    """Whether bfloat16 compute is likely to be faster than float32 here.
+
+    TensorFlow runs bfloat16 on any CPU, but without native instructions
+    (AVX512-BF16 or AMX) it is emulated and slower than float32.
+    """
+    import tensorflow as tf
+
+    if tf.config.list_physical_devices('GPU'):
+        return True
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as fh:
+            flags = fh.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+
+def build_model(spec, model_type, n_features, n_classes=None):
+    """Compile the MLP described by ``spec`` for a model type"""
+    import tensorflow as tf
+
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f'Unknown model type: {model_type}')
+
+    # Mixed precision is set per layer rather than through the global policy,
+    # so concurrent training jobs with different specs do not interfere.
+    # bfloat16 is the reduced precision type CPUs support; the output layer
+    # stays float32 for numerically stable softmax and loss computation.
+    dtype = 'mixed_bfloat16' if spec.mixed_precision and mixed_precision_supported() else None
+
+    layers = [tf.keras.layers.Input(shape=(n_features,))]
+    for units in spec.hidden_layers:
+        layers.append(tf.keras.layers.Dense(units, activation=spec.activation, dtype=dtype))
+        if spec.dropout:
+            layers.append(tf.keras.layers.Dropout(spec.dropout, dtype=dtype))
+
+    if model_type == 'classification':
+        layers.append(tf.keras.layers.Dense(n_classes, activation='softmax', dtype='float32'))
+        loss, metrics = 'sparse_categorical_crossentropy', ['accuracy']
+    else:
+        layers.append(tf.keras.layers.Dense(1, dtype='float32'))
+        loss, metrics = 'mse', ['mae']
+
+    model = tf.keras.Sequential(layers)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=spec.learning_rate),
+                  loss=loss, metrics=metrics, steps_per_execution=spec.steps_per_execution)
+    return model
+
+
+def fit_model(model, spec, data, callbacks=None):
+    """Fit on a StreamingDataset; returns (history, summary) with throughput figures"""
+    import tensorflow as tf
+
+    callbacks = list(callbacks or [])
+    validation_data = data.validation_data
+    if spec.early_stopping.enabled:
+        callbacks.append(tf.keras.callbacks.EarlyStopping(
+            monitor='val_loss' if validation_data is not None else 'loss',
+            patience=spec.early_stopping.patience,
+            min_delta=spec.early_stopping.min_delta,
+            restore_best_weights=spec.early_stopping.restore_best_weights
+        ))
+
+    start = time.perf_counter()
+    history = model.fit(data.train_dataset(batch_size=spec.batch_size), epochs=spec.epochs,
+                        validation_data=validation_data, verbose=0, callbacks=callbacks)
+    wall_time = time.perf_counter() - start
+
+    epochs_run = len(history.history.get('loss', []))
+    samples = data.n_train_rows * epochs_run
+    summary = {
+        'spec': spec.to_dict(),
+        'mixed_precision_active': model.layers[0].dtype_policy.name == 'mixed_bfloat16',
+        'train_rows': data.n_train_rows,
+        'epochs_run': epochs_run,
+        'stopped_early': epochs_run < spec.epochs,
+        'wall_time_seconds': wall_time,
+        'samples_per_second': samples / wall_time if wall_time else None
+    }
+    return history.history, summary
@@ -0,0 +1,157 @@
+"""
+Training telemetry
+Per-batch and per-epoch loss, step time, throughput and memory of a running
+fit(), kept in bounded buffers and pushed to the dashboard as it arrives
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _scalars(logs):
+    return {key: float(value) for key, value in (logs or {}).items()}
+
+
+class TrainingTelemetry:
+    """Bounded record of one training run.
+
+    Batch samples are taken every ``batch_interval`` steps and averaged over
+    the steps since the previous sample. ``publish(event, data)`` is called
+    for every epoch and for batch samples at most every
+    ``min_publish_interval`` seconds, so a fast fit cannot flood the stream.
+    """
+
+    def __init__(self, context=None, publish=None, max_batches=2000, max_epochs=1000,
+                 batch_interval=10, min_publish_interval=0.25):
+        self.context = dict(context or {})
+        self.publish = publish
+        self.batch_interval = max(1, batch_interval)
+        self.min_publish_interval = min_publish_interval
+        self.batches = deque(maxlen=max_batches)
+        self.epochs = deque(maxlen=max_epochs)
+        self.batch_size = None
+        self.steps_per_epoch = None
+        self._lock = threading.Lock()
+        self._last_published = 0.0
+        self._epoch_start = None
+        self._sample_start = None
+        self._sample_step = 0
+        self._steps_before_epoch = 0
+
+    def _emit(self, kind, record, force=False):
+        if self.publish is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_published < self.min_publish_interval:
+            return
+        self._last_published = now
+        self.publish('training', dict(self.context, kind=kind, record=record))
+
+    def start(self, batch_size, steps_per_epoch=None):
+        self.batch_size = batch_size
+        self.steps_per_epoch = steps_per_epoch
+
+    def epoch_begin(self, epoch):
+        self._epoch_start = self._sample_start = time.perf_counter()
+        self._sample_step = 0
+
+    def batch_end(self, epoch, step, logs):
+        """Called after each step (``step`` counts from 0 within the epoch)"""
+        steps = step + 1 - self._sample_step
+        if steps < self.batch_interval:
+            return
+        now = time.perf_counter()
+        elapsed = now - self._sample_start
+        record = {
+            'epoch': epoch,
+            'step': step + 1,
+            'global_step': self._steps_before_epoch + step + 1,
+            'step_time_ms': elapsed / steps * 1000,
+            'samples_per_second': steps * self.batch_size / elapsed if elapsed and self.batch_size else None,
+            'rss_bytes': current_rss_bytes(),
+            **_scalars(logs)
+        }
+        self._sample_start = now
+        self._sample_step = step + 1
+        with self._lock:
+            self.batches.append(record)
+        self._emit('batch', record)
+
+    def epoch_end(self, epoch, logs, steps):
+        elapsed = time.perf_counter() - self._epoch_start
+        if steps and not self.steps_per_epoch:
+            self.steps_per_epoch = steps
+        self._steps_before_epoch += steps
+        record = {
+            'epoch': epoch + 1,
+            'global_step': self._steps_before_epoch,
+            'epoch_time_seconds': elapsed,
+            'step_time_ms': elapsed / steps * 1000 if steps else None,
+            'samples_per_second': steps * self.batch_size / elapsed if steps and self.batch_size else None,
+            'rss_bytes': current_rss_bytes(),
+            'timestamp': time.time(),
+            **_scalars(logs)
+        }
+        with self._lock:
+            self.epochs.append(record)
+        self._emit('epoch', record, force=True)
+
+    def to_dict(self, since_epoch=0):
+        with self._lock:
+            return {
+                **self.context,
+                'batch_size': self.batch_size,
+                'steps_per_epoch': self.steps_per_epoch,
+                'epochs': [record for record in self.epochs if record['epoch'] > since_epoch],
+                'batches': [record for record in self.batches if record['epoch'] >= since_epoch]
+            }
+
+    def keras_callback(self, batch_size):
+        """Keras callback feeding this recorder"""
+        import tensorflow as tf
+
+        telemetry = self
+
+        class TelemetryCallback(tf.keras.callbacks.Callback):
+            def on_train_begin(self, logs=None):
+                telemetry.start(batch_size, self.params.get('steps'))
+                self._epoch = 0
+                self._steps = 0
+
+            def on_epoch_begin(self, epoch, logs=None):
+                self._epoch = epoch
+                self._steps = 0
+                telemetry.epoch_begin(epoch)
+
+            def on_train_batch_end(self, batch, logs=None):
+                self._steps = batch + 1
+                telemetry.batch_end(self._epoch, batch, logs)
+
+            def on_epoch_end(self, epoch, logs=None):
+                telemetry.epoch_end(epoch, logs, self._steps)
+
+        return TelemetryCallback()